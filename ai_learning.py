@@ -92,6 +92,24 @@ class AILearning:
                 # 70% do valor antigo + 30% do novo (aprendizado gradual)
                 self.learning_data["strategy_params"][key] = old_value * 0.7 + value * 0.3
     
+    def set_strategy_params(self, params: Dict, win_rate: float, source: str = "evolution"):
+        """
+        Substitui os parâmetros de estratégia (sem média ponderada) e guarda
+        o conjunto em best_strategies com a taxa de vitória medida
+        """
+        for key, value in params.items():
+            if key in self.learning_data["strategy_params"]:
+                self.learning_data["strategy_params"][key] = value
+        self.learning_data["best_strategies"].append({
+            "params": dict(self.learning_data["strategy_params"]),
+            "win_rate": win_rate,
+            "source": source,
+            "date": datetime.now().isoformat()
+        })
+        # Mantém apenas as últimas 50 estratégias
+        if len(self.learning_data["best_strategies"]) > 50:
+            self.learning_data["best_strategies"] = self.learning_data["best_strategies"][-50:]
+    
     def record_action_result(self, action: str, was_successful: bool, was_bluff: bool = False):
         """Registra resultado de uma ação"""
         action_key = action.lower()
@@ -2,15 +2,98 @@
 Sistema de Treinamento para IA de Coup
 Permite que IAs joguem entre si e aprendam com as experiências
 """
+import os
 import random
-from typing import List, Dict, Tuple, Optional
-from coup_game import CoupGame, Player, Action, Character
-from coup_ai import CoupAI
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterator, List, Dict, NamedTuple, Tuple, Optional
+from coup_game import CoupGame, Player
+from coup_ai import CoupAI, AIReactions, BatchedReactions
+from compact_state import ACTIONS, REQUIRED_CHARACTER, NO_TARGET
 from ai_learning import AILearning
+from match_stats import SPRT, FIRST_STRONGER, EQUIVALENT, PairedDifference, paired_difference
+from batch_simulator import sweep_learning_param
+from seeding import derive_seed, new_base_seed
+
+TRAINED_AI_NAME = "IA_Treinada"
+
+
+class GameOutcome(NamedTuple):
+    """Resultado compacto de uma partida de treino (o que os workers devolvem)"""
+    game_num: int
+    won: bool
+
+
+def _play_training_game(game_seed: int, ai_difficulty: str, opponent_difficulties: List[str],
+                        learning_params: Optional[Dict]) -> Optional[str]:
+    """Partida semeada num worker do pool (função de módulo para ser serializável)"""
+    return AITrainer._play_seeded_game(game_seed, ai_difficulty, opponent_difficulties, learning_params)
+
+
+def _play_training_batch(game_seeds: List[int], ai_difficulty: str,
+                         opponent_difficulties: List[str], learning_params: Optional[Dict],
+                         ai_seed: int) -> List[Optional[str]]:
+    """
+    Lote de partidas semeadas jogado em passo único (AITrainer.play_batch)
+    num worker do pool
+    
+    As cartas de cada partida vêm da sua semente; as IAs são as mesmas em
+    todo o lote, com fluxos derivados de ai_seed (fluxo i+1 = assento i).
+    """
+    trained_ai = CoupAI(name=TRAINED_AI_NAME, difficulty=ai_difficulty,
+                        learning_params=learning_params, seed=derive_seed(ai_seed, 1))
+    opponents = [
+        CoupAI(name=f"Oponente_{i+1}", difficulty=diff, seed=derive_seed(ai_seed, i + 2))
+        for i, diff in enumerate(opponent_difficulties)
+    ]
+    ais = [trained_ai] + opponents
+    names = [ai.name for ai in ais]
+    games = [CoupGame(names, seed=derive_seed(game_seed, 0)) for game_seed in game_seeds]
+    return [winner.name if winner else None for winner in AITrainer.play_batch(games, ais)]
+
+
+def _play_paired_deal(deal_seed: int, candidates: List[Tuple[str, Optional[Dict]]],
+                      opponent_difficulties: List[str]) -> List[float]:
+    """
+    Joga uma distribuição com cada candidato em cada assento da mesa
+    
+    O jogo (cartas e reações) e a IA de cada assento usam fluxos derivados de
+    deal_seed e do assento, então todos os candidatos recebem exatamente as
+    mesmas mãos e oponentes; só a estratégia muda. Retorna a fração de
+    vitórias de cada candidato nas rotações.
+    """
+    seats = len(opponent_difficulties) + 1
+    scores = []
+    for difficulty, params in candidates:
+        wins = 0
+        for seat in range(seats):
+            trained_ai = CoupAI(name=TRAINED_AI_NAME, difficulty=difficulty,
+                                learning_params=params, seed=derive_seed(deal_seed, seat + 1))
+            opponents = []
+            for i, opp_difficulty in enumerate(opponent_difficulties):
+                opp_seat = i if i < seat else i + 1
+                opponents.append(CoupAI(name=f"Oponente_{i+1}", difficulty=opp_difficulty,
+                                        seed=derive_seed(deal_seed, opp_seat + 1)))
+            names = [opp.name for opp in opponents]
+            names.insert(seat, trained_ai.name)
+            game = CoupGame(names, seed=derive_seed(deal_seed, 0))
+            winner = AITrainer.play_game(game, trained_ai, opponents)
+            wins += winner is not None and winner.name == TRAINED_AI_NAME
+        scores.append(wins / seats)
+    return scores
+
+
+def _mutate_params(params: Dict[str, float], rng: random.Random, scale: float) -> Dict[str, float]:
+    """Cópia de params com ruído gaussiano em cada chave, limitado a [0, 1]"""
+    return {key: min(1.0, max(0.0, value + rng.gauss(0.0, scale))) for key, value in params.items()}
+
 
 class AITrainer:
     """Sistema de treinamento para IAs"""
     
+    # Partidas por worker em cada geração do treino paralelo (sem generation_size)
+    GAMES_PER_WORKER = 25
+    
     def __init__(self):
         self.training_stats = {
             "games_played": 0,
@@ -21,7 +104,9 @@ class AITrainer:
         self.learning = AILearning()
     
     def train_ai(self, num_games: int = 100, ai_difficulty: str = "hard", 
-                 opponent_difficulties: List[str] = ["easy", "medium"]):
+                 opponent_difficulties: List[str] = ["easy", "medium"],
+                 seed: Optional[int] = None, workers: Optional[int] = 1,
+                 generation_size: Optional[int] = None):
         """
         Treina uma IA fazendo ela jogar múltiplas partidas COM APRENDIZADO PERSISTENTE
         
@@ -29,12 +114,22 @@ class AITrainer:
             num_games: Número de partidas para treinar
             ai_difficulty: Dificuldade da IA sendo treinada
             opponent_difficulties: Lista de dificuldades dos oponentes
+            seed: Semente base; a partida N usa derive_seed(seed, N) e pode ser
+                reproduzida sozinha com replay_game
+            workers: Processos que jogam as partidas (None = todos os núcleos)
+            generation_size: Partidas por geração (ver _play_generations)
         """
+        base_seed = seed if seed is not None else new_base_seed()
+        workers, generation_size = self._parallel_settings(workers, generation_size)
+        
         print(f"\n{'='*60}")
         print(f"🎓 TREINANDO IA ({ai_difficulty.upper()}) COM APRENDIZADO")
         print(f"{'='*60}")
         print(f"Partidas: {num_games}")
         print(f"Oponentes: {opponent_difficulties}")
+        print(f"Semente base: {base_seed}")
+        if workers > 1:
+            print(f"Processos: {workers} | Partidas por geração: {generation_size}")
         
         # Mostra conhecimento prévio
         if self.learning.learning_data["total_games"] > 0:
@@ -47,27 +142,11 @@ class AITrainer:
         wins = 0
         losses = 0
         
-        for game_num in range(1, num_games + 1):
-            # Carrega parâmetros aprendidos
-            learned_params = self.learning.get_strategy_params()
-            
-            # Cria IA com parâmetros aprendidos
-            trained_ai = CoupAI(name="IA_Treinada", difficulty=ai_difficulty, learning_params=learned_params)
-            opponents = []
-            
-            # Cria oponentes com diferentes dificuldades
-            for i, diff in enumerate(opponent_difficulties):
-                opponents.append(CoupAI(name=f"Oponente_{i+1}", difficulty=diff))
-            
-            # Cria jogo
-            all_names = [trained_ai.name] + [opp.name for opp in opponents]
-            game = CoupGame(all_names)
-            
-            # Joga até o fim
-            winner = self._play_game(game, trained_ai, opponents)
-            
+        # Cada geração joga com os parâmetros aprendidos até a geração anterior
+        generations = self._play_generations(num_games, base_seed, ai_difficulty, opponent_difficulties,
+                                             workers, generation_size)
+        for game_num, won in (outcome for outcomes in generations for outcome in outcomes):
             # Registra resultado e aprende
-            won = winner and winner.name == trained_ai.name
             if won:
                 wins += 1
                 self.training_stats["wins_by_difficulty"][ai_difficulty] += 1
@@ -107,13 +186,106 @@ class AITrainer:
         return {
             "wins": wins,
             "losses": losses,
-            "win_rate": final_win_rate
+            "win_rate": final_win_rate,
+            "seed": base_seed
         }
     
-    def _play_game(self, game: CoupGame, trained_ai: CoupAI, 
-                   opponents: List[CoupAI]) -> Player:
+    @staticmethod
+    def _parallel_settings(workers: Optional[int], generation_size: Optional[int]) -> Tuple[int, int]:
+        """Normaliza (processos, partidas por geração); serial sem geração = 1 partida por geração"""
+        workers = workers if workers is not None else (os.cpu_count() or 1)
+        if generation_size is None:
+            generation_size = 1 if workers <= 1 else workers * AITrainer.GAMES_PER_WORKER
+        return max(workers, 1), max(generation_size, 1)
+    
+    def _play_generations(self, num_games: int, base_seed: int, ai_difficulty: str,
+                          opponent_difficulties: List[str], workers: int,
+                          generation_size: int) -> Iterator[List[GameOutcome]]:
+        """
+        Joga as partidas 1..num_games em gerações de generation_size
+        
+        Todas as partidas de uma geração usam os parâmetros aprendidos no seu
+        início; o chamador funde os resultados no AILearning antes da próxima
+        (ponto de sincronização). Com workers > 1 as partidas da geração são
+        distribuídas num pool de processos, que devolvem só GameOutcome. O
+        resultado depende só da semente e de generation_size, não de workers.
+        """
+        pool = ProcessPoolExecutor(workers) if workers > 1 else None
+        try:
+            for first in range(1, num_games + 1, generation_size):
+                game_nums = range(first, min(first + generation_size, num_games + 1))
+                seeds = [derive_seed(base_seed, game_num) for game_num in game_nums]
+                params = self.learning.get_strategy_params()
+                if pool is None:
+                    winners = [self._play_seeded_game(game_seed, ai_difficulty, opponent_difficulties, params)
+                               for game_seed in seeds]
+                else:
+                    winners = pool.map(_play_training_game, seeds, repeat(ai_difficulty),
+                                       repeat(opponent_difficulties), repeat(params),
+                                       chunksize=max(1, len(seeds) // (workers * 4)))
+                yield [GameOutcome(game_num, winner == TRAINED_AI_NAME)
+                       for game_num, winner in zip(game_nums, winners)]
+        finally:
+            if pool is not None:
+                pool.shutdown()
+    
+    @staticmethod
+    def _create_seeded_match(game_seed: int, ai_difficulty: str,
+                             opponent_difficulties: List[str],
+                             learning_params: Optional[Dict] = None) -> Tuple[CoupGame, CoupAI, List[CoupAI]]:
+        """
+        Cria jogo, IA treinada e oponentes com fluxos aleatórios derivados de game_seed
+        
+        Fluxo 0 é o do jogo (cartas e reações); fluxo i+1 é o da IA no assento i.
+        """
+        trained_ai = CoupAI(name=TRAINED_AI_NAME, difficulty=ai_difficulty,
+                            learning_params=learning_params, seed=derive_seed(game_seed, 1))
+        opponents = [
+            CoupAI(name=f"Oponente_{i+1}", difficulty=diff, seed=derive_seed(game_seed, i + 2))
+            for i, diff in enumerate(opponent_difficulties)
+        ]
+        
+        all_names = [trained_ai.name] + [opp.name for opp in opponents]
+        game = CoupGame(all_names, seed=derive_seed(game_seed, 0))
+        return game, trained_ai, opponents
+    
+    @staticmethod
+    def _play_seeded_game(game_seed: int, ai_difficulty: str,
+                          opponent_difficulties: List[str],
+                          learning_params: Optional[Dict] = None) -> Optional[str]:
+        """Joga uma partida semeada e retorna o nome do vencedor (ou None)"""
+        game, trained_ai, opponents = AITrainer._create_seeded_match(
+            game_seed, ai_difficulty, opponent_difficulties, learning_params
+        )
+        winner = AITrainer.play_game(game, trained_ai, opponents)
+        return winner.name if winner else None
+    
+    def replay_game(self, game_seed: int, ai_difficulty: str = "hard",
+                    opponent_difficulties: List[str] = ["easy", "medium"],
+                    learning_params: Optional[Dict] = None) -> CoupGame:
+        """
+        Reproduz uma partida de um lote a partir da sua semente
+        
+        Args:
+            game_seed: derive_seed(semente base, número da partida)
+            learning_params: Parâmetros usados pela IA naquela partida
+        
+        Returns:
+            O jogo ao final, com game_history completo para inspeção
+        """
+        game, trained_ai, opponents = self._create_seeded_match(
+            game_seed, ai_difficulty, opponent_difficulties, learning_params
+        )
+        self.play_game(game, trained_ai, opponents)
+        return game
+    
+    @staticmethod
+    def play_game(game: CoupGame, trained_ai: CoupAI, 
+                  opponents: List[CoupAI]) -> Player:
         """Joga uma partida completa"""
         max_turns = 200  # Limite de segurança
+        ais = {ai.name: ai for ai in [trained_ai] + opponents}
+        reactions = AIReactions(list(ais.values()))
         
         for turn in range(max_turns):
             if game.is_game_over():
@@ -122,26 +294,16 @@ class AITrainer:
             current_player = game.get_current_player()
             
             # Encontra a IA correspondente
-            ai = None
-            if current_player.name == trained_ai.name:
-                ai = trained_ai
-            else:
-                ai = next((o for o in opponents if o.name == current_player.name), None)
+            ai = ais.get(current_player.name)
             
             if not ai:
                 # Se não encontrou IA, pula turno
                 game.next_turn()
                 continue
             
-            # IA escolhe ação
-            action, target, is_bluff = ai.choose_action(game, current_player)
-            
-            # Executa ação
-            result = game.execute_action(action, current_player, target, is_bluff)
-            
-            # Outros jogadores podem desafiar/bloquear
-            self._handle_reactions(game, current_player, action, target, 
-                                 trained_ai, opponents, is_bluff)
+            # IA escolhe ação; desafios e bloqueios são resolvidos pelo jogo
+            action, target, _ = ai.choose_action(game, current_player)
+            game.play_turn(action, current_player, target, reactions)
             
             # Próximo turno
             game.next_turn()
@@ -154,131 +316,126 @@ class AITrainer:
         # Retorna vencedor ou None
         return game.get_winner()
     
-    def _handle_reactions(self, game: CoupGame, actor: Player, action: Action,
-                         target: Optional[Player], trained_ai: CoupAI,
-                         opponents: List[CoupAI], was_bluff: bool):
-        """Lida com reações (bloqueios e desafios)"""
-        other_players = game.get_other_players(actor)
-        
-        for player in other_players:
-            if player.eliminated:
-                continue
-            
-            # Encontra IA correspondente
-            ai = None
-            if player.name == trained_ai.name:
-                ai = trained_ai
-            else:
-                ai = next((o for o in opponents if o.name == player.name), None)
-            
-            if not ai:
-                continue
-            
-            # Bloqueios
-            if action == Action.FOREIGN_AID:
-                if ai.should_block(game, player, action, actor):
-                    if player.has_card(Character.DUKE) or random.random() < 0.5:
-                        # Bloqueia (pode ser blefe)
-                        actor.coins -= 2
-                        return
-            
-            elif action == Action.STEAL and target == player:
-                if ai.should_block(game, player, action, actor):
-                    if (player.has_card(Character.CAPTAIN) or 
-                        player.has_card(Character.AMBASSADOR) or 
-                        random.random() < 0.4):
-                        # Bloqueia roubo
-                        return
-            
-            elif action == Action.ASSASSINATE and target == player:
-                if ai.should_block(game, player, action, actor):
-                    if player.has_card(Character.CONTESSA) or random.random() < 0.3:
-                        # Bloqueia assassinato
-                        return
+    @staticmethod
+    def play_batch(games: List[CoupGame], ais: List[CoupAI],
+                   max_turns: int = 200) -> List[Optional[Player]]:
+        """
+        Joga várias partidas em passo único, com as decisões tomadas em lote
+        
+        A cada rodada, a IA de cada assento escolhe as ações de todas as
+        partidas em que é a vez dela (choose_actions) e os outros assentos
+        decidem de uma vez se desafiam a declaração (should_challenge_batch);
+        bloqueios e o resto das reações são perguntados partida a partida.
+        
+        Args:
+            games: Partidas com os jogadores na ordem de ais
+            ais: IA de cada assento (a mesma em todas as partidas)
+            max_turns: Limite de segurança de rodadas
+        
+        Returns:
+            Vencedor de cada partida (None se não terminou)
+        """
+        reactions = BatchedReactions(ais)
+        for _ in range(max_turns):
+            active = [game for game in games if not game.is_game_over()]
+            if not active:
+                break
             
-            # Desafios
-            if action in [Action.TAX, Action.ASSASSINATE, Action.STEAL, Action.EXCHANGE]:
-                if ai.should_challenge(game, player, actor, action):
-                    # Processa desafio
-                    if was_bluff:
-                        # Blefe descoberto!
-                        if actor.cards:
-                            card = actor.cards[0]
-                            actor.lose_card(card)
-                    else:
-                        # Desafio falhou!
-                        if player.cards:
-                            card = player.cards[0]
-                            player.lose_card(card)
-                    return
+            for seat, ai in enumerate(ais):
+                group = [game for game in active
+                         if game.current_player_index == seat and not game.is_game_over()]
+                if not group:
+                    continue
+                actions, targets, _ = ai.choose_actions(group)
+                
+                # Desafios à declaração: só partidas com personagem declarado e desafiante vivo
+                claims = [i for i, action in enumerate(actions) if REQUIRED_CHARACTER[action] >= 0]
+                challenges: List[Dict[str, bool]] = [{} for _ in group]
+                for other, challenger in enumerate(ais):
+                    rows = [i for i in claims if not group[i].players[other].eliminated]
+                    if other == seat or not rows:
+                        continue
+                    mask = challenger.should_challenge_batch(
+                        [group[i] for i in rows], [other] * len(rows), [seat] * len(rows),
+                        actions[rows],
+                    )
+                    for i, challenge in zip(rows, mask):
+                        challenges[i][challenger.name] = bool(challenge)
+                
+                for i, game in enumerate(group):
+                    reactions.preset = challenges[i]
+                    target = game.players[targets[i]] if targets[i] != NO_TARGET else None
+                    game.play_turn(ACTIONS[actions[i]], game.players[seat], target, reactions)
+                    game.next_turn()
+        
+        return [game.get_winner() for game in games]
+    
+    # Confrontos de compare_ai_levels: (chave de semente, dificuldade 1, dificuldade 2)
+    LEVEL_MATCHUPS = ((1, "easy", "medium"), (2, "medium", "hard"), (3, "easy", "hard"))
     
-    def compare_ai_levels(self, num_games: int = 50):
-        """Compara diferentes níveis de IA jogando entre si"""
+    def compare_ai_levels(self, num_games: int = 50, seed: Optional[int] = None,
+                          adaptive: bool = False, confidence: float = 0.95,
+                          margin: float = 0.05):
+        """
+        Compara diferentes níveis de IA jogando entre si
+        
+        Args:
+            num_games: Partidas por comparação (máximo por comparação no modo adaptativo)
+            seed: Semente base
+            adaptive: Encerra cada comparação assim que o SPRT decidir que um
+                lado é mais forte ou que não há diferença dentro da margem
+                (ver match_stats.SPRT)
+            confidence: Confiança exigida do SPRT (alpha = beta = 1 - confidence)
+            margin: Zona de indiferença do SPRT em torno de 50% de vitórias
+        """
+        base_seed = seed if seed is not None else new_base_seed()
+        
         print(f"\n{'='*60}")
         print(f"⚔️ COMPARAÇÃO DE NÍVEIS DE IA")
         print(f"{'='*60}")
-        print(f"Partidas por comparação: {num_games}")
+        if adaptive:
+            print(f"Partidas por comparação: até {num_games} (SPRT, erros α = β = {(1 - confidence)*100:.0f}%, "
+                  f"margem ±{margin*100:.0f}%)")
+        else:
+            print(f"Partidas por comparação: {num_games}")
+        print(f"Semente base: {base_seed}")
         print(f"{'='*60}\n")
         
         # Resultados por comparação
         comparison_results = {}
-        
-        # Easy vs Medium
-        print("🔄 Easy vs Medium...")
-        easy_wins = 0
-        medium_wins = 0
-        for _ in range(num_games):
-            winner = self._play_1v1("easy", "medium")
-            if winner == "easy":
-                easy_wins += 1
-            elif winner == "medium":
-                medium_wins += 1
-        
-        comparison_results["Easy vs Medium"] = {
-            "easy": easy_wins,
-            "medium": medium_wins,
-            "total": num_games
-        }
-        print(f"   ✅ Easy: {easy_wins}/{num_games} ({easy_wins/num_games*100:.1f}%)")
-        print(f"   ✅ Medium: {medium_wins}/{num_games} ({medium_wins/num_games*100:.1f}%)")
-        
-        # Medium vs Hard
-        print("\n🔄 Medium vs Hard...")
-        medium_wins = 0
-        hard_wins = 0
-        for _ in range(num_games):
-            winner = self._play_1v1("medium", "hard")
-            if winner == "medium":
-                medium_wins += 1
-            elif winner == "hard":
-                hard_wins += 1
-        
-        comparison_results["Medium vs Hard"] = {
-            "medium": medium_wins,
-            "hard": hard_wins,
-            "total": num_games
-        }
-        print(f"   ✅ Medium: {medium_wins}/{num_games} ({medium_wins/num_games*100:.1f}%)")
-        print(f"   ✅ Hard: {hard_wins}/{num_games} ({hard_wins/num_games*100:.1f}%)")
-        
-        # Easy vs Hard
-        print("\n🔄 Easy vs Hard...")
-        easy_wins = 0
-        hard_wins = 0
-        for _ in range(num_games):
-            winner = self._play_1v1("easy", "hard")
-            if winner == "easy":
-                easy_wins += 1
-            elif winner == "hard":
-                hard_wins += 1
-        
-        comparison_results["Easy vs Hard"] = {
-            "easy": easy_wins,
-            "hard": hard_wins,
-            "total": num_games
-        }
-        print(f"   ✅ Easy: {easy_wins}/{num_games} ({easy_wins/num_games*100:.1f}%)")
-        print(f"   ✅ Hard: {hard_wins}/{num_games} ({hard_wins/num_games*100:.1f}%)")
+        for key, difficulty1, difficulty2 in self.LEVEL_MATCHUPS:
+            label = f"{difficulty1.capitalize()} vs {difficulty2.capitalize()}"
+            if comparison_results:
+                print()
+            print(f"🔄 {label}...")
+            sprt = SPRT(margin, 1 - confidence, 1 - confidence) if adaptive else None
+            wins = {difficulty1: 0, difficulty2: 0}
+            games = 0
+            while games < num_games:
+                winner = self._play_1v1(difficulty1, difficulty2, derive_seed(base_seed, key, games))
+                games += 1
+                if winner is None:
+                    continue
+                wins[winner] += 1
+                if sprt is not None and sprt.update(winner == difficulty1) is not None:
+                    break
+            
+            comparison_results[label] = dict(wins, total=games)
+            for difficulty in (difficulty1, difficulty2):
+                print(f"   ✅ {difficulty.capitalize()}: {wins[difficulty]}/{games} "
+                      f"({wins[difficulty]/games*100:.1f}%)")
+            if sprt is not None:
+                decision = sprt.decision
+                if decision is None:
+                    verdict = "não decidido no limite de partidas"
+                elif decision == EQUIVALENT:
+                    verdict = f"sem diferença dentro da margem (±{margin*100:.0f}%)"
+                else:
+                    stronger = difficulty1 if decision == FIRST_STRONGER else difficulty2
+                    verdict = f"{stronger.capitalize()} é mais forte"
+                comparison_results[label].update(decision=decision, alpha=sprt.alpha, beta=sprt.beta)
+                print(f"   📏 {verdict} | Partidas usadas: {games}/{num_games} | "
+                      f"SPRT: α = {sprt.alpha*100:.0f}%, β = {sprt.beta*100:.0f}%")
         
         # Resumo geral
         print(f"\n{'='*60}")
@@ -300,18 +457,18 @@ class AITrainer:
         
         print(f"\n📈 EASY:")
         print(f"   Total: {total_easy_wins}/{total_easy_games} vitórias ({total_easy_wins/total_easy_games*100:.1f}%)")
-        print(f"   - vs Medium: {comparison_results['Easy vs Medium']['easy']}/{num_games}")
-        print(f"   - vs Hard: {comparison_results['Easy vs Hard']['easy']}/{num_games}")
+        print(f"   - vs Medium: {comparison_results['Easy vs Medium']['easy']}/{comparison_results['Easy vs Medium']['total']}")
+        print(f"   - vs Hard: {comparison_results['Easy vs Hard']['easy']}/{comparison_results['Easy vs Hard']['total']}")
         
         print(f"\n📈 MEDIUM:")
         print(f"   Total: {total_medium_wins}/{total_medium_games} vitórias ({total_medium_wins/total_medium_games*100:.1f}%)")
-        print(f"   - vs Easy: {comparison_results['Easy vs Medium']['medium']}/{num_games}")
-        print(f"   - vs Hard: {comparison_results['Medium vs Hard']['medium']}/{num_games}")
+        print(f"   - vs Easy: {comparison_results['Easy vs Medium']['medium']}/{comparison_results['Easy vs Medium']['total']}")
+        print(f"   - vs Hard: {comparison_results['Medium vs Hard']['medium']}/{comparison_results['Medium vs Hard']['total']}")
         
         print(f"\n📈 HARD:")
         print(f"   Total: {total_hard_wins}/{total_hard_games} vitórias ({total_hard_wins/total_hard_games*100:.1f}%)")
-        print(f"   - vs Easy: {comparison_results['Easy vs Hard']['hard']}/{num_games}")
-        print(f"   - vs Medium: {comparison_results['Medium vs Hard']['hard']}/{num_games}")
+        print(f"   - vs Easy: {comparison_results['Easy vs Hard']['hard']}/{comparison_results['Easy vs Hard']['total']}")
+        print(f"   - vs Medium: {comparison_results['Medium vs Hard']['hard']}/{comparison_results['Medium vs Hard']['total']}")
         
         print(f"\n💡 CONCLUSÃO:")
         if total_hard_wins/total_hard_games > total_medium_wins/total_medium_games > total_easy_wins/total_easy_games:
@@ -325,12 +482,17 @@ class AITrainer:
         
         return comparison_results
     
-    def _play_1v1(self, difficulty1: str, difficulty2: str) -> Optional[str]:
-        """Joga uma partida 1v1 entre duas IAs"""
-        ai1 = CoupAI(name="IA1", difficulty=difficulty1)
-        ai2 = CoupAI(name="IA2", difficulty=difficulty2)
+    def _play_1v1(self, difficulty1: str, difficulty2: str,
+                  game_seed: Optional[int] = None) -> Optional[str]:
+        """Joga uma partida 1v1 entre duas IAs (reproduzível se game_seed for dado)"""
+        if game_seed is None:
+            game_seed = new_base_seed()
+        ai1 = CoupAI(name="IA1", difficulty=difficulty1, seed=derive_seed(game_seed, 1))
+        ai2 = CoupAI(name="IA2", difficulty=difficulty2, seed=derive_seed(game_seed, 2))
+        
+        game = CoupGame([ai1.name, ai2.name], seed=derive_seed(game_seed, 0))
         
-        game = CoupGame([ai1.name, ai2.name])
+        reactions = AIReactions([ai1, ai2])
         
         max_turns = 200
         for _ in range(max_turns):
@@ -344,32 +506,8 @@ class AITrainer:
             
             ai = ai1 if current.name == ai1.name else ai2
             
-            action, target, is_bluff = ai.choose_action(game, current)
-            game.execute_action(action, current, target, is_bluff)
-            
-            # Reações simples - verifica se há outros jogadores
-            other_players = game.get_other_players(current)
-            if other_players:
-                other = other_players[0]
-                other_ai = ai1 if other.name == ai1.name else ai2
-                
-                if action == Action.FOREIGN_AID:
-                    if other_ai.should_block(game, other, action, current):
-                        if other.has_card(Character.DUKE) or random.random() < 0.5:
-                            current.coins -= 2
-                
-                # Desafios para ações que podem ser desafiadas
-                if action in [Action.TAX, Action.ASSASSINATE, Action.STEAL, Action.EXCHANGE]:
-                    if other_ai.should_challenge(game, other, current, action):
-                        # Processa desafio
-                        if is_bluff:
-                            # Blefe descoberto - perde carta
-                            if current.cards:
-                                current.lose_card(current.cards[0])
-                        else:
-                            # Desafio falhou - quem desafiou perde carta
-                            if other.cards:
-                                other.lose_card(other.cards[0])
+            action, target, _ = ai.choose_action(game, current)
+            game.play_turn(action, current, target, reactions)
             
             game.next_turn()
             
@@ -380,11 +518,23 @@ class AITrainer:
         winner = game.get_winner()
         return difficulty1 if winner and winner.name == ai1.name else difficulty2 if winner else None
     
-    def train_with_learning(self, num_games: int = 100):
-        """Treina IA com sistema de aprendizado adaptativo PERSISTENTE"""
+    def train_with_learning(self, num_games: int = 100, seed: Optional[int] = None,
+                            workers: Optional[int] = 1, generation_size: Optional[int] = None):
+        """
+        Treina IA com sistema de aprendizado adaptativo PERSISTENTE
+        
+        Args:
+            workers, generation_size: Treino paralelo em gerações (ver train_ai)
+        """
+        base_seed = seed if seed is not None else new_base_seed()
+        workers, generation_size = self._parallel_settings(workers, generation_size)
+        
         print(f"\n{'='*60}")
         print(f"🧠 TREINAMENTO COM APRENDIZADO ADAPTATIVO")
         print(f"{'='*60}")
+        print(f"Semente base: {base_seed}")
+        if workers > 1:
+            print(f"Processos: {workers} | Partidas por geração: {generation_size}")
         
         # Mostra conhecimento prévio
         if self.learning.learning_data["total_games"] > 0:
@@ -394,21 +544,10 @@ class AITrainer:
         
         wins = 0
         
-        for game_num in range(1, num_games + 1):
-            # Carrega parâmetros aprendidos (atualizados a cada partida)
-            learned_params = self.learning.get_strategy_params()
-            
-            # Joga partida individual
-            trained_ai = CoupAI(name="IA_Treinada", difficulty="hard", learning_params=learned_params)
-            opponents = [
-                CoupAI(name="Oponente_1", difficulty="medium"),
-                CoupAI(name="Oponente_2", difficulty="easy")
-            ]
-            
-            game = CoupGame([trained_ai.name, opponents[0].name, opponents[1].name])
-            winner = self._play_game(game, trained_ai, opponents)
-            
-            won = winner and winner.name == trained_ai.name
+        # Parâmetros aprendidos são atualizados a cada geração (padrão: a cada partida)
+        generations = self._play_generations(num_games, base_seed, "hard", ["medium", "easy"],
+                                             workers, generation_size)
+        for game_num, won in (outcome for outcomes in generations for outcome in outcomes):
             if won:
                 wins += 1
             
@@ -439,6 +578,220 @@ class AITrainer:
         
         return self.learning.get_strategy_params()
 
+    # Partidas por lote de play_batch em evolve_params
+    EVOLVE_BATCH_SIZE = 25
+    
+    def evolve_params(self, population_size: int = 16, generations: int = 10,
+                      games_per_candidate: int = 100,
+                      opponent_difficulties: List[str] = ["medium", "easy"],
+                      seed: Optional[int] = None, workers: Optional[int] = None,
+                      elite: int = 4, mutation_scale: float = 0.1) -> Dict[str, float]:
+        """
+        Busca evolutiva sobre os seis parâmetros de aprendizado da IA hard
+        
+        A população começa nos parâmetros aprendidos e em mutações deles. Em
+        cada geração todos os candidatos jogam as mesmas partidas semeadas
+        (mesmas cartas e oponentes, a comparação só mede os parâmetros), os
+        `elite` melhores sobrevivem e o resto é refeito cruzando e mutando a
+        elite. O melhor conjunto até agora (de início, os parâmetros
+        aprendidos) também joga as partidas de cada geração, e só é trocado,
+        e gravado no AILearning, por um candidato que o vença nelas.
+        
+        As partidas de um candidato são jogadas em lotes de EVOLVE_BATCH_SIZE
+        (play_batch, decisões vetorizadas); o tamanho fixo dos lotes deixa o
+        resultado igual para qualquer número de processos.
+        
+        Args:
+            population_size: Candidatos por geração
+            generations: Número de gerações
+            games_per_candidate: Partidas de cada candidato por geração
+            opponent_difficulties: Dificuldades dos oponentes da IA hard
+            seed: Semente base (partidas e mutações)
+            workers: Processos que jogam as partidas (None = todos os núcleos)
+            elite: Candidatos mantidos de uma geração para a seguinte
+            mutation_scale: Desvio padrão do ruído gaussiano das mutações
+        
+        Returns:
+            Melhores parâmetros encontrados em todas as gerações
+        """
+        base_seed = seed if seed is not None else new_base_seed()
+        workers, _ = self._parallel_settings(workers, None)
+        elite = max(1, min(elite, population_size))
+        rng = random.Random(derive_seed(base_seed, 0))  # Geração 0: mutações
+        
+        print(f"\n{'='*60}")
+        print(f"🧬 BUSCA EVOLUTIVA DE PARÂMETROS")
+        print(f"{'='*60}")
+        print(f"População: {population_size} | Gerações: {generations} | "
+              f"Partidas por candidato: {games_per_candidate}")
+        print(f"Oponentes: {opponent_difficulties} | Processos: {workers}")
+        print(f"Semente base: {base_seed}")
+        print(f"{'='*60}\n")
+        
+        start = self.learning.get_strategy_params()
+        population = [start] + [_mutate_params(start, rng, mutation_scale)
+                                for _ in range(population_size - 1)]
+        best_params, best_rate = start, 0.0
+        improved = False
+        
+        pool = ProcessPoolExecutor(workers) if workers > 1 else None
+        try:
+            for generation in range(1, generations + 1):
+                # Mesmas sementes para todos os candidatos da geração
+                seeds = [derive_seed(base_seed, generation, game_num)
+                         for game_num in range(games_per_candidate)]
+                chunks = [seeds[i:i + self.EVOLVE_BATCH_SIZE]
+                          for i in range(0, len(seeds), self.EVOLVE_BATCH_SIZE)]
+                ai_seeds = [derive_seed(base_seed, 0, generation, chunk) for chunk in range(len(chunks))]
+                # O melhor até agora joga as mesmas partidas, mesmo fora da população
+                candidates = population if any(params is best_params for params in population) \
+                    else population + [best_params]
+                tasks = [(params, chunk, ai_seed) for params in candidates
+                         for chunk, ai_seed in zip(chunks, ai_seeds)]
+                args = (
+                    [chunk for _, chunk, _ in tasks], repeat("hard"), repeat(opponent_difficulties),
+                    [params for params, _, _ in tasks], [ai_seed for _, _, ai_seed in tasks],
+                )
+                if pool is None:
+                    batches = list(map(_play_training_batch, *args))
+                else:
+                    batches = list(pool.map(_play_training_batch, *args))
+                winners = [winner for batch in batches for winner in batch]
+                
+                rates = [
+                    sum(winner == TRAINED_AI_NAME for winner in winners[i:i + games_per_candidate])
+                    / games_per_candidate
+                    for i in range(0, len(winners), games_per_candidate)
+                ]
+                ranking = sorted(range(population_size), key=lambda i: -rates[i])
+                leader, leader_rate = population[ranking[0]], rates[ranking[0]]
+                incumbent_rate = next(rate for params, rate in zip(candidates, rates) if params is best_params)
+                
+                print(f"Geração {generation}/{generations} | Melhor: {leader_rate*100:.1f}% | "
+                      f"Média: {sum(rates[:population_size]) / population_size*100:.1f}% | "
+                      f"Atual: {incumbent_rate*100:.1f}%")
+                if leader is not best_params and leader_rate > incumbent_rate:
+                    best_params, best_rate = leader, leader_rate
+                    self.learning.set_strategy_params(best_params, best_rate)
+                    self.learning.save_learning()
+                    print("   Novo melhor: " + ", ".join(f"{key}={value:.2f}"
+                                                       for key, value in best_params.items()))
+                    improved = True
+                else:
+                    best_rate = incumbent_rate
+                
+                # Seleção: elite sobrevive; filhos cruzam dois pais da elite e sofrem mutação
+                parents = [population[i] for i in ranking[:elite]]
+                children = []
+                for _ in range(population_size - elite):
+                    mother, father = rng.choice(parents), rng.choice(parents)
+                    child = {key: (mother if rng.random() < 0.5 else father)[key] for key in mother}
+                    children.append(_mutate_params(child, rng, mutation_scale))
+                population = parents + children
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        
+        print(f"\n✅ Busca concluída! Melhor taxa de vitória: {best_rate*100:.1f}%")
+        if improved:
+            print(f"   💾 Parâmetros salvos em: {self.learning.LEARNING_FILE}")
+        else:
+            print("   Nenhum candidato superou os parâmetros aprendidos")
+        print(f"{'='*60}\n")
+        return dict(best_params)
+
+    def paired_compare(self, difficulty_a: str = "hard", difficulty_b: str = "hard",
+                       params_a: Optional[Dict] = None, params_b: Optional[Dict] = None,
+                       num_deals: int = 200, opponent_difficulties: List[str] = ["medium"],
+                       seed: Optional[int] = None, workers: Optional[int] = 1) -> PairedDifference:
+        """
+        Compara dois candidatos com números aleatórios comuns
+        
+        Em cada distribuição semeada, A e B jogam contra os mesmos oponentes
+        com as mesmas cartas, uma vez em cada assento (assentos trocados), e
+        a diferença é medida por distribuição. A sorte das cartas e do assento
+        se cancela no par, então o erro padrão cai bem mais rápido que jogando
+        partidas independentes.
+        
+        Args:
+            difficulty_a, difficulty_b: Dificuldades dos candidatos
+            params_a, params_b: learning_params dos candidatos (None = padrão)
+            num_deals: Distribuições (pares); cada uma joga 2 x assentos partidas
+            opponent_difficulties: Oponentes da mesa (1 = duelo com troca de assento)
+            seed: Semente base
+            workers: Processos que jogam as distribuições (None = todos os núcleos)
+        
+        Returns:
+            PairedDifference da taxa de vitória de A menos a de B
+        """
+        base_seed = seed if seed is not None else new_base_seed()
+        workers, _ = self._parallel_settings(workers, None)
+        candidates = [(difficulty_a, params_a), (difficulty_b, params_b)]
+        seeds = [derive_seed(base_seed, deal) for deal in range(num_deals)]
+        
+        print(f"\n{'='*60}")
+        print(f"⚖️ AVALIAÇÃO PAREADA")
+        print(f"{'='*60}")
+        print(f"A: {difficulty_a} {params_a or '(parâmetros padrão)'}")
+        print(f"B: {difficulty_b} {params_b or '(parâmetros padrão)'}")
+        print(f"Oponentes: {opponent_difficulties} | Distribuições: {num_deals} "
+              f"({num_deals * 2 * (len(opponent_difficulties) + 1)} partidas)")
+        print(f"Semente base: {base_seed}")
+        print(f"{'='*60}\n")
+        
+        if workers > 1:
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(_play_paired_deal, seeds, repeat(candidates),
+                                        repeat(opponent_difficulties),
+                                        chunksize=max(1, num_deals // (workers * 4))))
+        else:
+            results = [_play_paired_deal(deal_seed, candidates, opponent_difficulties)
+                       for deal_seed in seeds]
+        
+        scores_a = [a for a, _ in results]
+        scores_b = [b for _, b in results]
+        difference = paired_difference(scores_a, scores_b)
+        print(f"Vitórias A: {sum(scores_a) / num_deals*100:.1f}% | B: {sum(scores_b) / num_deals*100:.1f}%")
+        print(f"Diferença A - B: {difference.mean*100:+.1f} pontos percentuais "
+              f"± {difference.standard_error*100:.1f} (erro padrão, {difference.z:+.1f} EP)")
+        print(f"Sem pareamento o erro seria ± {difference.unpaired_standard_error*100:.1f} "
+              f"({difference.variance_reduction:.1f}x mais partidas para a mesma precisão)")
+        print(f"{'='*60}\n")
+        return difference
+
+    def sweep_parameter(self, param: str, values: List[float], games_per_value: int = 1000,
+                        opponent_difficulties: List[str] = ["medium", "easy"]) -> Dict[float, float]:
+        """
+        Varre valores de um parâmetro de aprendizado com o simulador em lote (NumPy)
+        
+        Args:
+            param: Chave de learning_params (ex: "bluff_probability")
+            values: Valores a testar
+            games_per_value: Partidas por valor
+            opponent_difficulties: Dificuldades dos oponentes da IA hard
+        """
+        print(f"\n{'='*60}")
+        print(f"🔬 VARREDURA DE PARÂMETRO: {param}")
+        print(f"{'='*60}")
+        print(f"Valores: {values} | Partidas por valor: {games_per_value}")
+        
+        results = sweep_learning_param(param, values, games_per_value,
+                                       ["hard"] + list(opponent_difficulties))
+        
+        for value, win_rate in results.items():
+            print(f"   {param}={value:.2f}: {win_rate*100:.1f}% vitórias")
+        
+        best = max(results, key=results.get)
+        print(f"\n💡 Melhor valor: {best:.2f} ({results[best]*100:.1f}%)")
+        print(f"{'='*60}\n")
+        
+        return results
+
+def _ask_workers() -> int:
+    """Pergunta quantos processos usar no treino (1 = serial, aprende a cada partida)"""
+    cores = os.cpu_count() or 1
+    return int(input(f"Processos paralelos? (padrão: 1, máximo útil: {cores}): ").strip() or "1")
+
 def main_trainer():
     """Menu principal do treinador"""
     trainer = AITrainer()
@@ -453,29 +806,31 @@ def main_trainer():
     print("4. Comparar níveis de IA (Easy vs Medium vs Hard)")
     print("5. Treinamento com aprendizado adaptativo")
     print("6. Ver estatísticas de aprendizado")
-    print("7. Sair")
+    print("7. Busca evolutiva de parâmetros")
+    print("8. Sair")
     
     choice = input("\nEscolha: ").strip()
     
     if choice == "1":
         num = int(input("Quantas partidas? (padrão: 100): ").strip() or "100")
-        trainer.train_ai(num, "hard", ["easy", "easy"])
+        trainer.train_ai(num, "hard", ["easy", "easy"], workers=_ask_workers())
     
     elif choice == "2":
         num = int(input("Quantas partidas? (padrão: 100): ").strip() or "100")
-        trainer.train_ai(num, "hard", ["medium", "medium"])
+        trainer.train_ai(num, "hard", ["medium", "medium"], workers=_ask_workers())
     
     elif choice == "3":
         num = int(input("Quantas partidas? (padrão: 100): ").strip() or "100")
-        trainer.train_ai(num, "hard", ["easy", "medium"])
+        trainer.train_ai(num, "hard", ["easy", "medium"], workers=_ask_workers())
     
     elif choice == "4":
         num = int(input("Quantas partidas por comparação? (padrão: 50): ").strip() or "50")
-        trainer.compare_ai_levels(num)
+        adaptive = input("Parar cada comparação quando decidida (SPRT)? (s/N): ").strip().lower() == "s"
+        trainer.compare_ai_levels(num, adaptive=adaptive)
     
     elif choice == "5":
         num = int(input("Quantas partidas? (padrão: 100): ").strip() or "100")
-        trainer.train_with_learning(num)
+        trainer.train_with_learning(num, workers=_ask_workers())
     
     elif choice == "6":
         trainer.learning.print_stats()
@@ -483,6 +838,13 @@ def main_trainer():
         main_trainer()
     
     elif choice == "7":
+        gens = int(input("Quantas gerações? (padrão: 10): ").strip() or "10")
+        games = int(input("Partidas por candidato? (padrão: 100): ").strip() or "100")
+        cores = os.cpu_count() or 1
+        workers = int(input(f"Processos paralelos? (padrão: {cores}): ").strip() or str(cores))
+        trainer.evolve_params(generations=gens, games_per_candidate=games, workers=workers)
+    
+    elif choice == "8":
         print("Até logo!")
     
     else:
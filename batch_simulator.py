@@ -0,0 +1,774 @@
+"""
+Simulador em lote do Coup com NumPy
+Avança N partidas ao mesmo tempo, um turno por passo vetorizado
+"""
+import random
+from typing import List, Dict, Optional, Union
+import numpy as np
+from compact_state import (
+    NUM_CHARACTERS, COPIES_PER_CHARACTER, REQUIRED_CHARACTER,
+    INCOME, FOREIGN_AID, COUP, TAX, ASSASSINATE, STEAL, EXCHANGE,
+    DUKE, ASSASSIN, CAPTAIN, AMBASSADOR, CONTESSA,
+    COUP_COST, ASSASSINATE_COST, BLOCKING_CHARACTERS,
+)
+from hand_probability import probability_arrays
+from opponent_model import PRIOR_CHALLENGE_RATE
+
+# Códigos das políticas (mesmas dificuldades de CoupAI)
+EASY, MEDIUM, HARD = range(3)
+POLICY_CODES = {"easy": EASY, "medium": MEDIUM, "hard": HARD}
+
+# Mesmos padrões de CoupAI.DEFAULT_LEARNING_PARAMS
+DEFAULT_LEARNING_PARAMS = {
+    "bluff_probability": 0.4,
+    "challenge_aggressiveness": 0.5,
+    "block_probability": 0.7,
+    "tax_preference": 0.8,
+    "steal_preference": 0.6,
+    "assassinate_preference": 0.5,
+}
+# Ações de personagem do hard (CoupAI.POWER_PREFERENCES)
+POWER_PREFERENCES = (
+    (TAX, "tax_preference"),
+    (STEAL, "steal_preference"),
+    (ASSASSINATE, "assassinate_preference"),
+)
+
+# Personagem exigido por ação, como array (-1 = nenhum)
+_REQUIRED = np.array(REQUIRED_CHARACTER, dtype=np.int8)
+_CLAIM_ACTIONS = np.zeros(len(REQUIRED_CHARACTER), dtype=bool)
+_CLAIM_ACTIONS[[TAX, ASSASSINATE, STEAL, EXCHANGE]] = True
+# Personagens que bloqueiam cada ação, como máscara (ação, personagem)
+_BLOCKERS = np.zeros((len(BLOCKING_CHARACTERS), NUM_CHARACTERS), dtype=bool)
+for _code, _chars in enumerate(BLOCKING_CHARACTERS):
+    _BLOCKERS[_code, list(_chars)] = True
+# Chance de blefar bloqueio de roubo por unidade de block_probability
+# (mesmo valor de CoupAI.BLUFF_BLOCK_PER_BLOCK_PROBABILITY)
+BLUFF_BLOCK_PER_BLOCK_PROBABILITY = 0.3 / 0.7
+
+
+# ----------------------------------------------------------------------
+# Auxiliares vetorizados
+# ----------------------------------------------------------------------
+
+def sample_cards(counts: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Sorteia um personagem por linha, ponderado pelas contagens
+
+    Args:
+        counts: Array (M, 5) com contagens não negativas (soma > 0 por linha)
+    """
+    total = counts.sum(axis=1)
+    r = (rng.random(len(counts)) * total).astype(np.int64)
+    cumulative = np.cumsum(counts, axis=1)
+    return np.argmax(cumulative > r[:, None], axis=1)
+
+
+def others_mask(alive: np.ndarray, actor: np.ndarray) -> np.ndarray:
+    """Oponentes vivos de cada ator (M, P)"""
+    others = alive.copy()
+    others[np.arange(len(actor)), actor] = False
+    return others
+
+
+def danger_scores(coins: np.ndarray, hands: np.ndarray, others: np.ndarray,
+                  assassin_probability: Union[float, np.ndarray] = 0.3) -> np.ndarray:
+    """Mesmo cálculo de DecisionContext.danger: moedas*2 + cartas*3 + P(Assassino)*5"""
+    scores = coins * 2.0 + hands.sum(axis=2) * 3.0 + np.asarray(assassin_probability) * 5.0
+    return np.where(others, scores, -np.inf)
+
+
+def richest_target(coins: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """Oponente com mais moedas (primeiro em caso de empate, como max())"""
+    return np.argmax(np.where(others, coins, -1), axis=1)
+
+
+def most_cards_target(hands: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """Oponente com mais cartas (primeiro em caso de empate)"""
+    return np.argmax(np.where(others, hands.sum(axis=2), -1), axis=1)
+
+
+def random_target(others: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Oponente vivo escolhido ao acaso"""
+    return np.argmax(np.where(others, rng.random(others.shape), -1.0), axis=1)
+
+
+def steal_targets(coins: np.ndarray, others: np.ndarray,
+                  captain_probability: Union[float, np.ndarray] = 0.3) -> np.ndarray:
+    """
+    Alvo de roubo do CoupAI hard (_find_safe_steal_target)
+
+    Seguros são os oponentes com moedas e P(Capitão) < 0.4, ordenados por
+    moedas crescentes e depois pela maior P(Capitão); sem nenhum seguro, cai
+    para o mais rico. Com a probabilidade padrão todos com moedas são seguros.
+    """
+    captain_probability = np.broadcast_to(np.asarray(captain_probability, dtype=float), coins.shape)
+    safe = others & (coins >= 1) & (captain_probability < 0.4)
+    # Moedas inteiras e probabilidade < 0.4: a ordem (moedas, -P) vira um único número
+    best = np.argmin(np.where(safe, coins - captain_probability, np.inf), axis=1)
+    return np.where(safe.any(axis=1), best, richest_target(coins, others))
+
+
+def vulnerable_targets(others: np.ndarray, draws: "PolicyDraws", mask: np.ndarray,
+                       contessa_probability: Union[float, np.ndarray] = 0.3) -> np.ndarray:
+    """
+    Alvo de assassinato do CoupAI hard (_find_vulnerable_target)
+
+    O oponente com menor P(Condessa) abaixo de 0.4 (o primeiro, com
+    probabilidades iguais); sem nenhum, um oponente ao acaso. Só as linhas
+    de mask sorteiam.
+    """
+    contessa_probability = np.broadcast_to(np.asarray(contessa_probability, dtype=float), others.shape)
+    vulnerable = others & (contessa_probability < 0.4)
+    best = np.argmin(np.where(vulnerable, contessa_probability, np.inf), axis=1)
+    fallback = mask & ~vulnerable.any(axis=1)
+    return np.where(fallback, draws.choice(others, fallback), best)
+
+
+# ----------------------------------------------------------------------
+# Sorteios das políticas
+# ----------------------------------------------------------------------
+
+class ArrayDraws:
+    """Sorteios com um gerador NumPy: um valor para cada linha, vetorizado"""
+
+    def __init__(self, rng: np.random.Generator):
+        self.rng = rng
+
+    def random(self, mask: np.ndarray) -> np.ndarray:
+        """Uniforme em [0, 1) por linha (só as linhas de mask são usadas)"""
+        return self.rng.random(len(mask))
+
+    def choice(self, candidates: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Coluna ao acaso entre as candidatas de cada linha"""
+        return random_target(candidates, self.rng)
+
+
+class SequentialDraws:
+    """
+    Sorteios com um random.Random, linha a linha e só nas linhas de mask
+
+    Consome o gerador com random() e choice() como as estratégias de CoupAI,
+    na ordem em que elas sorteiam: uma partida decidida pela política em
+    lote tem a mesma decisão que a estratégia escalar com o mesmo gerador.
+    """
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def random(self, mask: np.ndarray) -> np.ndarray:
+        values = np.ones(len(mask))
+        for i in np.nonzero(mask)[0]:
+            values[i] = self.rng.random()
+        return values
+
+    def choice(self, candidates: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        chosen = np.full(len(mask), -1)
+        for i in np.nonzero(mask)[0]:
+            chosen[i] = self.rng.choice(np.nonzero(candidates[i])[0].tolist())
+        return chosen
+
+
+PolicyDraws = Union[ArrayDraws, SequentialDraws]
+
+
+def policy_draws(rng: Union[np.random.Generator, random.Random]) -> PolicyDraws:
+    """Sorteios das políticas a partir de um gerador NumPy ou de um random.Random"""
+    if isinstance(rng, np.random.Generator):
+        return ArrayDraws(rng)
+    return SequentialDraws(rng)
+
+
+def _param(params: Optional[Dict], key: str, count: int) -> np.ndarray:
+    """Parâmetro de aprendizado por partida (escalar ou array de params, ou o padrão)"""
+    value = (params or {}).get(key, DEFAULT_LEARNING_PARAMS[key])
+    return np.broadcast_to(np.asarray(value, dtype=float), (count,))
+
+
+# ----------------------------------------------------------------------
+# Políticas de CoupAI em forma de arrays
+# ----------------------------------------------------------------------
+
+def easy_policy(coins: np.ndarray, hands: np.ndarray, alive: np.ndarray, actor: np.ndarray,
+                rng, params: Optional[Dict] = None):
+    """Versão vetorizada de CoupAI._easy_strategy. Retorna (ações, alvos)."""
+    draws = policy_draws(rng)
+    count = len(actor)
+    rows = np.arange(count)
+    others = others_mask(alive, actor)
+    my_coins = coins[rows, actor]
+
+    action = np.full(count, INCOME)
+    target = np.full(count, -1)
+
+    coup = (my_coins >= COUP_COST) & others.any(axis=1)
+    action[coup] = COUP
+    target[coup] = draws.choice(others, coup)[coup]
+
+    rest = ~coup
+    action[rest & (draws.random(rest) < 0.7)] = FOREIGN_AID
+    return action, target
+
+
+def medium_policy(coins: np.ndarray, hands: np.ndarray, alive: np.ndarray, actor: np.ndarray,
+                  rng, params: Optional[Dict] = None):
+    """Versão vetorizada de CoupAI._medium_strategy. Retorna (ações, alvos)."""
+    draws = policy_draws(rng)
+    count = len(actor)
+    rows = np.arange(count)
+    others = others_mask(alive, actor)
+    my_coins = coins[rows, actor]
+    my_hand = hands[rows, actor]
+
+    action = np.full(count, INCOME)
+    target = np.full(count, -1)
+    decided = ~others.any(axis=1)
+
+    richest = richest_target(coins, others)
+    rich_has_coins = coins[rows, richest] >= 1
+
+    def choose(mask, chosen_action, chosen_target=None):
+        mask = mask & ~decided
+        action[mask] = chosen_action
+        if chosen_target is not None:
+            target[mask] = chosen_target[mask]
+        decided[mask] = True
+
+    choose(my_coins >= COUP_COST, COUP, most_cards_target(hands, others))
+    choose((my_hand[:, DUKE] > 0) & (my_coins < 6), TAX)
+    choose((my_hand[:, CAPTAIN] > 0) & rich_has_coins, STEAL, richest)
+    assassinate = ~decided & (my_hand[:, ASSASSIN] > 0) & (my_coins >= ASSASSINATE_COST)
+    choose(assassinate, ASSASSINATE, draws.choice(others, assassinate))
+
+    # Blefe ocasional (30%): metade Duque, metade Capitão no mais rico
+    undecided = ~decided
+    bluff = undecided & (draws.random(undecided) < 0.3)
+    bluff_tax = bluff & (draws.random(bluff) < 0.5)
+    choose(bluff_tax, TAX)
+    choose(bluff & ~bluff_tax & rich_has_coins, STEAL, richest)
+
+    undecided = ~decided
+    choose(undecided & (draws.random(undecided) < 0.6), FOREIGN_AID)
+    return action, target
+
+
+def hard_policy(coins: np.ndarray, hands: np.ndarray, alive: np.ndarray, actor: np.ndarray,
+                rng, params: Optional[Dict] = None,
+                probabilities: Optional[np.ndarray] = None,
+                challenge_rate: Optional[np.ndarray] = None):
+    """
+    Versão vetorizada de CoupAI._hard_strategy. Retorna (ações, alvos).
+
+    params tem as chaves de DEFAULT_LEARNING_PARAMS, escalares ou por partida
+    (array M): as preferências ordenam Tax/Steal/Assassinate e
+    bluff_probability dá a chance de blefe. probabilities (M, P, 5) é a
+    chance de cada jogador ter cada personagem, do ponto de vista do ator;
+    sem ela, usa 0.3 para todos. challenge_rate (M) é a maior taxa de
+    desafio dos oponentes (OpponentModel) e ajusta o blefe como no CoupAI;
+    sem ela, vale a taxa a priori.
+    """
+    draws = policy_draws(rng)
+    count = len(actor)
+    rows = np.arange(count)
+    others = others_mask(alive, actor)
+    my_coins = coins[rows, actor]
+    my_hand = hands[rows, actor]
+
+    action = np.full(count, INCOME)
+    target = np.full(count, -1)
+    decided = ~others.any(axis=1)
+
+    def choose(mask, chosen_action, chosen_target=None):
+        mask = mask & ~decided
+        action[mask] = chosen_action
+        if chosen_target is not None:
+            target[mask] = chosen_target[mask]
+        decided[mask] = True
+
+    if probabilities is None:
+        assassin = captain = contessa = 0.3
+    else:
+        assassin, captain, contessa = (probabilities[:, :, c] for c in (ASSASSIN, CAPTAIN, CONTESSA))
+
+    most_dangerous = np.argmax(danger_scores(coins, hands, others, assassin), axis=1)
+    choose(my_coins >= COUP_COST, COUP, most_dangerous)
+
+    # Poderes com a carta, na ordem decrescente das preferências (empate: ordem de POWER_PREFERENCES)
+    preferences = np.stack([_param(params, key, count) for _, key in POWER_PREFERENCES], axis=1)
+    order = np.argsort(-preferences, axis=1, kind="stable")
+    can_use = {
+        TAX: (my_hand[:, DUKE] > 0) & (my_coins < 6),
+        STEAL: my_hand[:, CAPTAIN] > 0,
+        ASSASSINATE: (my_hand[:, ASSASSIN] > 0) & (my_coins >= ASSASSINATE_COST),
+    }
+    for slot in range(len(POWER_PREFERENCES)):
+        for index, (power, _) in enumerate(POWER_PREFERENCES):
+            mask = ~decided & (order[:, slot] == index) & can_use[power]
+            if not mask.any():
+                continue
+            if power == STEAL:
+                choose(mask, STEAL, steal_targets(coins, others, captain))
+            elif power == ASSASSINATE:
+                choose(mask, ASSASSINATE, vulnerable_targets(others, draws, mask, contessa))
+            else:
+                choose(mask, power)
+
+    # Blefe inteligente: Capitão no mais rico (2+ moedas), senão Duque. Mesa
+    # que desafia mais que o esperado pede menos blefes (e vice-versa)
+    bluff_prob = _param(params, "bluff_probability", count)
+    if challenge_rate is not None:
+        bluff_prob = bluff_prob * ((1 - np.asarray(challenge_rate)) / (1 - PRIOR_CHALLENGE_RATE))
+    can_bluff = ~decided & (my_coins >= 3)
+    bluff = can_bluff & (draws.random(can_bluff) < bluff_prob)
+    richest = richest_target(coins, others)
+    rich_target = coins[rows, richest] >= 2
+    choose(bluff & rich_target, STEAL, richest)
+    choose(bluff, TAX)
+
+    undecided = ~decided
+    choose(undecided & (draws.random(undecided) < 0.7), FOREIGN_AID)
+    return action, target
+
+
+POLICIES = {EASY: easy_policy, MEDIUM: medium_policy, HARD: hard_policy}
+
+
+def policy_actions(policy: int, coins: np.ndarray, hands: np.ndarray, alive: np.ndarray,
+                   actor: np.ndarray, rng, params: Dict,
+                   deck: Optional[np.ndarray] = None,
+                   probabilities: Optional[np.ndarray] = None,
+                   challenge_rate: Optional[np.ndarray] = None):
+    """
+    Ações e alvos de um lote de atores com a política indicada
+
+    rng é um gerador NumPy (sorteios vetorizados) ou um random.Random
+    (mesmos sorteios das estratégias de CoupAI, ver SequentialDraws). O hard
+    usa probabilities se vier (crenças do ator); senão, com deck (baralho de
+    cada partida), as probabilidades hipergeométricas exatas.
+    """
+    if policy == HARD:
+        if probabilities is None and deck is not None:
+            probabilities = probability_arrays(deck, hands, actor)
+        return hard_policy(coins, hands, alive, actor, rng, params, probabilities, challenge_rate)
+    return POLICIES[policy](coins, hands, alive, actor, rng, params)
+
+
+def challenge_probabilities(policy: np.ndarray, challenger_coins: np.ndarray,
+                            challenger_cards: np.ndarray, action: np.ndarray,
+                            aggressiveness: Union[float, np.ndarray],
+                            bluff_factor: Union[float, np.ndarray] = 1.0) -> np.ndarray:
+    """
+    Versão vetorizada de CoupAI.should_challenge (probabilidade de desafiar)
+
+    Args:
+        bluff_factor: Taxa de blefe do declarante sobre a taxa a priori
+            (OpponentModel do desafiante); só o hard usa
+    """
+    agg = np.broadcast_to(np.asarray(aggressiveness, dtype=float), policy.shape)
+    hard = np.where(challenger_cards == 1, 0.2 + agg * 0.2, agg)
+    dangerous = ((action == ASSASSINATE) | (action == STEAL)) & (challenger_coins < 2)
+    hard = np.where(dangerous, 0.4 + agg * 0.4, hard) * bluff_factor
+    return np.select([policy == EASY, policy == MEDIUM], [0.2, 0.4], hard)
+
+
+def block_challenge_probabilities(policy: np.ndarray, challenger_cards: np.ndarray,
+                                  held: np.ndarray, aggressiveness: Union[float, np.ndarray],
+                                  bluff_factor: Union[float, np.ndarray] = 1.0) -> np.ndarray:
+    """
+    Versão vetorizada de CoupAI.should_challenge_block (probabilidade de desafiar)
+
+    Args:
+        held: Cópias dos personagens de bloqueio na mão do desafiante
+        bluff_factor: Taxa de blefe do bloqueador sobre a taxa a priori
+            (OpponentModel do desafiante); só o hard usa
+    """
+    agg = np.broadcast_to(np.asarray(aggressiveness, dtype=float), policy.shape)
+    hard = agg * 0.5 + held * 0.2
+    hard = np.where(challenger_cards == 1, hard * 0.5, hard) * bluff_factor
+    return np.select([policy == EASY, policy == MEDIUM], [0.1, 0.2], hard)
+
+
+# ----------------------------------------------------------------------
+# Simulador
+# ----------------------------------------------------------------------
+
+class BatchSimulator:
+    """
+    N partidas de Coup guardadas como arrays NumPy
+
+    Cada assento usa uma dificuldade fixa de CoupAI. Reações seguem a ordem
+    de CoupGame.play_turn: desafio da declaração, bloqueio, desafio do
+    bloqueio, e só então o efeito da ação. Quem vence um desafio devolve a
+    carta mostrada ao baralho e compra outra.
+    """
+
+    def __init__(self, num_games: int, difficulties: List[str],
+                 learning_params: Optional[Dict[str, Union[float, np.ndarray]]] = None,
+                 seed: Optional[int] = None, max_turns: int = 200):
+        """
+        Args:
+            num_games: Número de partidas simultâneas
+            difficulties: Dificuldade de cada assento ("easy", "medium", "hard")
+            learning_params: Parâmetros das IAs hard; cada valor pode ser escalar
+                ou um array com um valor por partida (varredura de parâmetros)
+            seed: Semente do gerador aleatório
+            max_turns: Limite de turnos por partida
+        """
+        if len(difficulties) < 2:
+            raise ValueError("Precisa de pelo menos 2 jogadores")
+
+        self.num_games = num_games
+        self.num_players = len(difficulties)
+        self.seat_policy = np.array([POLICY_CODES[d] for d in difficulties], dtype=np.int8)
+        self.learning_params = dict(DEFAULT_LEARNING_PARAMS)
+        if learning_params:
+            self.learning_params.update(learning_params)
+        self.max_turns = max_turns
+        self.rng = np.random.default_rng(seed)
+
+        shape = (num_games, self.num_players)
+        self.coins = np.full(shape, 2, dtype=np.int32)
+        self.hands = np.zeros(shape + (NUM_CHARACTERS,), dtype=np.int8)
+        self.deck = np.full((num_games, NUM_CHARACTERS), COPIES_PER_CHARACTER, dtype=np.int8)
+        self.alive = np.ones(shape, dtype=bool)
+        self.current = np.zeros(num_games, dtype=np.int64)
+        self.turns = np.zeros(num_games, dtype=np.int32)
+        self.done = np.zeros(num_games, dtype=bool)
+        self.winner = np.full(num_games, -1, dtype=np.int64)
+
+        self._deal_cards()
+
+    def _params_for(self, games: np.ndarray) -> Dict[str, Union[float, np.ndarray]]:
+        """Parâmetros de aprendizado restritos a um subconjunto de partidas"""
+        params = {}
+        for key, value in self.learning_params.items():
+            value = np.asarray(value)
+            params[key] = value[games] if value.ndim else float(value)
+        return params
+
+    def _draw(self, games: np.ndarray) -> np.ndarray:
+        """Compra uma carta do baralho de cada partida indicada"""
+        cards = sample_cards(self.deck[games], self.rng)
+        self.deck[games, cards] -= 1
+        return cards
+
+    def _deal_cards(self):
+        """Distribui 2 cartas para cada jogador"""
+        games = np.arange(self.num_games)
+        for player in range(self.num_players):
+            for _ in range(2):
+                cards = self._draw(games)
+                self.hands[games, player, cards] += 1
+
+    def _lose_random_card(self, games: np.ndarray, players: np.ndarray):
+        """Jogadores indicados perdem uma carta aleatória"""
+        if len(games) == 0:
+            return
+        cards = sample_cards(self.hands[games, players], self.rng)
+        self.hands[games, players, cards] -= 1
+        self.alive[games, players] = self.hands[games, players].sum(axis=1) > 0
+
+    def _replace_revealed(self, games: np.ndarray, players: np.ndarray, cards: np.ndarray):
+        """Cartas mostradas em desafios voltam ao baralho e os jogadores compram outras"""
+        if len(games) == 0:
+            return
+        self.hands[games, players, cards] -= 1
+        self.deck[games, cards] += 1
+        drawn = self._draw(games)
+        self.hands[games, players, drawn] += 1
+
+    def _exchange(self, games: np.ndarray, players: np.ndarray):
+        """Devolve a mão ao baralho e compra o mesmo número de cartas (mesma regra de CoupGame)"""
+        if len(games) == 0:
+            return
+        sizes = self.hands[games, players].sum(axis=1)
+        self.deck[games] += self.hands[games, players]
+        self.hands[games, players] = 0
+        for draw in range(2):
+            drawing = sizes > draw
+            cards = self._draw(games[drawing])
+            self.hands[games[drawing], players[drawing], cards] += 1
+
+    def _choose_actions(self, games: np.ndarray, actor: np.ndarray):
+        """
+        Ações e alvos de cada ator segundo a política do seu assento
+
+        O hard usa as chances hipergeométricas de cada oponente ter cada
+        personagem, pelo baralho e pela mão do ator.
+        """
+        action = np.full(len(games), INCOME)
+        target = np.full(len(games), -1)
+        policy = self.seat_policy[actor]
+        for code in POLICIES:
+            subset = np.nonzero(policy == code)[0]
+            if len(subset) == 0:
+                continue
+            sub_games = games[subset]
+            sub_action, sub_target = policy_actions(
+                code, self.coins[sub_games], self.hands[sub_games], self.alive[sub_games],
+                actor[subset], self.rng, self._params_for(sub_games), deck=self.deck[sub_games]
+            )
+            action[subset] = sub_action
+            target[subset] = sub_target
+        return action, target
+
+    def _resolve_challenges(self, games: np.ndarray, actor: np.ndarray,
+                            action: np.ndarray, bluff: np.ndarray) -> np.ndarray:
+        """
+        Cada oponente, na ordem de jogada, pode desafiar a declaração
+
+        Returns:
+            Máscara das ações canceladas (blefe descoberto)
+        """
+        count = len(games)
+        pending = _CLAIM_ACTIONS[action].copy()
+        cancelled = np.zeros(count, dtype=bool)
+        aggressiveness = self._params_for(games)["challenge_aggressiveness"]
+
+        for offset in range(1, self.num_players):
+            challenger = (actor + offset) % self.num_players
+            eligible = pending & self.alive[games, challenger]
+            if not eligible.any():
+                continue
+            probability = challenge_probabilities(
+                self.seat_policy[challenger],
+                self.coins[games, challenger],
+                self.hands[games, challenger].sum(axis=1),
+                action, aggressiveness
+            )
+            challenged = eligible & (self.rng.random(count) < probability)
+            pending &= ~challenged
+
+            caught = challenged & bluff
+            failed = challenged & ~bluff
+            self._lose_random_card(games[caught], actor[caught])
+            self._replace_revealed(games[failed], actor[failed], _REQUIRED[action[failed]])
+            self._lose_random_card(games[failed], challenger[failed])
+            cancelled |= caught
+        return cancelled
+
+    def _resolve_blocks(self, games: np.ndarray, actor: np.ndarray, action: np.ndarray,
+                        target: np.ndarray, active: np.ndarray):
+        """
+        Bloqueios segundo CoupAI.should_block (só nas ações ativas)
+
+        Returns:
+            (bloqueador de cada partida (-1 = nenhum), máscara dos bloqueios blefados)
+        """
+        count = len(games)
+        blocker = np.full(count, -1)
+
+        # Foreign Aid: o primeiro oponente com Duque, em ordem de jogada, bloqueia
+        foreign_aid = active & (action == FOREIGN_AID)
+        for offset in range(1, self.num_players):
+            candidate = (actor + offset) % self.num_players
+            blocks = (foreign_aid & (blocker < 0) & self.alive[games, candidate]
+                      & (self.hands[games, candidate, DUKE] > 0))
+            blocker[blocks] = candidate[blocks]
+
+        safe_target = np.maximum(target, 0)
+        target_alive = active & (target >= 0) & self.alive[games, safe_target]
+        target_hand = self.hands[games, safe_target]
+        steal_block = (target_hand[:, CAPTAIN] > 0) | (target_hand[:, AMBASSADOR] > 0)
+        # Hard blefa bloqueio de roubo se tem 2+ moedas, mais com block_probability alto
+        block_probability = self._params_for(games)["block_probability"]
+        bluff_block = ((self.seat_policy[safe_target] == HARD)
+                       & (self.coins[games, safe_target] >= 2)
+                       & (self.rng.random(count) < block_probability * BLUFF_BLOCK_PER_BLOCK_PROBABILITY))
+        blocks = target_alive & (
+            ((action == STEAL) & (steal_block | bluff_block))
+            | ((action == ASSASSINATE) & (target_hand[:, CONTESSA] > 0))
+        )
+        blocker[blocks] = target[blocks]
+
+        holds = (self.hands[games, np.maximum(blocker, 0)] > 0) & _BLOCKERS[action]
+        return blocker, (blocker >= 0) & ~holds.any(axis=1)
+
+    def _resolve_block_challenges(self, games: np.ndarray, action: np.ndarray,
+                                  blocker: np.ndarray, bluff: np.ndarray) -> np.ndarray:
+        """
+        Cada outro jogador vivo, na ordem de jogada a partir do bloqueador,
+        pode desafiar o bloqueio
+
+        Returns:
+            Máscara dos bloqueios derrubados (blefe descoberto)
+        """
+        count = len(games)
+        pending = blocker >= 0
+        overturned = np.zeros(count, dtype=bool)
+        if not pending.any():
+            return overturned
+        aggressiveness = self._params_for(games)["challenge_aggressiveness"]
+        claimed = _BLOCKERS[action]
+
+        for offset in range(1, self.num_players):
+            challenger = (blocker + offset) % self.num_players
+            eligible = pending & self.alive[games, challenger]
+            if not eligible.any():
+                continue
+            challenger_hand = self.hands[games, challenger]
+            probability = block_challenge_probabilities(
+                self.seat_policy[challenger],
+                challenger_hand.sum(axis=1),
+                (challenger_hand * claimed).sum(axis=1),
+                aggressiveness
+            )
+            challenged = eligible & (self.rng.random(count) < probability)
+            pending &= ~challenged
+
+            caught = challenged & bluff
+            failed = challenged & ~bluff
+            self._lose_random_card(games[caught], blocker[caught])
+            # Mostra o primeiro personagem de bloqueio que tem (ordem de BLOCKING_CHARACTERS)
+            revealed = np.argmax((self.hands[games[failed], blocker[failed]] > 0) & claimed[failed], axis=1)
+            self._replace_revealed(games[failed], blocker[failed], revealed)
+            self._lose_random_card(games[failed], challenger[failed])
+            overturned |= caught
+        return overturned
+
+    def _apply_effects(self, games: np.ndarray, actor: np.ndarray, action: np.ndarray,
+                       target: np.ndarray, active: np.ndarray):
+        """Aplica o efeito das ações que não foram canceladas nem bloqueadas"""
+        def select(code):
+            mask = active & (action == code)
+            return games[mask], actor[mask], target[mask]
+
+        g, a, _ = select(INCOME)
+        self.coins[g, a] += 1
+        g, a, _ = select(FOREIGN_AID)
+        self.coins[g, a] += 2
+        g, a, _ = select(TAX)
+        self.coins[g, a] += 3
+
+        g, a, t = select(STEAL)
+        valid = t >= 0
+        g, a, t = g[valid], a[valid], t[valid]
+        stolen = np.minimum(2, self.coins[g, t])
+        self.coins[g, a] += stolen
+        self.coins[g, t] -= stolen
+
+        for code in (COUP, ASSASSINATE):
+            g, _, t = select(code)
+            hit = (t >= 0)
+            g, t = g[hit], t[hit]
+            hit = self.alive[g, t]
+            self._lose_random_card(g[hit], t[hit])
+
+        g, a, _ = select(EXCHANGE)
+        has_cards = self.deck[g].sum(axis=1) >= 2
+        self._exchange(g[has_cards], a[has_cards])
+
+    def _advance_turn(self, games: np.ndarray):
+        """Passa a vez para o próximo jogador vivo e marca partidas encerradas"""
+        alive = self.alive[games]
+        remaining = alive.sum(axis=1)
+        finished = remaining <= 1
+        self.done[games[finished]] = True
+        self.winner[games[finished]] = np.where(
+            remaining[finished] == 1, np.argmax(alive[finished], axis=1), -1
+        )
+
+        offsets = np.arange(1, self.num_players + 1)
+        candidates = (self.current[games, None] + offsets[None, :]) % self.num_players
+        next_alive = np.take_along_axis(alive, candidates, axis=1)
+        self.current[games] = candidates[np.arange(len(games)), np.argmax(next_alive, axis=1)]
+
+        self.turns[games] += 1
+        timeout = ~self.done[games] & (self.turns[games] >= self.max_turns)
+        self.done[games[timeout]] = True
+
+    def step(self) -> bool:
+        """
+        Joga um turno em todas as partidas ainda ativas
+
+        Returns:
+            False quando todas as partidas terminaram
+        """
+        games = np.nonzero(~self.done)[0]
+        if len(games) == 0:
+            return False
+
+        actor = self.current[games]
+        action, target = self._choose_actions(games, actor)
+
+        # Custos são pagos na declaração
+        self.coins[games[action == COUP], actor[action == COUP]] -= COUP_COST
+        assassinate = action == ASSASSINATE
+        self.coins[games[assassinate], actor[assassinate]] -= ASSASSINATE_COST
+
+        required = _REQUIRED[action]
+        actor_hands = self.hands[games, actor]
+        bluff = (required >= 0) & (
+            np.take_along_axis(actor_hands, np.maximum(required, 0)[:, None], axis=1)[:, 0] == 0
+        )
+
+        cancelled = self._resolve_challenges(games, actor, action, bluff)
+        # O ator pode ter sido eliminado por um desafio que perdeu
+        active = ~cancelled & self.alive[games, actor]
+        blocker, block_bluff = self._resolve_blocks(games, actor, action, target, active)
+        overturned = self._resolve_block_challenges(games, action, blocker, block_bluff)
+        blocked = (blocker >= 0) & ~overturned
+
+        # Ator ou alvo eliminados durante as reações: a ação não tem efeito (como em CoupGame)
+        active &= ~blocked & self.alive[games, actor]
+        active &= (target < 0) | self.alive[games, np.maximum(target, 0)]
+        self._apply_effects(games, actor, action, target, active)
+
+        self._advance_turn(games)
+        return True
+
+    def run(self) -> Dict[str, np.ndarray]:
+        """
+        Joga todas as partidas até o fim
+
+        Returns:
+            Dict com "winner" (assento vencedor ou -1) e "turns" por partida
+        """
+        while self.step():
+            pass
+        return {"winner": self.winner.copy(), "turns": self.turns.copy()}
+
+    def win_rates(self) -> np.ndarray:
+        """
+        Fração de vitórias de cada assento entre as partidas com vencedor
+
+        Partidas sem vencedor (limite de turnos) ficam de fora; ver unfinished.
+        """
+        finished = self.winner >= 0
+        if not finished.any():
+            return np.zeros(self.num_players)
+        counts = np.bincount(self.winner[finished], minlength=self.num_players)
+        return counts / finished.sum()
+
+    @property
+    def unfinished(self) -> int:
+        """Partidas sem vencedor (ainda em andamento ou encerradas pelo limite de turnos)"""
+        return int((self.winner < 0).sum())
+
+
+def sweep_learning_param(param: str, values: List[float], games_per_value: int = 1000,
+                         difficulties: Optional[List[str]] = None,
+                         seed: Optional[int] = None) -> Dict[float, float]:
+    """
+    Varre um parâmetro de aprendizado do assento 0 em uma única simulação em lote
+
+    Args:
+        param: Chave de learning_params (ex: "bluff_probability")
+        values: Valores a testar
+        games_per_value: Partidas por valor
+        difficulties: Dificuldades dos assentos (assento 0 deve ser "hard")
+
+    Returns:
+        Dict valor -> taxa de vitória do assento 0 (entre as partidas com vencedor)
+    """
+    difficulties = difficulties or ["hard", "medium", "easy"]
+    per_game = np.repeat(np.asarray(values, dtype=float), games_per_value)
+    simulator = BatchSimulator(len(per_game), difficulties, {param: per_game}, seed=seed)
+    winners = simulator.run()["winner"]
+
+    results = {}
+    for i, value in enumerate(values):
+        chunk = winners[i * games_per_value:(i + 1) * games_per_value]
+        finished = chunk >= 0
+        results[value] = float(np.mean(chunk[finished] == 0)) if finished.any() else 0.0
+    return results
@@ -0,0 +1,269 @@
+"""
+Crenças sobre as cartas ocultas dos oponentes
+Cada oponente tem uma distribuição sobre as mãos possíveis (15 mãos de 2
+cartas ou 5 de 1 carta), atualizada de forma incremental a partir do
+registro de eventos do jogo
+"""
+from itertools import combinations_with_replacement
+from math import comb
+from typing import Dict, List, Optional, Tuple
+from coup_game import (
+    CoupGame, Player, Deck, Character, Action, ACTION_CODES, CLAIMED_CHARACTER, BLOCKING_CHARACTERS,
+)
+from event_log import (
+    EVENT_ACTION, EVENT_BLOCK, EVENT_CHALLENGE, EVENT_LOSE_CARD,
+    KIND, PLAYER, TARGET, ACTION, CARD, FLAGS,
+    FLAG_SUCCESS, FLAG_BLOCK, NONE,
+)
+
+NUM_CHARACTERS = len(Deck.CHARACTERS)
+
+# Mãos possíveis por tamanho, como tuplas ordenadas de índices de personagem
+HANDS = {
+    size: tuple(combinations_with_replacement(range(NUM_CHARACTERS), size))
+    for size in (0, 1, 2)
+}
+# HAND_HAS[tamanho][mão][personagem] -> cópias do personagem na mão
+HAND_HAS = {
+    size: tuple(tuple(hand.count(c) for c in range(NUM_CHARACTERS)) for hand in hands)
+    for size, hands in HANDS.items()
+}
+HAND_INDEX = {size: {hand: i for i, hand in enumerate(hands)} for size, hands in HANDS.items()}
+
+# Índices de personagem declarados por ação / por bloqueio
+CLAIM_INDEX = {action: (Deck.INDEX[char],) for action, char in CLAIMED_CHARACTER.items()}
+BLOCK_INDEX = {action: tuple(Deck.INDEX[c] for c in chars) for action, chars in BLOCKING_CHARACTERS.items()}
+
+
+def hand_prior(size: int, unseen: List[int]) -> List[float]:
+    """Probabilidade de cada mão de `size` cartas sorteada das cartas não vistas"""
+    weights = []
+    for counts in HAND_HAS[size]:
+        weight = 1
+        for char_index, copies in enumerate(counts):
+            if copies:
+                weight *= comb(unseen[char_index], copies)
+        weights.append(float(weight))
+    return _normalized(weights)
+
+
+def _normalized(weights: List[float]) -> List[float]:
+    total = sum(weights)
+    if total <= 0:
+        return [1.0 / len(weights)] * len(weights)
+    return [w / total for w in weights]
+
+
+class HandBelief:
+    """Distribuição sobre as mãos de um oponente"""
+
+    __slots__ = ("size", "weights", "unseen")
+
+    def __init__(self, size: int, unseen: List[int]):
+        self.size = size
+        self.unseen = unseen[:]
+        self.weights = hand_prior(size, unseen)
+
+    def rescale(self, unseen: List[int]):
+        """
+        Ajusta a distribuição quando o conjunto de cartas não vistas muda
+        (carta revelada, troca do observador): multiplica pela razão entre os
+        priors novo e antigo, preservando a evidência acumulada
+        """
+        if unseen == self.unseen:
+            return
+        old = hand_prior(self.size, self.unseen)
+        new = hand_prior(self.size, unseen)
+        self.weights = _normalized([
+            w * n / o if o > 0 else n
+            for w, n, o in zip(self.weights, new, old)
+        ])
+        self.unseen = unseen[:]
+
+    def observe_claim(self, characters: Tuple[int, ...], bluff_likelihood: float):
+        """Declarou um dos personagens: mãos sem eles só explicam a declaração como blefe"""
+        has = HAND_HAS[self.size]
+        self.weights = _normalized([
+            w if any(has[i][c] for c in characters) else w * bluff_likelihood
+            for i, w in enumerate(self.weights)
+        ])
+
+    def exclude(self, characters: Tuple[int, ...]):
+        """Blefe descoberto: não tem nenhum dos personagens"""
+        has = HAND_HAS[self.size]
+        self.weights = _normalized([
+            0.0 if any(has[i][c] for c in characters) else w
+            for i, w in enumerate(self.weights)
+        ])
+
+    def lose(self, char_index: int):
+        """Perdeu (revelou) a carta char_index: a mão encolhe uma carta"""
+        if not self.size:
+            return
+        self.weights = self._without(char_index)
+        self.size -= 1
+
+    def replace(self, char_index: int, unseen: List[int]):
+        """Mostrou char_index, devolveu ao baralho e comprou uma carta nova"""
+        if not self.size:
+            return
+        rest = self._without(char_index)
+        draw = _normalized([float(u) for u in unseen])
+        index = HAND_INDEX[self.size]
+        weights = [0.0] * len(HANDS[self.size])
+        for i, hand in enumerate(HANDS[self.size - 1]):
+            if not rest[i]:
+                continue
+            for new_card, p in enumerate(draw):
+                if p:
+                    weights[index[tuple(sorted(hand + (new_card,)))]] += rest[i] * p
+        self.weights = _normalized(weights)
+        self.unseen = unseen[:]
+
+    def _without(self, char_index: int) -> List[float]:
+        """Distribuição do resto da mão, dado que tinha char_index"""
+        smaller = HAND_INDEX[self.size - 1]
+        weights = [0.0] * len(HANDS[self.size - 1])
+        for i, hand in enumerate(HANDS[self.size]):
+            if char_index not in hand or not self.weights[i]:
+                continue
+            rest = list(hand)
+            rest.remove(char_index)
+            weights[smaller[tuple(rest)]] += self.weights[i]
+        return _normalized(weights)
+
+    def card_probability(self, char_index: int) -> float:
+        """Chance de ter pelo menos uma cópia do personagem"""
+        has = HAND_HAS[self.size]
+        return sum(w for i, w in enumerate(self.weights) if has[i][char_index])
+
+
+class BeliefTracker:
+    """
+    Crenças de um observador sobre todos os oponentes de um CoupGame
+
+    update() lê só os eventos novos desde a última chamada (custo
+    proporcional aos eventos do turno, sem reler o histórico). Usa apenas
+    informação pública: declarações, resultados de desafios e cartas
+    reveladas; o bit de blefe registrado pelo motor é ignorado.
+    """
+
+    def __init__(self, game: CoupGame, observer: Player, bluff_likelihood: float = 0.35):
+        """
+        Args:
+            game: Jogo observado
+            observer: Jogador dono das crenças
+            bluff_likelihood: Chance de declarar um personagem sem tê-lo
+                (relativa a declarar tendo-o)
+        """
+        self.game = game
+        self.observer = observer
+        self.observer_index = game.players.index(observer)
+        self.bluff_likelihood = bluff_likelihood
+        self.cursor = game.events.count  # Crenças começam do estado atual
+        unseen = self.unseen_counts()
+        self.beliefs: Dict[int, HandBelief] = {
+            i: HandBelief(len(p.cards), unseen)
+            for i, p in enumerate(game.players) if i != self.observer_index
+        }
+        self._confirmed_claim: Optional[int] = None  # Declaração já resolvida por desafio
+
+    def unseen_counts(self) -> List[int]:
+        """
+        Cópias de cada personagem que o observador não vê
+
+        Igual a 3 - cópias na mão do observador - cópias reveladas; calculado
+        pelo baralho e mãos alheias, que somam exatamente isso.
+        """
+        game = self.game
+        unseen = game.deck.counts[:]
+        for i, player in enumerate(game.players):
+            if i == self.observer_index:
+                continue
+            for card in player.cards:
+                unseen[Deck.INDEX[card]] += 1
+        return unseen
+
+    def update(self) -> int:
+        """Processa os eventos novos. Retorna quantos foram lidos."""
+        processed = 0
+        for seq, event in self.game.events.since(self.cursor):
+            self._apply(event)
+            self.cursor = seq + 1
+            processed += 1
+
+        unseen = self.unseen_counts()
+        for index, belief in self.beliefs.items():
+            size = len(self.game.players[index].cards)
+            if belief.size != size:
+                # Eventos fora do buffer ou estado alterado diretamente
+                self.beliefs[index] = HandBelief(size, unseen)
+            else:
+                belief.rescale(unseen)
+        return processed
+
+    def _apply(self, event):
+        kind = event[KIND]
+        player = event[PLAYER]
+        observer = self.observer_index
+
+        if kind == EVENT_ACTION:
+            action = ACTION_CODES[event[ACTION]]
+            confirmed = self._confirmed_claim == player
+            self._confirmed_claim = None
+            if player != observer and action in CLAIM_INDEX and not confirmed:
+                self._belief(player).observe_claim(CLAIM_INDEX[action], self.bluff_likelihood)
+            target = event[TARGET]
+            if event[CARD] != NONE and target != NONE and target != observer:
+                self._belief(target).lose(event[CARD])
+            if player != observer and event[FLAGS] & FLAG_SUCCESS and action == Action.EXCHANGE:
+                self.beliefs[player] = HandBelief(self._belief(player).size, self.unseen_counts())
+
+        elif kind == EVENT_BLOCK:
+            if player != observer:
+                action = ACTION_CODES[event[ACTION]]
+                self._belief(player).observe_claim(BLOCK_INDEX[action], self.bluff_likelihood)
+
+        elif kind == EVENT_CHALLENGE:
+            claimant = event[TARGET]
+            action = ACTION_CODES[event[ACTION]]
+            block = bool(event[FLAGS] & FLAG_BLOCK)
+            if not block:
+                self._confirmed_claim = claimant
+            if claimant == observer:
+                return
+            if event[FLAGS] & FLAG_SUCCESS:
+                self._belief(claimant).exclude(BLOCK_INDEX[action] if block else CLAIM_INDEX[action])
+            else:
+                self._belief(claimant).replace(event[CARD], self.unseen_counts())
+
+        elif kind == EVENT_LOSE_CARD:
+            if player != observer:
+                self._belief(player).lose(event[CARD])
+
+    def _belief(self, index: int) -> HandBelief:
+        return self.beliefs[index]
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def hand_distribution(self, opponent: Player) -> Dict[Tuple[Character, ...], float]:
+        """Probabilidade de cada mão possível do oponente"""
+        belief = self.beliefs[self.game.players.index(opponent)]
+        return {
+            tuple(Deck.CHARACTERS[c] for c in hand): w
+            for hand, w in zip(HANDS[belief.size], belief.weights) if w
+        }
+
+    def card_probabilities(self, opponent: Player) -> Dict[Character, float]:
+        """Chance do oponente ter pelo menos um de cada personagem"""
+        belief = self.beliefs[self.game.players.index(opponent)]
+        return {char: belief.card_probability(i) for i, char in enumerate(Deck.CHARACTERS)}
+
+    def probabilities(self) -> Dict[str, Dict[Character, float]]:
+        """card_probabilities de todos os oponentes vivos, por nome"""
+        return {
+            player.name: self.card_probabilities(player)
+            for player in self.game.get_other_players(self.observer)
+        }
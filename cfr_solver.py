@@ -0,0 +1,438 @@
+"""
+Minimização de arrependimento contrafactual (CFR) para Coup abstrato
+Treina, offline, estratégias de equilíbrio para mesas de 2 e 3 jogadores e
+grava uma tabela de estratégia por conjunto de informação (infoset).
+
+Abstração: cada decisão (ação do turno, desafio, bloqueio) vira um infoset
+pequeno (mão própria, faixas de moedas, cartas na mesa); alvos seguem regras
+fixas. O treino é um MCCFR sobre partidas de CompactState (ver CFRSolver), com
+os arrependimentos aplicados em lote com NumPy (regret matching+) e
+checkpoints para retomar execuções longas.
+
+Treinar:  python cfr_solver.py --players 2 --iterations 1000000
+"""
+import argparse
+import os
+import random
+import time
+from itertools import combinations_with_replacement
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from compact_state import (
+    CompactState, NUM_CHARACTERS, NUM_ACTIONS, REQUIRED_CHARACTER, BLOCKING_CHARACTERS, NO_TARGET,
+    FOREIGN_AID, COUP, TAX, ASSASSINATE, STEAL, EXCHANGE, COUP_COST, ASSASSINATE_COST,
+)
+from mcts import rewards
+from seeding import derive_seed
+
+POLICY_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ----------------------------------------------------------------------
+# Abstração dos infosets
+# ----------------------------------------------------------------------
+
+# Mãos de 1 e 2 cartas (tuplas ordenadas de índices de personagem)
+HANDS = tuple(
+    hand for size in (1, 2) for hand in combinations_with_replacement(range(NUM_CHARACTERS), size)
+)
+HAND_INDEX = {hand: i for i, hand in enumerate(HANDS)}
+
+# Escolhas de cada tipo de decisão
+PASS, ACCEPT = 0, 1  # Desafio/bloqueio: não / sim
+MAX_CHOICES = NUM_ACTIONS
+
+# Declarações que podem ser desafiadas: ações com personagem e bloqueios
+CLAIM_KIND = {
+    (TAX, False): 0, (ASSASSINATE, False): 1, (STEAL, False): 2, (EXCHANGE, False): 3,
+    (FOREIGN_AID, True): 4, (ASSASSINATE, True): 5, (STEAL, True): 6,
+}
+BLOCKABLE = {FOREIGN_AID: 0, ASSASSINATE: 1, STEAL: 2}
+
+COIN_BUCKETS = 4      # 0-2, 3-6, 7-9, 10+
+OPP_COIN_BUCKETS = 4  # 0, 1-2, 3-6, 7+
+
+ACTION_INFOSETS = len(HANDS) * COIN_BUCKETS * 2 * OPP_COIN_BUCKETS
+CHALLENGE_INFOSETS = len(CLAIM_KIND) * 3 * 2 * 2
+BLOCK_INFOSETS = len(BLOCKABLE) * 2 * 2 * 2
+
+CHALLENGE_OFFSET = ACTION_INFOSETS
+BLOCK_OFFSET = CHALLENGE_OFFSET + CHALLENGE_INFOSETS
+NUM_INFOSETS = BLOCK_OFFSET + BLOCK_INFOSETS
+
+_BINARY_MASK = np.zeros(MAX_CHOICES, dtype=bool)
+_BINARY_MASK[[PASS, ACCEPT]] = True
+
+
+def _action_masks() -> np.ndarray:
+    """Ações legais de cada infoset de ação (as faixas de moedas decidem Coup, Assassinato e Roubo)"""
+    masks = np.ones((ACTION_INFOSETS, MAX_CHOICES), dtype=bool)
+    for key in range(ACTION_INFOSETS):
+        opp_bucket = key % OPP_COIN_BUCKETS
+        coin_bucket = key // (OPP_COIN_BUCKETS * 2) % COIN_BUCKETS
+        masks[key, COUP] = coin_bucket >= 2
+        masks[key, ASSASSINATE] = coin_bucket >= 1
+        masks[key, STEAL] = opp_bucket > 0
+    return masks
+
+
+ACTION_MASKS = _action_masks()
+
+
+def _coin_bucket(coins: int) -> int:
+    if coins < ASSASSINATE_COST:
+        return 0
+    if coins < COUP_COST:
+        return 1
+    return 2 if coins < 10 else 3
+
+
+def _opp_coin_bucket(coins: int) -> int:
+    if coins == 0:
+        return 0
+    if coins < ASSASSINATE_COST:
+        return 1
+    return 2 if coins < COUP_COST else 3
+
+
+def _hand(state: CompactState, player: int) -> Tuple[int, ...]:
+    base = player * NUM_CHARACTERS
+    hand = []
+    for char_index in range(NUM_CHARACTERS):
+        hand.extend([char_index] * state.hands[base + char_index])
+    return tuple(hand)
+
+
+def action_infoset(state: CompactState, player: int) -> Tuple[int, np.ndarray]:
+    """Infoset e máscara de ações legais (com blefes) da ação do turno"""
+    opponents = [p for p in range(state.num_players) if p != player and state.card_counts[p]]
+    richest = max(state.coins[p] for p in opponents)
+    key = (((HAND_INDEX[_hand(state, player)] * COIN_BUCKETS + _coin_bucket(state.coins[player])) * 2
+            + (len(opponents) > 1)) * OPP_COIN_BUCKETS + _opp_coin_bucket(richest))
+    return key, ACTION_MASKS[key]
+
+
+def challenge_infoset(state: CompactState, challenger: int, claimant: int,
+                      action: int, block: bool) -> int:
+    """Infoset do desafio a uma declaração (ação ou bloqueio)"""
+    characters = BLOCKING_CHARACTERS[action] if block else (REQUIRED_CHARACTER[action],)
+    base = challenger * NUM_CHARACTERS
+    held = min(sum(state.hands[base + c] for c in characters), 2)
+    key = ((CLAIM_KIND[(action, block)] * 3 + held) * 2
+           + (state.card_counts[challenger] > 1)) * 2 + (state.card_counts[claimant] > 1)
+    return CHALLENGE_OFFSET + key
+
+
+def block_infoset(state: CompactState, blocker: int, actor: int, action: int) -> int:
+    """Infoset do bloqueio de uma ação"""
+    base = blocker * NUM_CHARACTERS
+    holds = any(state.hands[base + c] for c in BLOCKING_CHARACTERS[action])
+    key = ((BLOCKABLE[action] * 2 + holds) * 2
+           + (state.card_counts[blocker] > 1)) * 2 + (state.card_counts[actor] > 1)
+    return BLOCK_OFFSET + key
+
+
+def choose_target(state: CompactState, player: int, action: int) -> int:
+    """Alvo por regra fixa: Coup/Assassinato no mais forte, Roubo no mais rico"""
+    opponents = [p for p in range(state.num_players) if p != player and state.card_counts[p]]
+    if action == STEAL:
+        return max(opponents, key=lambda p: state.coins[p])
+    if action == COUP or action == ASSASSINATE:
+        return max(opponents, key=lambda p: (state.card_counts[p], state.coins[p]))
+    return NO_TARGET
+
+
+def regret_matching(regrets: np.ndarray, masks: np.ndarray) -> np.ndarray:
+    """Estratégia de todos os infosets de uma vez: arrependimentos positivos normalizados"""
+    positive = np.where(masks, np.maximum(regrets, 0.0), 0.0)
+    totals = positive.sum(axis=1, keepdims=True)
+    uniform = masks / np.maximum(masks.sum(axis=1, keepdims=True), 1)
+    return np.where(totals > 0, positive / np.where(totals > 0, totals, 1.0), uniform)
+
+
+# ----------------------------------------------------------------------
+# Treino
+# ----------------------------------------------------------------------
+
+class _SamplingReactions:
+    """Reações de CompactState.play_turn sorteadas pela estratégia atual"""
+
+    def __init__(self, episode: "_Episode"):
+        self.episode = episode
+
+    def challenge(self, state: CompactState, challenger: int, claimant: int,
+                  action: int, block: bool = False) -> bool:
+        key = challenge_infoset(state, challenger, claimant, action, block)
+        return self.episode.decide(challenger, key, _BINARY_MASK) == ACCEPT
+
+    def block(self, state: CompactState, blocker: int, actor: int, action: int) -> bool:
+        key = block_infoset(state, blocker, actor, action)
+        return self.episode.decide(blocker, key, _BINARY_MASK) == ACCEPT
+
+
+class _Episode:
+    """
+    Decisões de uma partida: as primeiras len(forced) são repetidas, a de
+    número branch_at é forçada para branch_choice e o resto é sorteado pela
+    estratégia (o jogador treinado explora com probabilidade `exploration`)
+    """
+
+    def __init__(self, strategy: np.ndarray, traverser: int, rng: random.Random,
+                 exploration: float = 0.0, forced: Sequence[int] = (),
+                 branch_choice: Optional[int] = None):
+        self.strategy = strategy
+        self.traverser = traverser
+        self.rng = rng
+        self.exploration = exploration
+        self.forced = forced
+        self.branch_choice = branch_choice
+        self.decisions: List[int] = []
+        # (número da decisão, infoset, máscara) das decisões do treinado
+        self.records: List[Tuple[int, int, np.ndarray]] = []
+
+    def decide(self, player: int, key: int, mask: np.ndarray) -> int:
+        number = len(self.decisions)
+        if number < len(self.forced):
+            choice = self.forced[number]
+        elif number == len(self.forced) and self.branch_choice is not None:
+            choice = self.branch_choice
+        elif player == self.traverser and self.exploration and self.rng.random() < self.exploration:
+            legal = np.flatnonzero(mask)
+            choice = int(legal[self.rng.randrange(len(legal))])
+        else:
+            choice = _sample(self.strategy[key], self.rng)
+        self.decisions.append(choice)
+        if player == self.traverser:
+            self.records.append((number, key, mask))
+        return choice
+
+
+def _sample(probabilities: np.ndarray, rng: random.Random) -> int:
+    r = rng.random()
+    last = 0
+    for choice, p in enumerate(probabilities):
+        if p > 0:
+            last = choice
+            r -= p
+            if r < 0:
+                return choice
+    return last
+
+
+class CFRSolver:
+    """
+    MCCFR com regret matching+ em tabelas NumPy
+
+    Cada iteração joga uma partida com a estratégia atual, sorteia uma decisão
+    do jogador treinado e estima o valor de cada escolha ali rejogando a
+    partida com as mesmas sementes (números aleatórios comuns) até aquele
+    ponto e forçando a escolha. O arrependimento de cada escolha é o valor
+    dela menos o valor esperado da estratégia. Sem pesos de importância, a
+    variância fica baixa mesmo em partidas longas.
+
+    As iterações rodam em lotes: a estratégia é recalculada no início de cada
+    lote (para todos os infosets, vetorizado) e os arrependimentos do lote são
+    somados de uma vez com np.add.at.
+    """
+
+    def __init__(self, num_players: int = 2, seed: int = 0, exploration: float = 0.1,
+                 max_turns: int = 60):
+        """
+        Args:
+            num_players: Jogadores da mesa abstrata (2 ou 3)
+            seed: Semente base (o lote k usa derive_seed(seed, k), então retomar
+                de um checkpoint reproduz a mesma execução)
+            exploration: Chance de o jogador treinado jogar ao acaso na partida
+                base (visita infosets raros)
+            max_turns: Turnos por partida (sem vencedor, divide pela força)
+        """
+        if num_players not in (2, 3):
+            raise ValueError("O CFR abstrato é para mesas de 2 ou 3 jogadores")
+        self.num_players = num_players
+        self.seed = seed
+        self.exploration = exploration
+        self.max_turns = max_turns
+        self.iterations = 0
+        self.regrets = np.zeros((NUM_INFOSETS, MAX_CHOICES))
+        self.strategy_sum = np.zeros((NUM_INFOSETS, MAX_CHOICES))
+        self.masks = np.zeros((NUM_INFOSETS, MAX_CHOICES), dtype=bool)
+        self.masks[:ACTION_INFOSETS] = ACTION_MASKS
+        self.masks[CHALLENGE_OFFSET:] = _BINARY_MASK
+
+    def train(self, iterations: int, batch_size: int = 256,
+              checkpoint_path: Optional[str] = None, checkpoint_every: int = 100000,
+              verbose: bool = False):
+        """Roda mais `iterations` iterações, gravando checkpoints periódicos"""
+        target = self.iterations + iterations
+        next_checkpoint = self.iterations + checkpoint_every
+        start_iterations = self.iterations
+        start = time.perf_counter()
+        while self.iterations < target:
+            size = min(batch_size, target - self.iterations)
+            self._train_batch(size)
+            if checkpoint_path and self.iterations >= next_checkpoint:
+                self.save_checkpoint(checkpoint_path)
+                next_checkpoint = self.iterations + checkpoint_every
+                if verbose:
+                    done = self.iterations - start_iterations
+                    rate = done / max(time.perf_counter() - start, 1e-9)
+                    print(f"{self.iterations} iterações ({rate:.0f}/s) - checkpoint em {checkpoint_path}")
+        if checkpoint_path:
+            self.save_checkpoint(checkpoint_path)
+
+    def _train_batch(self, size: int):
+        rng = random.Random(derive_seed(self.seed, self.iterations))
+        strategy = regret_matching(self.regrets, self.masks)
+        regret_keys: List[int] = []
+        regret_rows: List[np.ndarray] = []
+        visited: List[int] = []
+
+        for i in range(size):
+            traverser = (self.iterations + i) % self.num_players
+            game_seed = rng.getrandbits(64)
+            base = _Episode(strategy, traverser, random.Random(rng.getrandbits(64)), self.exploration)
+            self._play(base, game_seed)
+            if not base.records:
+                continue
+            visited.extend(key for _, key, _ in base.records)
+
+            number, key, mask = base.records[rng.randrange(len(base.records))]
+            continuation = rng.getrandbits(64)
+            values = np.zeros(MAX_CHOICES)
+            for choice in np.flatnonzero(mask):
+                branch = _Episode(strategy, traverser, random.Random(continuation),
+                                  forced=base.decisions[:number], branch_choice=int(choice))
+                values[choice] = self._play(branch, game_seed)
+            regret_keys.append(key)
+            regret_rows.append(np.where(mask, values - strategy[key] @ values, 0.0))
+
+        self.iterations += size
+        if regret_keys:
+            np.add.at(self.regrets, np.array(regret_keys), np.array(regret_rows))
+            np.maximum(self.regrets, 0.0, out=self.regrets)  # Regret matching+
+        if visited:
+            # Média das estratégias nos infosets visitados, ponderada linearmente pela iteração
+            index = np.array(visited)
+            np.add.at(self.strategy_sum, index, strategy[index] * self.iterations)
+
+    def _play(self, episode: _Episode, game_seed: int) -> float:
+        """Joga uma partida e devolve a recompensa do jogador treinado"""
+        state = CompactState.new_game(self.num_players, random.Random(game_seed))
+        reactions = _SamplingReactions(episode)
+        for _ in range(self.max_turns):
+            if state.get_winner() is not None:
+                break
+            actor = state.current
+            key, mask = action_infoset(state, actor)
+            action = episode.decide(actor, key, mask)
+            state.play_turn(action, actor, choose_target(state, actor, action), reactions)
+            if state.get_winner() is None:
+                state.next_turn()
+        return rewards(state)[episode.traverser]
+
+    # ------------------------------------------------------------------
+    # Checkpoints e tabela final
+    # ------------------------------------------------------------------
+
+    def save_checkpoint(self, path: str):
+        """Grava o estado do treino (escrita atômica: arquivo temporário + rename)"""
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            np.savez(f, regrets=self.regrets, strategy_sum=self.strategy_sum,
+                     meta=np.array([self.num_players, self.seed, self.iterations, self.max_turns]),
+                     exploration=np.array(self.exploration))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load_checkpoint(cls, path: str) -> "CFRSolver":
+        """Retoma um treino salvo por save_checkpoint"""
+        with np.load(path) as data:
+            num_players, seed, iterations, max_turns = (int(v) for v in data["meta"])
+            solver = cls(num_players, seed, float(data["exploration"]), max_turns)
+            solver.iterations = iterations
+            solver.regrets = data["regrets"].copy()
+            solver.strategy_sum = data["strategy_sum"].copy()
+        return solver
+
+    def average_strategy(self) -> np.ndarray:
+        """Estratégia média (a que converge para o equilíbrio)"""
+        return regret_matching(self.strategy_sum, self.masks)
+
+    def save_policy(self, path: Optional[str] = None) -> str:
+        """Grava a tabela de estratégia por infoset usada pela dificuldade "cfr" """
+        path = path or policy_path(self.num_players)
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            np.savez(f, strategy=self.average_strategy().astype(np.float32),
+                     meta=np.array([self.num_players, self.iterations]))
+        os.replace(temporary, path)
+        return path
+
+
+# ----------------------------------------------------------------------
+# Uso da tabela
+# ----------------------------------------------------------------------
+
+def policy_path(num_players: int) -> str:
+    """Arquivo padrão da tabela de uma mesa de num_players"""
+    return os.path.join(POLICY_DIR, f"cfr_policy_{num_players}p.npz")
+
+
+class CFRPolicy:
+    """Tabela de estratégia treinada (somente leitura)"""
+
+    def __init__(self, strategy: np.ndarray, num_players: int, iterations: int):
+        self.strategy = strategy
+        self.num_players = num_players
+        self.iterations = iterations
+
+    @classmethod
+    def load(cls, path: str) -> "CFRPolicy":
+        with np.load(path) as data:
+            num_players, iterations = (int(v) for v in data["meta"])
+            return cls(data["strategy"], num_players, iterations)
+
+    def probabilities(self, key: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Probabilidades das escolhas do infoset (renormalizadas pela máscara)"""
+        row = self.strategy[key]
+        if mask is not None:
+            row = np.where(mask, row, 0.0)
+            total = row.sum()
+            row = row / total if total > 0 else mask / mask.sum()
+        return row
+
+    def sample(self, key: int, rng: random.Random, mask: Optional[np.ndarray] = None) -> int:
+        return _sample(self.probabilities(key, mask), rng)
+
+
+_POLICIES = {}
+
+
+def get_policy(num_players: int) -> Optional[CFRPolicy]:
+    """Tabela da mesa mais próxima (2 ou 3 jogadores), carregada uma vez; None se não existir"""
+    table_size = 2 if num_players <= 2 else 3
+    if table_size not in _POLICIES:
+        try:
+            _POLICIES[table_size] = CFRPolicy.load(policy_path(table_size))
+        except (OSError, KeyError, ValueError):
+            _POLICIES[table_size] = None
+    return _POLICIES[table_size]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Treina a estratégia CFR do Coup abstrato")
+    parser.add_argument("--players", type=int, default=2, choices=(2, 3))
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint", default=None, help="Arquivo de checkpoint (retoma se existir)")
+    parser.add_argument("--checkpoint-every", type=int, default=100000)
+    args = parser.parse_args()
+
+    checkpoint = args.checkpoint or os.path.join(POLICY_DIR, f"cfr_checkpoint_{args.players}p.npz")
+    if os.path.exists(checkpoint):
+        solver = CFRSolver.load_checkpoint(checkpoint)
+        print(f"Retomando de {checkpoint} ({solver.iterations} iterações)")
+    else:
+        solver = CFRSolver(args.players, seed=args.seed)
+    solver.train(args.iterations, args.batch_size, checkpoint, args.checkpoint_every, verbose=True)
+    print(f"Tabela gravada em {solver.save_policy()}")
@@ -0,0 +1,432 @@
+"""
+Estado compacto do jogo Coup para simulação rápida
+Guarda moedas, mãos e baralho como listas fixas de inteiros (sem objetos por ação)
+"""
+import random
+from typing import List, Optional
+from coup_game import CoupGame, Deck, Action, Character
+
+# Índices dos personagens (mesma ordem do enum Character)
+CHARACTERS = tuple(Character)
+NUM_CHARACTERS = len(CHARACTERS)
+CHAR_INDEX = {char: i for i, char in enumerate(CHARACTERS)}
+DUKE, ASSASSIN, CAPTAIN, AMBASSADOR, CONTESSA = range(NUM_CHARACTERS)
+COPIES_PER_CHARACTER = 3
+
+# Códigos das ações principais (ações de turno, sem bloqueios)
+INCOME, FOREIGN_AID, COUP, TAX, ASSASSINATE, STEAL, EXCHANGE = range(7)
+ACTIONS = (
+    Action.INCOME,
+    Action.FOREIGN_AID,
+    Action.COUP,
+    Action.TAX,
+    Action.ASSASSINATE,
+    Action.STEAL,
+    Action.EXCHANGE,
+)
+NUM_ACTIONS = len(ACTIONS)
+ACTION_INDEX = {action: i for i, action in enumerate(ACTIONS)}
+
+# Personagem exigido por cada ação (-1 = nenhum)
+REQUIRED_CHARACTER = (-1, -1, -1, DUKE, ASSASSIN, CAPTAIN, AMBASSADOR)
+# Personagens que bloqueiam cada ação (vazio = não pode ser bloqueada)
+BLOCKING_CHARACTERS = ((), (DUKE,), (), (), (CONTESSA,), (CAPTAIN, AMBASSADOR), ())
+# Ações que precisam de alvo
+TARGETED_ACTIONS = (False, False, True, False, True, True, False)
+NO_TARGET = -1
+
+COUP_COST = 7
+ASSASSINATE_COST = 3
+
+
+class CompactState:
+    """
+    Estado do jogo empacotado em listas de inteiros
+
+    Mesmas regras de CoupGame.is_valid_action/execute_action, mas sem
+    dataclasses, enums ou histórico. Jogadores são índices, personagens e
+    ações são códigos inteiros.
+    """
+
+    __slots__ = ("num_players", "coins", "hands", "card_counts", "deck", "deck_size", "current", "rng")
+
+    def __init__(self, num_players: int, rng: Optional[random.Random] = None):
+        """
+        Cria um estado vazio (sem cartas distribuídas)
+
+        Args:
+            num_players: Número de jogadores
+            rng: Gerador aleatório (padrão: módulo random global)
+        """
+        if num_players < 2:
+            raise ValueError("Precisa de pelo menos 2 jogadores")
+
+        self.num_players = num_players
+        self.coins = [2] * num_players
+        # Mão de cada jogador: contagem por personagem em uma lista plana
+        # (jogador * NUM_CHARACTERS + personagem)
+        self.hands = [0] * (num_players * NUM_CHARACTERS)
+        self.card_counts = [0] * num_players
+        self.deck = [COPIES_PER_CHARACTER] * NUM_CHARACTERS
+        self.deck_size = COPIES_PER_CHARACTER * NUM_CHARACTERS
+        self.current = 0
+        self.rng = rng if rng is not None else random
+
+    @classmethod
+    def new_game(cls, num_players: int, rng: Optional[random.Random] = None) -> "CompactState":
+        """Cria um estado inicial com 2 cartas sorteadas para cada jogador"""
+        state = cls(num_players, rng)
+        for player in range(num_players):
+            if state.deck_size < 2:
+                raise ValueError("Não há cartas suficientes no baralho")
+            state._give_card(player, state._draw())
+            state._give_card(player, state._draw())
+        return state
+
+    # ------------------------------------------------------------------
+    # Conversão de/para CoupGame
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_game(cls, game: CoupGame) -> "CompactState":
+        """Converte um CoupGame em estado compacto (compartilha o gerador aleatório do jogo)"""
+        state = cls(len(game.players), game.rng)
+        hands = state.hands
+        for i, player in enumerate(game.players):
+            state.coins[i] = player.coins
+            base = i * NUM_CHARACTERS
+            for card in player.cards:
+                hands[base + CHAR_INDEX[card]] += 1
+            state.card_counts[i] = len(player.cards)
+
+        state.deck = game.deck.counts[:]
+        state.deck_size = game.deck.size
+        state.current = game.current_player_index
+        return state
+
+    def to_game(self, player_names: List[str]) -> CoupGame:
+        """
+        Converte o estado compacto em um CoupGame
+
+        Args:
+            player_names: Nomes dos jogadores (mesma ordem dos índices)
+        """
+        if len(player_names) != self.num_players:
+            raise ValueError("Número de nomes diferente do número de jogadores")
+
+        game = CoupGame(player_names, rng=self.rng)
+        self.apply_to(game)
+        return game
+
+    def apply_to(self, game: CoupGame):
+        """Sobrescreve moedas, cartas, baralho e turno de um CoupGame existente"""
+        for i, player in enumerate(game.players):
+            player.coins = self.coins[i]
+            player.cards = self.hand_cards(i)
+            player.eliminated = self.card_counts[i] == 0
+
+        game.deck = Deck(self.deck)
+        game.current_player_index = self.current
+        game.rehash()
+
+    def copy(self) -> "CompactState":
+        """Cópia rasa (as listas são copiadas, sem objetos aninhados)"""
+        clone = CompactState.__new__(CompactState)
+        clone.num_players = self.num_players
+        clone.coins = self.coins[:]
+        clone.hands = self.hands[:]
+        clone.card_counts = self.card_counts[:]
+        clone.deck = self.deck[:]
+        clone.deck_size = self.deck_size
+        clone.current = self.current
+        clone.rng = self.rng
+        return clone
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def has_card(self, player: int, char_index: int) -> bool:
+        """Verifica se o jogador tem um personagem"""
+        return self.hands[player * NUM_CHARACTERS + char_index] > 0
+
+    def hand_cards(self, player: int) -> List[Character]:
+        """Retorna a mão do jogador como lista de Character"""
+        base = player * NUM_CHARACTERS
+        cards = []
+        for char_index in range(NUM_CHARACTERS):
+            count = self.hands[base + char_index]
+            if count:
+                cards.extend([CHARACTERS[char_index]] * count)
+        return cards
+
+    def is_eliminated(self, player: int) -> bool:
+        """Jogador sem cartas está eliminado"""
+        return self.card_counts[player] == 0
+
+    def alive_players(self) -> List[int]:
+        """Índices dos jogadores ainda no jogo"""
+        return [i for i in range(self.num_players) if self.card_counts[i]]
+
+    def get_winner(self) -> Optional[int]:
+        """Índice do vencedor, ou None se o jogo continua"""
+        winner = None
+        for i in range(self.num_players):
+            if self.card_counts[i]:
+                if winner is not None:
+                    return None
+                winner = i
+        return winner
+
+    def is_game_over(self) -> bool:
+        """Verifica se o jogo terminou"""
+        return self.get_winner() is not None
+
+    # ------------------------------------------------------------------
+    # Regras (espelham CoupGame.is_valid_action/execute_action)
+    # ------------------------------------------------------------------
+
+    def is_valid_action(self, action: int, player: int, target: int = NO_TARGET) -> bool:
+        """Verifica se uma ação é válida (mesmas regras de CoupGame.is_valid_action)"""
+        if not self.card_counts[player]:
+            return False
+
+        if action == INCOME or action == FOREIGN_AID:
+            return True
+
+        required = REQUIRED_CHARACTER[action]
+        if required >= 0 and not self.hands[player * NUM_CHARACTERS + required]:
+            return False
+
+        if action == COUP:
+            return self.coins[player] >= COUP_COST and target >= 0 and self.card_counts[target] > 0
+
+        if action == ASSASSINATE:
+            return self.coins[player] >= ASSASSINATE_COST and target >= 0 and self.card_counts[target] > 0
+
+        if action == STEAL:
+            return target >= 0 and self.coins[target] >= 1 and self.card_counts[target] > 0
+
+        # TAX e EXCHANGE só exigem o personagem
+        return action == TAX or action == EXCHANGE
+
+    def execute_action(self, action: int, player: int, target: int = NO_TARGET,
+                       bluff: bool = False, reactions=None) -> bool:
+        """
+        Executa uma ação (mesmas regras de CoupGame.execute_action)
+
+        Args:
+            reactions: Consultado para a carta que o alvo perde (ver play_turn)
+
+        Returns:
+            True se a ação teve efeito
+        """
+        if not self.is_valid_action(action, player, target) and not bluff:
+            return False
+
+        coins = self.coins
+
+        if action == INCOME:
+            coins[player] += 1
+            return True
+
+        if action == FOREIGN_AID:
+            coins[player] += 2
+            return True
+
+        if action == COUP:
+            coins[player] -= COUP_COST
+            if target >= 0 and self.card_counts[target]:
+                self._lose_influence(target, reactions)
+                return True
+            return False
+
+        if action == TAX:
+            coins[player] += 3
+            return True
+
+        if action == ASSASSINATE:
+            coins[player] -= ASSASSINATE_COST
+            if target >= 0 and self.card_counts[target]:
+                self._lose_influence(target, reactions)
+                return True
+            return False
+
+        if action == STEAL:
+            if target < 0:
+                return False
+            stolen = coins[target] if coins[target] < 2 else 2
+            coins[player] += stolen
+            coins[target] -= stolen
+            return True
+
+        if action == EXCHANGE:
+            return self._exchange(player)
+
+        return False
+
+    def play_turn(self, action: int, player: int, target: int = NO_TARGET,
+                  reactions=None) -> bool:
+        """
+        Turno completo com desafio, bloqueio e desafio do bloqueio
+        (mesma ordem de CoupGame.play_turn). A jogada deve vir de
+        move_generator.legal_actions; o blefe é deduzido da mão.
+
+        Args:
+            reactions: Objeto com challenge(state, challenger, claimant, action, block)
+                e block(state, blocker, actor, action), e opcionalmente
+                choose_card(state, player) -> personagem perdido (-1 = aleatório);
+                None = ninguém reage
+
+        Returns:
+            True se o efeito da ação foi aplicado
+        """
+        if reactions is not None:
+            claimed = REQUIRED_CHARACTER[action]
+            if claimed >= 0:
+                for challenger in self._reaction_order(player):
+                    if reactions.challenge(self, challenger, player, action, False):
+                        if not self._claim_holds(challenger, player, (claimed,), reactions):
+                            return self._void_action(action, player)
+                        break
+
+            blocking = BLOCKING_CHARACTERS[action]
+            if blocking:
+                if action == FOREIGN_AID:
+                    candidates = self._reaction_order(player)
+                elif target >= 0 and self.card_counts[target]:
+                    candidates = (target,)
+                else:
+                    candidates = ()
+                for blocker in candidates:
+                    if not reactions.block(self, blocker, player, action):
+                        continue
+                    blocked = True
+                    for challenger in self._reaction_order(blocker):
+                        if reactions.challenge(self, challenger, blocker, action, True):
+                            blocked = self._claim_holds(challenger, blocker, blocking, reactions)
+                            break
+                    if blocked:
+                        return self._void_action(action, player)
+                    break
+
+        if not self.card_counts[player] or (target >= 0 and not self.card_counts[target]):
+            return self._void_action(action, player)
+        return self.execute_action(action, player, target, True, reactions)
+
+    def _reaction_order(self, claimant: int) -> List[int]:
+        """Jogadores vivos em ordem de assento a partir de claimant"""
+        num_players = self.num_players
+        card_counts = self.card_counts
+        order = []
+        for offset in range(1, num_players):
+            other = (claimant + offset) % num_players
+            if card_counts[other]:
+                order.append(other)
+        return order
+
+    def _claim_holds(self, challenger: int, claimant: int, characters, reactions=None) -> bool:
+        """
+        Resolve um desafio. Quem errou perde uma carta (ver _lose_influence); se a
+        declaração era verdadeira, a carta mostrada é trocada por outra do baralho.
+
+        Returns:
+            True se claimant tinha a carta
+        """
+        base = claimant * NUM_CHARACTERS
+        for char_index in characters:
+            if self.hands[base + char_index]:
+                self.lose_card(claimant, char_index)
+                self.deck[char_index] += 1
+                self.deck_size += 1
+                self._give_card(claimant, self._draw())
+                self._lose_influence(challenger, reactions)
+                return True
+        self._lose_influence(claimant, reactions)
+        return False
+
+    def _void_action(self, action: int, player: int) -> bool:
+        """Ação anulada: só paga o custo"""
+        if action == COUP:
+            self.coins[player] -= COUP_COST
+        elif action == ASSASSINATE:
+            self.coins[player] -= ASSASSINATE_COST
+        return False
+
+    def next_turn(self):
+        """Avança para o próximo jogador vivo"""
+        current = (self.current + 1) % self.num_players
+        while not self.card_counts[current]:
+            current = (current + 1) % self.num_players
+        self.current = current
+
+    # ------------------------------------------------------------------
+    # Operações de cartas
+    # ------------------------------------------------------------------
+
+    def lose_card(self, player: int, char_index: int) -> bool:
+        """Remove uma carta do jogador. Retorna True se foi eliminado."""
+        slot = player * NUM_CHARACTERS + char_index
+        if self.hands[slot]:
+            self.hands[slot] -= 1
+            self.card_counts[player] -= 1
+            return self.card_counts[player] == 0
+        return False
+
+    def lose_random_card(self, player: int) -> int:
+        """Remove uma carta aleatória (como rng.choice em CoupGame). Retorna o personagem perdido."""
+        base = player * NUM_CHARACTERS
+        r = self.rng.randrange(self.card_counts[player])
+        for char_index in range(NUM_CHARACTERS):
+            r -= self.hands[base + char_index]
+            if r < 0:
+                self.lose_card(player, char_index)
+                return char_index
+        return -1
+
+    def _lose_influence(self, player: int, reactions=None) -> int:
+        """Perde a carta escolhida por reactions.choose_card (se houver) ou uma aleatória"""
+        choose = getattr(reactions, "choose_card", None)
+        if choose is not None:
+            char_index = choose(self, player)
+            if char_index >= 0 and self.hands[player * NUM_CHARACTERS + char_index]:
+                self.lose_card(player, char_index)
+                return char_index
+        return self.lose_random_card(player)
+
+    def _give_card(self, player: int, char_index: int):
+        """Coloca uma carta na mão do jogador"""
+        self.hands[player * NUM_CHARACTERS + char_index] += 1
+        self.card_counts[player] += 1
+
+    def _draw(self) -> int:
+        """Compra uma carta do baralho (sorteio ponderado pelas contagens)"""
+        r = self.rng.randrange(self.deck_size)
+        deck = self.deck
+        for char_index in range(NUM_CHARACTERS):
+            r -= deck[char_index]
+            if r < 0:
+                deck[char_index] -= 1
+                self.deck_size -= 1
+                return char_index
+        raise ValueError("Baralho vazio")
+
+    def _exchange(self, player: int) -> bool:
+        """Devolve as cartas ao baralho e compra o mesmo número (como EXCHANGE em CoupGame)"""
+        hand_size = self.card_counts[player]
+        if self.deck_size < hand_size:
+            return False
+
+        base = player * NUM_CHARACTERS
+        hands = self.hands
+        for char_index in range(NUM_CHARACTERS):
+            count = hands[base + char_index]
+            if count:
+                self.deck[char_index] += count
+                self.deck_size += count
+                hands[base + char_index] = 0
+        self.card_counts[player] = 0
+
+        for _ in range(hand_size):
+            self._give_card(player, self._draw())
+        return True
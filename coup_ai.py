@@ -3,36 +3,196 @@ IA Inteligente para jogar Coup
 Utiliza análise de probabilidades, blefe estratégico e modelagem de oponentes
 """
 import random
-from typing import List, Dict, Optional, Tuple
-from coup_game import CoupGame, Player, Action, Character
+from typing import Callable, List, Dict, Optional, Sequence, Tuple
+import numpy as np
+from coup_game import (
+    CoupGame, Player, Action, Character, Reactions, BLOCKING_CHARACTERS, CLAIMED_CHARACTER,
+)
+from compact_state import (
+    CompactState, ACTIONS, ACTION_INDEX, CHAR_INDEX, NUM_CHARACTERS, REQUIRED_CHARACTER, INCOME, NO_TARGET,
+)
+from mcts import ISMCTS, RootParallelISMCTS, SearchStats
+from beliefs import BeliefTracker
+from opponent_model import OpponentModel, OpponentStats, PRIOR_BLUFF_RATE, PRIOR_CHALLENGE_RATE
+from hand_probability import (
+    holds_probability, unseen_counts, unseen_arrays, AT_LEAST_ONE_ARRAY,
+)
+from batch_simulator import (
+    POLICY_CODES, HARD, SequentialDraws, policy_actions, challenge_probabilities,
+    block_challenge_probabilities,
+)
+from endgame_tablebase import duel_scores
+from cfr_solver import (
+    get_policy, action_infoset, challenge_infoset, block_infoset, choose_target, ACCEPT, BLOCKABLE,
+)
+
+# Personagens declarados na ação e no bloqueio dela, como máscaras (ação, personagem)
+_CLAIM_MASKS = np.zeros((len(ACTIONS), NUM_CHARACTERS), dtype=bool)
+_BLOCK_MASKS = np.zeros((len(ACTIONS), NUM_CHARACTERS), dtype=bool)
+for _code, _char in enumerate(REQUIRED_CHARACTER):
+    if _char >= 0:
+        _CLAIM_MASKS[_code, _char] = True
+for _action, _chars in BLOCKING_CHARACTERS.items():
+    _BLOCK_MASKS[ACTION_INDEX[_action], [CHAR_INDEX[char] for char in _chars]] = True
+
+
+def batch_arrays(games: Sequence[CoupGame]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Estado de um lote de partidas em arrays (formato de batch_simulator)
+
+    Partidas com menos jogadores são completadas com assentos eliminados.
+
+    Returns:
+        (moedas (M, P), mãos (M, P, 5), vivos (M, P), baralho (M, 5))
+    """
+    num_players = max(len(game.players) for game in games)
+    coins = np.zeros((len(games), num_players), dtype=np.int32)
+    hands = np.zeros((len(games), num_players, NUM_CHARACTERS), dtype=np.int8)
+    alive = np.zeros((len(games), num_players), dtype=bool)
+    deck = np.array([game.deck.counts for game in games], dtype=np.int8)
+    for m, game in enumerate(games):
+        for p, player in enumerate(game.players):
+            coins[m, p] = player.coins
+            alive[m, p] = not player.eliminated
+            for card in player.cards:
+                hands[m, p, CHAR_INDEX[card]] += 1
+    return coins, hands, alive, deck
+
+
+class DecisionContext:
+    """
+    Fatos derivados do estado para as decisões de um jogador
+
+    Calculados sob demanda e guardados enquanto o estado não muda (mesma
+    game.version e mesmo número de eventos): choose_action, should_challenge e
+    should_block no mesmo estado reaproveitam oponentes, probabilidades,
+    perigo e estado compacto em vez de recalculá-los.
+    """
+
+    def __init__(self, game: CoupGame, observer: Player, beliefs: Callable[[], BeliefTracker]):
+        """
+        Args:
+            game: Jogo observado
+            observer: Jogador que decide
+            beliefs: Função que devolve o BeliefTracker atualizado do observador
+        """
+        self.game = game
+        self.observer = observer
+        self.version = game.version
+        self.event_count = game.events.count
+        self.other_players = game.get_other_players(observer)
+        self._beliefs = beliefs
+        self._probabilities: Optional[Dict[str, Dict[Character, float]]] = None
+        self._unseen: Optional[List[int]] = None
+        self._danger: Optional[Dict[str, float]] = None
+        self._state: Optional[CompactState] = None
+
+    def matches(self, game: CoupGame, observer: Player) -> bool:
+        """True se o contexto ainda vale para o estado atual do jogo"""
+        return (self.game is game and self.observer is observer and self.version == game.version
+                and self.event_count == game.events.count)
+
+    @property
+    def probabilities(self) -> Dict[str, Dict[Character, float]]:
+        """Chance de cada oponente ter cada carta, pelas crenças do observador"""
+        if self._probabilities is None:
+            self._probabilities = self._beliefs().probabilities()
+        return self._probabilities
+
+    @property
+    def unseen(self) -> List[int]:
+        """Cópias não vistas de cada personagem (ver hand_probability.unseen_counts)"""
+        if self._unseen is None:
+            self._unseen = unseen_counts(self.game, self.observer)
+        return self._unseen
+
+    @property
+    def danger(self) -> Dict[str, float]:
+        """Perigo de cada oponente: moedas*2 + cartas*3 + P(Assassino)*5"""
+        if self._danger is None:
+            probabilities = self.probabilities
+            self._danger = {
+                p.name: p.coins * 2 + len(p.cards) * 3
+                + probabilities.get(p.name, {}).get(Character.ASSASSIN, 0) * 5
+                for p in self.other_players
+            }
+        return self._danger
+
+    @property
+    def state(self) -> CompactState:
+        """Estado compacto do jogo (compartilhado: só leitura)"""
+        if self._state is None:
+            self._state = CompactState.from_game(self.game)
+        return self._state
+
 
 class CoupAI:
     """IA que joga Coup usando estratégias avançadas"""
     
-    def __init__(self, name: str = "IA", difficulty: str = "hard", learning_params: Dict = None):
+    # Expert desafia declarações com chance menor que esta de serem verdadeiras
+    EXPERT_CHALLENGE_THRESHOLD = 0.3
+    # Diferença mínima entre as ações na tabela de finais para seguir a tabela
+    ENDGAME_MIN_SPREAD = 0.05
+    # Parâmetros de aprendizado padrão (todos em [0, 1])
+    DEFAULT_LEARNING_PARAMS = {
+        "bluff_probability": 0.4,
+        "challenge_aggressiveness": 0.5,
+        "block_probability": 0.7,
+        "tax_preference": 0.8,
+        "steal_preference": 0.6,
+        "assassinate_preference": 0.5
+    }
+    # Ações de personagem do hard, tentadas em ordem decrescente de preferência
+    POWER_PREFERENCES = (
+        (Action.TAX, "tax_preference"),
+        (Action.STEAL, "steal_preference"),
+        (Action.ASSASSINATE, "assassinate_preference"),
+    )
+    # Chance de blefar bloqueio de roubo por unidade de block_probability (0.3 no padrão)
+    BLUFF_BLOCK_PER_BLOCK_PROBABILITY = 0.3 / 0.7
+    
+    def __init__(self, name: str = "IA", difficulty: str = "hard", learning_params: Dict = None,
+                 seed: Optional[int] = None, rng: Optional[random.Random] = None,
+                 search_time_ms: Optional[float] = 200.0, search_nodes: Optional[int] = None,
+                 search_workers: int = 1, compiled_policy=None):
         """
         Args:
             name: Nome da IA
-            difficulty: "easy", "medium", "hard"
+            difficulty: "easy", "medium", "hard", "expert" (busca ISMCTS),
+                "cfr" (tabela de estratégia treinada por cfr_solver)
             learning_params: Parâmetros aprendidos (opcional)
+            seed: Semente para um gerador próprio (decisões reproduzíveis)
+            rng: Gerador aleatório injetado (tem prioridade sobre seed).
+                Sem nenhum dos dois, usa o módulo random global.
+            search_time_ms: Tempo de busca por jogada no nível expert (None = sem limite)
+            search_nodes: Nós expandidos por jogada no nível expert (None = sem limite)
+            search_workers: Processos da busca paralela na raiz (1 = busca no próprio processo)
+            compiled_policy: policy_table.CompiledPolicy consultada antes da
+                estratégia ao vivo (chaves não cobertas usam a estratégia)
         """
         self.name = name
+        if rng is not None:
+            self.rng = rng
+        elif seed is not None:
+            self.rng = random.Random(seed)
+        else:
+            self.rng = random
         self.difficulty = difficulty
-        self.memory = {}  # Memória de ações dos oponentes
-        self.opponent_models = {}  # Modelos de comportamento dos oponentes
+        self.search_time_ms = search_time_ms
+        self.search_nodes = search_nodes
+        self.search_workers = search_workers
+        self._parallel_search: Optional[RootParallelISMCTS] = None  # Pool reaproveitado entre jogadas
+        self.compiled_policy = compiled_policy
+        self.last_search_stats: Optional[SearchStats] = None  # Estatísticas da última busca
+        self.beliefs: Optional[BeliefTracker] = None  # Crenças sobre as cartas dos oponentes
+        self._context: Optional[DecisionContext] = None  # Fatos do estado da última decisão
+        self.opponent_model = OpponentModel()  # Comportamento dos oponentes (decaimento exponencial)
         
         # Parâmetros de aprendizado
         if learning_params:
             self.learning_params = learning_params
         else:
-            self.learning_params = {
-                "bluff_probability": 0.4,
-                "challenge_aggressiveness": 0.5,
-                "block_probability": 0.7,
-                "tax_preference": 0.8,
-                "steal_preference": 0.6,
-                "assassinate_preference": 0.5
-            }
+            self.learning_params = dict(self.DEFAULT_LEARNING_PARAMS)
     
     def choose_action(self, game: CoupGame, player: Player) -> Tuple[Action, Optional[Player], bool]:
         """
@@ -41,30 +201,113 @@ class CoupAI:
         Returns:
             (action, target, is_bluff)
         """
+        if self.compiled_policy is not None:
+            move = self.compiled_policy.lookup(game, player)
+            if move is not None:
+                return move
+        
+        if self.difficulty in ("hard", "expert"):
+            # Duelo: resposta da tabela de finais 1v1 (sem busca)
+            move = self._endgame_move(game, player)
+            if move is not None:
+                self.last_search_stats = None
+                return move
+        
         if self.difficulty == "easy":
             return self._easy_strategy(game, player)
         elif self.difficulty == "medium":
             return self._medium_strategy(game, player)
+        elif self.difficulty == "expert":
+            return self._expert_strategy(game, player)
+        elif self.difficulty == "cfr" and get_policy(len(game.players)) is not None:
+            return self._cfr_strategy(game, player)
         else:
             return self._hard_strategy(game, player)
     
+    def choose_actions(self, games: Sequence[CoupGame]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        choose_action em lote: o jogador da vez de cada partida decide
+        
+        easy, medium e hard são vetorizados com as políticas de batch_simulator,
+        com as mesmas crenças, preferências e modelo de oponentes da decisão
+        escalar, e sorteiam com self.rng na mesma ordem: choose_actions([game])
+        decide como choose_action. O hard decide duelos jogada a jogada
+        (tabela de finais). Demais níveis e a política compilada decidem uma
+        partida por vez.
+        
+        Returns:
+            (ações, alvos, blefes) por partida: códigos de compact_state.ACTIONS,
+            índices dos alvos (-1 = nenhum) e se o personagem declarado não está na mão
+        """
+        count = len(games)
+        actor = np.array([game.current_player_index for game in games], dtype=np.int64)
+        coins, hands, alive, _ = batch_arrays(games)
+        actions = np.full(count, INCOME)
+        targets = np.full(count, NO_TARGET)
+        
+        vectorized = np.full(count, self.compiled_policy is None and self.difficulty in POLICY_CODES)
+        if self.difficulty == "hard":
+            vectorized &= alive.sum(axis=1) > 2
+        
+        for i in np.nonzero(~vectorized)[0]:
+            game = games[i]
+            action, target, _ = self.choose_action(game, game.players[actor[i]])
+            actions[i] = ACTION_INDEX[action]
+            targets[i] = game.players.index(target) if target is not None else NO_TARGET
+        
+        rows = np.nonzero(vectorized)[0]
+        if len(rows):
+            probabilities = challenge_rate = None
+            if self.difficulty == "hard":
+                probabilities, challenge_rate = self._policy_beliefs([games[i] for i in rows], actor[rows],
+                                                                     coins.shape[1])
+            actions[rows], targets[rows] = policy_actions(
+                POLICY_CODES[self.difficulty], coins[rows], hands[rows], alive[rows], actor[rows],
+                self.rng, self.learning_params, probabilities=probabilities, challenge_rate=challenge_rate,
+            )
+        
+        claimed = _CLAIM_MASKS[actions]
+        bluffs = claimed.any(axis=1) & ~(claimed & (hands[np.arange(count), actor] > 0)).any(axis=1)
+        return actions, targets, bluffs
+    
+    def _policy_beliefs(self, games: Sequence[CoupGame], actor: np.ndarray,
+                        num_players: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Crenças do hard em arrays para hard_policy
+        
+        Returns:
+            (chance de cada oponente ter cada personagem (M, P, 5), maior taxa
+            de desafio entre os oponentes (M))
+        """
+        probabilities = np.zeros((len(games), num_players, NUM_CHARACTERS))
+        challenge_rate = np.zeros(len(games))
+        for m, (game, index) in enumerate(zip(games, actor)):
+            context = self._decision_context(game, game.players[index])
+            for opponent in context.other_players:
+                p = game.players.index(opponent)
+                for char, chance in context.probabilities[opponent.name].items():
+                    probabilities[m, p, CHAR_INDEX[char]] = chance
+            challenge_rate[m] = max(self._opponent(game, opponent.name).challenge_rate()
+                                    for opponent in context.other_players)
+        return probabilities, challenge_rate
+    
     def _easy_strategy(self, game: CoupGame, player: Player) -> Tuple[Action, Optional[Player], bool]:
         """Estratégia simples: sempre Income ou Foreign Aid"""
         if player.coins >= 7:
             # Pode fazer Coup
-            targets = game.get_other_players(player)
+            targets = self._decision_context(game, player).other_players
             if targets:
-                return (Action.COUP, random.choice(targets), False)
+                return (Action.COUP, self.rng.choice(targets), False)
         
         # Tenta Foreign Aid
-        if random.random() < 0.7:
+        if self.rng.random() < 0.7:
             return (Action.FOREIGN_AID, None, False)
         else:
             return (Action.INCOME, None, False)
     
     def _medium_strategy(self, game: CoupGame, player: Player) -> Tuple[Action, Optional[Player], bool]:
         """Estratégia média: usa personagens quando tem, blefe ocasional"""
-        other_players = game.get_other_players(player)
+        other_players = self._decision_context(game, player).other_players
         
         if not other_players:
             return (Action.INCOME, None, False)
@@ -87,12 +330,12 @@ class CoupAI:
         
         if player.has_card(Character.ASSASSIN) and player.coins >= 3:
             # Assassina se tiver moedas
-            target = random.choice(other_players)
+            target = self.rng.choice(other_players)
             return (Action.ASSASSINATE, target, False)
         
         # Blefe ocasional (30% chance)
-        if random.random() < 0.3:
-            if random.random() < 0.5:
+        if self.rng.random() < 0.3:
+            if self.rng.random() < 0.5:
                 return (Action.TAX, None, True)  # Blefa Duque
             else:
                 rich_target = max(other_players, key=lambda p: p.coins)
@@ -100,99 +343,171 @@ class CoupAI:
                     return (Action.STEAL, rich_target, True)  # Blefa Capitão
         
         # Default: Foreign Aid ou Income
-        if random.random() < 0.6:
+        if self.rng.random() < 0.6:
             return (Action.FOREIGN_AID, None, False)
         else:
             return (Action.INCOME, None, False)
     
     def _hard_strategy(self, game: CoupGame, player: Player) -> Tuple[Action, Optional[Player], bool]:
         """Estratégia avançada: análise de probabilidades, blefe inteligente, modelagem de oponentes"""
-        other_players = game.get_other_players(player)
+        context = self._decision_context(game, player)
+        other_players = context.other_players
         
         if not other_players:
             return (Action.INCOME, None, False)
         
         # Calcula probabilidades de cartas dos oponentes
-        probabilities = self._calculate_probabilities(game, player)
+        probabilities = context.probabilities
         
         # Estratégia 1: Coup quando possível (mais seguro)
         if player.coins >= 7:
             # Elimina o jogador mais perigoso
-            target = self._get_most_dangerous_player(game, player, probabilities)
+            target = self._get_most_dangerous_player(context)
             return (Action.COUP, target, False)
         
-        # Estratégia 2: Usa poderes quando tem
-        if player.has_card(Character.DUKE):
-            if player.coins < 6:
-                return (Action.TAX, None, False)
-        
-        if player.has_card(Character.CAPTAIN):
-            # Rouba do jogador mais rico que provavelmente não tem Capitão
-            safe_target = self._find_safe_steal_target(other_players, probabilities)
-            if safe_target:
-                return (Action.STEAL, safe_target, False)
-        
-        if player.has_card(Character.ASSASSIN) and player.coins >= 3:
-            # Assassina se o alvo provavelmente não tem Condessa
-            target = self._find_vulnerable_target(other_players, probabilities)
-            if target:
-                return (Action.ASSASSINATE, target, False)
+        # Estratégia 2: Usa poderes quando tem, na ordem das preferências aprendidas
+        preferences = sorted(
+            self.POWER_PREFERENCES,
+            key=lambda item: -self.learning_params.get(item[1], self.DEFAULT_LEARNING_PARAMS[item[1]]),
+        )
+        for action, _ in preferences:
+            move = self._power_move(action, player, other_players, probabilities)
+            if move:
+                return move
         
         # Estratégia 3: Blefe inteligente (usa parâmetros aprendidos)
+        # Mesa que desafia mais que o esperado pede menos blefes (e vice-versa)
+        challenge_rate = max(self._opponent(game, p.name).challenge_rate() for p in other_players)
         bluff_prob = self.learning_params.get("bluff_probability", 0.4)
-        if player.coins >= 3 and random.random() < bluff_prob:
+        bluff_prob *= (1 - challenge_rate) / (1 - PRIOR_CHALLENGE_RATE)
+        if player.coins >= 3 and self.rng.random() < bluff_prob:
             # Blefa se a probabilidade de ser desafiado é baixa
             bluff_action, target = self._smart_bluff(other_players, probabilities)
             if bluff_action:
                 return (bluff_action, target, True)
         
         # Estratégia 4: Foreign Aid (seguro, mas pode ser bloqueado)
-        if random.random() < 0.7:
+        if self.rng.random() < 0.7:
             return (Action.FOREIGN_AID, None, False)
         else:
             return (Action.INCOME, None, False)
     
-    def _calculate_probabilities(self, game: CoupGame, player: Player) -> Dict[str, Dict[Character, float]]:
-        """Calcula probabilidades de cada oponente ter cada carta"""
-        probabilities = {}
-        
-        # Cartas conhecidas (já reveladas)
-        known_cards = []
-        for history_item in game.game_history:
-            # Pode inferir cartas de ações anteriores
-            pass  # TODO: Implementar inferência de cartas do histórico
-        
-        # Para cada oponente
-        for opponent in game.get_other_players(player):
-            probs = {}
-            total_possible = len(game.deck) + sum(len(p.cards) for p in game.players if p != player)
-            
-            # Distribuição inicial: cada carta tem 3 cópias no baralho
-            for char in Character:
-                # Simplificado: assume distribuição uniforme
-                probs[char] = 0.3  # ~30% chance (3 de 10 cartas possíveis)
-            
-            probabilities[opponent.name] = probs
+    def _power_move(self, action: Action, player: Player, other_players: List[Player],
+                    probabilities: Dict) -> Optional[Tuple[Action, Optional[Player], bool]]:
+        """Ação honesta de personagem do hard, se a mão e as moedas permitirem"""
+        if action == Action.TAX:
+            if player.has_card(Character.DUKE) and player.coins < 6:
+                return (Action.TAX, None, False)
         
-        return probabilities
+        elif action == Action.STEAL:
+            if player.has_card(Character.CAPTAIN):
+                # Rouba do jogador mais rico que provavelmente não tem Capitão
+                safe_target = self._find_safe_steal_target(other_players, probabilities)
+                if safe_target:
+                    return (Action.STEAL, safe_target, False)
+        
+        elif player.has_card(Character.ASSASSIN) and player.coins >= 3:
+            # Assassina se o alvo provavelmente não tem Condessa
+            target = self._find_vulnerable_target(other_players, probabilities)
+            if target:
+                return (Action.ASSASSINATE, target, False)
+        return None
+    
+    def _expert_strategy(self, game: CoupGame, player: Player) -> Tuple[Action, Optional[Player], bool]:
+        """Estratégia expert: ISMCTS com orçamento de tempo/nós (ver last_search_stats)"""
+        state = CompactState.from_game(game)
+        state.rng = self.rng  # A busca não pode consumir o gerador do jogo
+        if self.search_workers > 1:
+            if self._parallel_search is None:
+                self._parallel_search = RootParallelISMCTS(
+                    workers=self.search_workers, time_budget_ms=self.search_time_ms,
+                    node_budget=self.search_nodes, rng=self.rng,
+                )
+            searcher = self._parallel_search
+        else:
+            searcher = ISMCTS(time_budget_ms=self.search_time_ms, node_budget=self.search_nodes, rng=self.rng)
+        (action_code, target_index), self.last_search_stats = searcher.search(
+            state, game.players.index(player)
+        )
+        
+        action = ACTIONS[action_code]
+        target = game.players[target_index] if target_index >= 0 else None
+        claimed = CLAIMED_CHARACTER.get(action)
+        return (action, target, claimed is not None and not player.has_card(claimed))
+    
+    def _cfr_strategy(self, game: CoupGame, player: Player) -> Tuple[Action, Optional[Player], bool]:
+        """Estratégia CFR: sorteia a ação pela tabela do infoset abstrato"""
+        policy = get_policy(len(game.players))
+        state = self._decision_context(game, player).state
+        index = game.players.index(player)
+        key, mask = action_infoset(state, index)
+        action_code = policy.sample(key, self.rng, mask)
+        target_index = choose_target(state, index, action_code)
+        
+        action = ACTIONS[action_code]
+        target = game.players[target_index] if target_index >= 0 else None
+        claimed = CLAIMED_CHARACTER.get(action)
+        return (action, target, claimed is not None and not player.has_card(claimed))
     
-    def _get_most_dangerous_player(self, game: CoupGame, player: Player, 
-                                  probabilities: Dict) -> Player:
-        """Identifica o jogador mais perigoso"""
-        other_players = game.get_other_players(player)
+    def _cfr_reaction(self, game: CoupGame, player: Player, infoset) -> Optional[bool]:
+        """
+        Desafio/bloqueio pela tabela CFR (None sem tabela: usa o nível hard)
         
-        # Cálculo de perigo: moedas + cartas + probabilidade de ter Assassino
-        def danger_score(p: Player) -> float:
-            score = p.coins * 2  # Moedas = poder
-            score += len(p.cards) * 3  # Mais cartas = mais perigoso
-            
-            # Se provavelmente tem Assassino, é mais perigoso
-            if p.name in probabilities:
-                score += probabilities[p.name].get(Character.ASSASSIN, 0) * 5
-            
-            return score
+        Args:
+            player: Jogador que reage
+            infoset: Função (estado compacto) -> índice do infoset
+        """
+        policy = get_policy(len(game.players))
+        if policy is None:
+            return None
+        return policy.sample(infoset(self._decision_context(game, player).state), self.rng) == ACCEPT
+    
+    def _endgame_move(self, game: CoupGame, player: Player) -> Optional[Tuple[Action, Optional[Player], bool]]:
+        """Melhor ação honesta pela tabela de finais (None fora de um duelo)"""
+        opponents = self._decision_context(game, player).other_players
+        if len(opponents) != 1:
+            return None
+        opponent = opponents[0]
+        scores = duel_scores(game, player, self.belief_distribution(game, player, opponent))
+        if not scores or max(scores.values()) - min(scores.values()) < self.ENDGAME_MIN_SPREAD:
+            return None  # A tabela não distingue as ações: fica com a estratégia normal
+        action = max(scores, key=scores.get)
+        target = opponent if action in (Action.COUP, Action.ASSASSINATE, Action.STEAL) else None
+        return (action, target, False)
+    
+    def _belief_tracker(self, game: CoupGame, player: Player) -> BeliefTracker:
+        """
+        BeliefTracker por (jogo, jogador), atualizado só com os eventos novos
+        desde a última decisão
+        """
+        tracker = self.beliefs
+        if tracker is None or tracker.game is not game or tracker.observer is not player:
+            tracker = self.beliefs = BeliefTracker(game, player)
+        tracker.update()
+        return tracker
+    
+    def _decision_context(self, game: CoupGame, player: Player) -> DecisionContext:
+        """
+        Contexto de decisão do jogador no estado atual
         
-        return max(other_players, key=danger_score)
+        Reaproveitado por todas as decisões até o jogo mudar (game.version ou
+        novos eventos); aí é recriado vazio.
+        """
+        context = self._context
+        if context is None or not context.matches(game, player):
+            context = self._context = DecisionContext(
+                game, player, lambda: self._belief_tracker(game, player)
+            )
+        return context
+    
+    def _calculate_probabilities(self, game: CoupGame, player: Player) -> Dict[str, Dict[Character, float]]:
+        """Calcula probabilidades de cada oponente ter cada carta (ver _belief_tracker)"""
+        return self._decision_context(game, player).probabilities
+    
+    def _get_most_dangerous_player(self, context: DecisionContext) -> Player:
+        """Identifica o jogador mais perigoso (ver DecisionContext.danger)"""
+        danger = context.danger
+        return max(context.other_players, key=lambda p: danger[p.name])
     
     def _find_safe_steal_target(self, targets: List[Player], 
                                 probabilities: Dict) -> Optional[Player]:
@@ -237,7 +552,7 @@ class CoupAI:
             vulnerable_targets.sort(key=lambda x: x[1])
             return vulnerable_targets[0][0]
         
-        return random.choice(targets) if targets else None
+        return self.rng.choice(targets) if targets else None
     
     def _smart_bluff(self, targets: List[Player], 
                     probabilities: Dict) -> Tuple[Optional[Action], Optional[Player]]:
@@ -258,25 +573,134 @@ class CoupAI:
                         target: Player, action: Action) -> bool:
         """Decide se deve desafiar uma ação (usa parâmetros aprendidos)"""
         if self.difficulty == "easy":
-            return random.random() < 0.2  # 20% chance
+            return self.rng.random() < 0.2  # 20% chance
         
         if self.difficulty == "medium":
             # Desafia se tem pouca confiança
-            return random.random() < 0.4
+            return self.rng.random() < 0.4
+        
+        if self.difficulty == "expert":
+            return self._unlikely_claim(game, challenger, target, (CLAIMED_CHARACTER[action],))
+        
+        if self.difficulty == "cfr":
+            decision = self._cfr_reaction(game, challenger, lambda state: challenge_infoset(
+                state, game.players.index(challenger), game.players.index(target), ACTION_INDEX[action], False))
+            if decision is not None:
+                return decision
         
         # Hard: análise mais sofisticada com parâmetros aprendidos
         challenge_agg = self.learning_params.get("challenge_aggressiveness", 0.5)
+        # Quem já foi pego blefando mais que o esperado é desafiado mais
+        factor = self._opponent(game, target.name).bluff_rate() / PRIOR_BLUFF_RATE
         
         # Se a ação é muito perigosa, desafia mais
         if action in [Action.ASSASSINATE, Action.STEAL]:
             if challenger.coins < 2:  # Desafia para proteger moedas
-                return random.random() < (0.4 + challenge_agg * 0.4)
+                return self.rng.random() < (0.4 + challenge_agg * 0.4) * factor
         
         # Se tem poucas cartas, menos provável que desafie
         if len(challenger.cards) == 1:
-            return random.random() < (0.2 + challenge_agg * 0.2)
+            return self.rng.random() < (0.2 + challenge_agg * 0.2) * factor
+        
+        return self.rng.random() < challenge_agg * factor
+    
+    def should_challenge_block(self, game: CoupGame, challenger: Player,
+                               blocker: Player, action: Action) -> bool:
+        """Decide se deve desafiar o bloqueio de uma ação"""
+        if self.difficulty == "easy":
+            return self.rng.random() < 0.1
+        
+        if self.difficulty == "medium":
+            return self.rng.random() < 0.2
         
-        return random.random() < challenge_agg
+        if self.difficulty == "expert":
+            return self._unlikely_claim(game, challenger, blocker, BLOCKING_CHARACTERS[action])
+        
+        if self.difficulty == "cfr":
+            decision = self._cfr_reaction(game, challenger, lambda state: challenge_infoset(
+                state, game.players.index(challenger), game.players.index(blocker), ACTION_INDEX[action], True))
+            if decision is not None:
+                return decision
+        
+        # Hard: cópias dos personagens de bloqueio na própria mão tornam o blefe mais provável
+        challenge_agg = self.learning_params.get("challenge_aggressiveness", 0.5)
+        held = sum(1 for card in challenger.cards if card in BLOCKING_CHARACTERS[action])
+        probability = challenge_agg * 0.5 + held * 0.2
+        if len(challenger.cards) == 1:
+            probability *= 0.5
+        probability *= self._opponent(game, blocker.name).bluff_rate() / PRIOR_BLUFF_RATE
+        return self.rng.random() < probability
+    
+    def should_challenge_batch(self, games: Sequence[CoupGame], challengers: Sequence[int],
+                               claimants: Sequence[int], actions: Sequence[int],
+                               block: bool = False) -> np.ndarray:
+        """
+        should_challenge (ou should_challenge_block) em lote
+        
+        Args:
+            games: Partidas
+            challengers: Índice do desafiante em cada partida
+            claimants: Índice de quem declarou (ator ou bloqueador)
+            actions: Código da ação declarada (compact_state.ACTIONS)
+            block: Desafio do bloqueio da ação em vez da ação
+        
+        Returns:
+            Máscara das partidas em que o desafiante desafia
+        """
+        count = len(games)
+        challengers = np.asarray(challengers, dtype=np.int64)
+        claimants = np.asarray(claimants, dtype=np.int64)
+        actions = np.asarray(actions, dtype=np.int64)
+        
+        if self.difficulty == "cfr":
+            decide = self.should_challenge_block if block else self.should_challenge
+            return np.array([
+                decide(game, game.players[c], game.players[t], ACTIONS[a])
+                for game, c, t, a in zip(games, challengers, claimants, actions)
+            ], dtype=bool)
+        
+        coins, hands, alive, deck = batch_arrays(games)
+        rows = np.arange(count)
+        claimed = (_BLOCK_MASKS if block else _CLAIM_MASKS)[actions]
+        
+        if self.difficulty == "expert":
+            # Mesma regra de _unlikely_claim, com a tabela hipergeométrica
+            unseen = unseen_arrays(deck, hands, challengers)
+            copies = (unseen * claimed).sum(axis=1)
+            p_has = AT_LEAST_ONE_ARRAY[unseen.sum(axis=1), copies, hands[rows, claimants].sum(axis=1)]
+            return p_has < self.EXPERT_CHALLENGE_THRESHOLD
+        
+        policy = np.full(count, POLICY_CODES.get(self.difficulty, HARD))
+        aggressiveness = self.learning_params.get("challenge_aggressiveness", 0.5)
+        # Quem já foi pego blefando mais que o esperado é desafiado mais (só o hard)
+        bluff_factor = 1.0
+        if policy[0] == HARD:
+            bluff_factor = np.array([
+                self._opponent(game, game.players[t].name).bluff_rate() / PRIOR_BLUFF_RATE
+                for game, t in zip(games, claimants)
+            ])
+        challenger_cards = hands[rows, challengers].sum(axis=1)
+        if block:
+            held = (hands[rows, challengers] * claimed).sum(axis=1)
+            probability = block_challenge_probabilities(policy, challenger_cards, held, aggressiveness,
+                                                        bluff_factor)
+        else:
+            probability = challenge_probabilities(policy, coins[rows, challengers], challenger_cards,
+                                                  actions, aggressiveness, bluff_factor)
+        # Um sorteio por partida, na ordem, como should_challenge chamado partida a partida
+        return SequentialDraws(self.rng).random(np.ones(count, dtype=bool)) < probability
+    
+    def _unlikely_claim(self, game: CoupGame, observer: Player, claimant: Player,
+                        characters: Tuple[Character, ...]) -> bool:
+        """
+        Declaração improvável para o observador (usado pelo expert nos desafios)
+        
+        Chance exata (tabela hipergeométrica) de claimant ter pelo menos uma das
+        cópias que o observador não vê (fora da sua mão e das cartas reveladas).
+        """
+        unseen = self._decision_context(game, observer).unseen
+        p_has = holds_probability(game, observer, claimant, characters, unseen)
+        return p_has < self.EXPERT_CHALLENGE_THRESHOLD
     
     def should_block(self, game: CoupGame, blocker: Player, 
                     action: Action, actor: Player) -> bool:
@@ -284,6 +708,12 @@ class CoupAI:
         if blocker.eliminated:
             return False
         
+        if self.difficulty == "cfr" and ACTION_INDEX[action] in BLOCKABLE:
+            decision = self._cfr_reaction(game, blocker, lambda state: block_infoset(
+                state, game.players.index(blocker), game.players.index(actor), ACTION_INDEX[action]))
+            if decision is not None:
+                return decision
+        
         # Se tem a carta, sempre bloqueia ações perigosas
         if action == Action.FOREIGN_AID and blocker.has_card(Character.DUKE):
             return True
@@ -295,19 +725,89 @@ class CoupAI:
         if action == Action.ASSASSINATE and blocker.has_card(Character.CONTESSA):
             return True
         
-        # Blefe de bloqueio (risco)
-        if self.difficulty == "hard" and random.random() < 0.3:
+        # Expert: com uma carta só, blefar Condessa não tem nada a perder
+        if self.difficulty == "expert":
+            return action == Action.ASSASSINATE and len(blocker.cards) == 1
+        
+        # Blefe de bloqueio (risco), mais frequente com block_probability alto
+        block_probability = self.learning_params.get("block_probability",
+                                                     self.DEFAULT_LEARNING_PARAMS["block_probability"])
+        if self.difficulty == "hard" and self.rng.random() < block_probability * self.BLUFF_BLOCK_PER_BLOCK_PROBABILITY:
             if action == Action.STEAL and blocker.coins >= 2:
                 return True  # Blefa bloqueio
         
         return False
     
-    def update_memory(self, player_name: str, action: Action, was_bluff: bool):
-        """Atualiza memória sobre ações dos jogadores"""
-        if player_name not in self.memory:
-            self.memory[player_name] = []
+    def _opponent(self, game: CoupGame, name: str) -> OpponentStats:
+        """Estatísticas do oponente, com os eventos novos do jogo já processados"""
+        self.opponent_model.update(game)
+        return self.opponent_model.get(name)
+    
+    def opponent_stats(self, game: CoupGame, name: str) -> OpponentStats:
+        """
+        Comportamento observado do jogador `name` neste jogo (taxas de blefe e
+        de desafio do OpponentModel, já com os eventos novos)
+        """
+        return self._opponent(game, name)
+    
+    def belief_distribution(self, game: CoupGame, player: Player,
+                            opponent: Player) -> Dict[Tuple[Character, ...], float]:
+        """
+        Distribuição da mão de opponent pelas crenças de player
         
-        self.memory[player_name].append({
-            "action": action,
-            "was_bluff": was_bluff
-        })
+        Returns:
+            Dict mão (personagens ordenados) -> probabilidade
+        """
+        return self._belief_tracker(game, player).hand_distribution(opponent)
+    
+    def update_memory(self, player_name: str, action: Action, was_bluff: Optional[bool] = None):
+        """
+        Registra um turno observado fora do registro de eventos (ex: partida física)
+        
+        Args:
+            was_bluff: Resultado de um desafio à declaração (None se não foi desafiada)
+        """
+        self.opponent_model.record(player_name, action, was_bluff)
+    
+    def close(self):
+        """Libera o pool de processos da busca paralela (se houver)"""
+        if self._parallel_search is not None:
+            self._parallel_search.close()
+            self._parallel_search = None
+
+class AIReactions(Reactions):
+    """Reações de um grupo de IAs para CoupGame.play_turn (jogadores sem IA não reagem)"""
+    
+    def __init__(self, ais: List[CoupAI]):
+        self.ais = {ai.name: ai for ai in ais}
+    
+    def challenge(self, game: CoupGame, challenger: Player, claimant: Player,
+                  action: Action, block: bool = False) -> bool:
+        ai = self.ais.get(challenger.name)
+        if ai is None:
+            return False
+        if block:
+            return ai.should_challenge_block(game, challenger, claimant, action)
+        return ai.should_challenge(game, challenger, claimant, action)
+    
+    def block(self, game: CoupGame, blocker: Player, actor: Player, action: Action) -> bool:
+        ai = self.ais.get(blocker.name)
+        return ai is not None and ai.should_block(game, blocker, action, actor)
+
+
+class BatchedReactions(AIReactions):
+    """
+    AIReactions com os desafios à declaração da ação já decididos em lote
+    (CoupAI.should_challenge_batch); bloqueios e desafios de bloqueio
+    continuam sendo perguntados a cada IA
+    """
+    
+    def __init__(self, ais: List[CoupAI]):
+        super().__init__(ais)
+        self.preset: Dict[str, bool] = {}  # Nome do desafiante -> desafia a ação da vez
+    
+    def challenge(self, game: CoupGame, challenger: Player, claimant: Player,
+                  action: Action, block: bool = False) -> bool:
+        if not block and challenger.name in self.preset:
+            return self.preset[challenger.name]
+        return super().challenge(game, challenger, claimant, action, block)
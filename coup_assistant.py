@@ -3,12 +3,21 @@ Assistente de IA que ajuda o jogador humano a vencer Coup
 Analisa o jogo e sugere a melhor jogada
 """
 from typing import List, Dict, Optional, Tuple
-from coup_game import CoupGame, Player, Action, Character
+from coup_game import CoupGame, Player, Action, Character, CLAIMED_CHARACTER, BLOCKING_CHARACTERS
 from coup_ai import CoupAI
+from hand_probability import holds_probability, unseen_counts
+from endgame_tablebase import duel_scores
 
 class CoupAssistant:
     """Assistente inteligente que ajuda o jogador a vencer"""
     
+    # Abaixo desta chance de ter o personagem declarado, recomenda desafiar
+    UNLIKELY_CLAIM = 0.3
+    # Oponente pego blefando acima desta taxa (nas declarações desafiadas) merece desafio
+    FREQUENT_BLUFFER = 0.5
+    # Mesa que desafia acima desta taxa torna o blefe arriscado demais
+    FREQUENT_CHALLENGER = 0.5
+    
     def __init__(self):
         self.ai = CoupAI(name="Assistente", difficulty="hard")
         # Tenta usar Gemini se disponível
@@ -58,6 +67,13 @@ class CoupAssistant:
         # Analisa situação
         analysis = self._analyze_situation(game, player)
         
+        # Duelo: consulta a tabela de finais 1v1 em vez das heurísticas
+        if len(other_players) == 1:
+            duel = self._duel_recommendation(game, player, other_players[0])
+            if duel:
+                recommendation.update(duel)
+                return recommendation
+        
         # Recomendação 1: Coup quando possível (mais seguro)
         if player.coins >= 7:
             target = self._get_best_coup_target(game, player)
@@ -125,6 +141,26 @@ class CoupAssistant:
         
         return recommendation
     
+    def _duel_recommendation(self, game: CoupGame, player: Player, opponent: Player) -> Dict:
+        """Melhor ação pela tabela de finais, com as crenças sobre a mão do oponente"""
+        scores = duel_scores(game, player, self.ai.belief_distribution(game, player, opponent))
+        if not scores:
+            return {}
+        
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        action, score = ranked[0]
+        targeted = (Action.COUP, Action.ASSASSINATE, Action.STEAL)
+        return {
+            "best_action": action,
+            "target": opponent if action in targeted else None,
+            "confidence": score,
+            "reasoning": f"Final 1v1 (tabela resolvida): {action.value} vence em ~{score:.0%} das mãos prováveis de {opponent.name}.",
+            "alternatives": [
+                {"action": other, "reasoning": f"Vence em ~{other_score:.0%} das mãos prováveis."}
+                for other, other_score in ranked[1:3]
+            ],
+        }
+    
     def _analyze_situation(self, game: CoupGame, player: Player) -> Dict:
         """Analisa a situação atual do jogo"""
         other_players = game.get_other_players(player)
@@ -161,17 +197,27 @@ class CoupAssistant:
     def _find_best_steal_target(self, game: CoupGame, player: Player, 
                                 targets: List[Player]) -> Optional[Player]:
         """Encontra o melhor alvo para roubar"""
-        # Rouba do mais rico
+        # Moedas esperadas: o que dá para roubar vezes a chance de não ser bloqueado
         if targets:
-            return max(targets, key=lambda p: p.coins)
+            unseen = unseen_counts(game, player)
+            blockers = BLOCKING_CHARACTERS[Action.STEAL]
+            return max(targets, key=lambda p: (
+                min(p.coins, 2) * (1.0 - holds_probability(game, player, p, blockers, unseen)),
+                p.coins,
+            ))
         return None
     
     def _find_best_assassinate_target(self, game: CoupGame, player: Player,
                                      targets: List[Player]) -> Optional[Player]:
         """Encontra o melhor alvo para assassinar"""
-        # Prioriza quem tem mais cartas (mais perigoso)
+        # Prioriza quem tem mais cartas (mais perigoso); empate: menor chance de Condessa
         if targets:
-            return max(targets, key=lambda p: len(p.cards))
+            unseen = unseen_counts(game, player)
+            blockers = BLOCKING_CHARACTERS[Action.ASSASSINATE]
+            return max(targets, key=lambda p: (
+                len(p.cards),
+                -holds_probability(game, player, p, blockers, unseen),
+            ))
         return None
     
     def _evaluate_bluff(self, game: CoupGame, player: Player,
@@ -184,6 +230,14 @@ class CoupAssistant:
             "reasoning": ""
         }
         
+        # Não blefa contra quem desafia muito
+        if targets:
+            challenger = max(targets, key=lambda p: self.ai.opponent_stats(game, p.name).challenge_rate())
+            rate = self.ai.opponent_stats(game, challenger.name).challenge_rate()
+            if rate >= self.FREQUENT_CHALLENGER:
+                recommendation["reasoning"] = f"{challenger.name} desafia {rate:.0%} das declarações. Evite blefar."
+                return recommendation
+        
         # Blefa Tax (Duque) se tem poucas moedas
         if player.coins < 4:
             recommendation["should_bluff"] = True
@@ -204,10 +258,28 @@ class CoupAssistant:
         return recommendation
     
     def should_challenge_action(self, game: CoupGame, player: Player,
-                               target: Player, action: Action) -> Tuple[bool, str]:
-        """Recomenda se deve desafiar uma ação"""
+                               target: Player, action: Action,
+                               block: bool = False) -> Tuple[bool, str]:
+        """Recomenda se deve desafiar uma ação (ou o bloqueio dela, com block=True)"""
         reasoning = ""
         
+        # Chance exata de ter o personagem, pelas cartas que você não vê
+        characters = BLOCKING_CHARACTERS.get(action, ()) if block else (
+            (CLAIMED_CHARACTER[action],) if action in CLAIMED_CHARACTER else ())
+        if characters:
+            p_has = holds_probability(game, player, target, characters)
+            names = " ou ".join(c.value for c in characters)
+            if p_has < self.UNLIKELY_CLAIM:
+                reasoning = f"Só {p_has:.0%} de chance de {target.name} ter {names}. Desafie!"
+                return True, reasoning
+            bluff_rate = self.ai.opponent_stats(game, target.name).bluff_rate()
+            if bluff_rate >= self.FREQUENT_BLUFFER:
+                reasoning = f"{target.name} foi pego blefando em {bluff_rate:.0%} dos desafios. Desafie!"
+                return True, reasoning
+            if block:
+                reasoning = f"{p_has:.0%} de chance de {target.name} ter {names}."
+                return False, reasoning
+        
         # Desafia ações perigosas
         if action == Action.ASSASSINATE:
             if len(player.cards) == 1:
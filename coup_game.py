@@ -3,8 +3,14 @@ Simulador completo do jogo Coup
 """
 import random
 from enum import Enum
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, NamedTuple
 from dataclasses import dataclass
+from event_log import (
+    EventLog, EventMark, Event, EVENT_ACTION, EVENT_BLOCK, EVENT_CHALLENGE, EVENT_LOSE_CARD,
+    KIND, PLAYER, TARGET, ACTION, CARD, AMOUNT, FLAGS,
+    FLAG_SUCCESS, FLAG_ELIMINATED, FLAG_BLUFF, FLAG_BLOCK, NONE,
+)
+from zobrist import ZOBRIST, hand_counts
 
 class Character(Enum):
     """Personagens do jogo Coup"""
@@ -27,6 +33,34 @@ class Action(Enum):
     BLOCK_STEAL = "block_steal"  # Capitão/Embaixador bloqueia roubo
     BLOCK_ASSASSINATE = "block_assassinate"  # Condessa bloqueia assassinato
 
+# Códigos inteiros usados no registro de eventos
+ACTION_CODES = tuple(Action)
+ACTION_CODE = {action: i for i, action in enumerate(ACTION_CODES)}
+
+# Personagem declarado por cada ação (ações ausentes não podem ser desafiadas)
+CLAIMED_CHARACTER = {
+    Action.TAX: Character.DUKE,
+    Action.ASSASSINATE: Character.ASSASSIN,
+    Action.STEAL: Character.CAPTAIN,
+    Action.EXCHANGE: Character.AMBASSADOR,
+}
+
+# Personagens que bloqueiam cada ação
+BLOCKING_CHARACTERS = {
+    Action.FOREIGN_AID: (Character.DUKE,),
+    Action.STEAL: (Character.CAPTAIN, Character.AMBASSADOR),
+    Action.ASSASSINATE: (Character.CONTESSA,),
+}
+
+class TurnPhase(Enum):
+    """Fases de um turno resolvido por CoupGame.play_turn"""
+    ACTION = "action"  # Valida a ação declarada
+    CHALLENGE = "challenge"  # Outros jogadores podem desafiar a ação
+    BLOCK = "block"  # Quem pode bloquear decide
+    BLOCK_CHALLENGE = "block_challenge"  # Outros jogadores podem desafiar o bloqueio
+    RESOLVE = "resolve"  # Paga custos e aplica o efeito (se não foi anulada)
+    DONE = "done"
+
 @dataclass
 class Player:
     """Representa um jogador no jogo"""
@@ -52,40 +86,454 @@ class Player:
         """Verifica se o jogador tem uma carta"""
         return card in self.cards
 
+class Deck:
+    """
+    Baralho guardado como contagem por personagem
+    
+    Compras são sorteios ponderados pelas contagens (sem embaralhar listas);
+    devolver uma carta é apenas incrementar a contagem.
+    """
+    
+    __slots__ = ("counts", "size")
+    
+    CHARACTERS = tuple(Character)
+    INDEX = {char: i for i, char in enumerate(CHARACTERS)}
+    
+    def __init__(self, counts: Optional[List[int]] = None):
+        """
+        Args:
+            counts: Cartas de cada personagem, na ordem do enum Character
+        """
+        self.counts = list(counts) if counts is not None else [0] * len(self.CHARACTERS)
+        self.size = sum(self.counts)
+    
+    @classmethod
+    def full(cls, copies: int = 3) -> "Deck":
+        """Baralho completo: 3 cópias de cada personagem"""
+        return cls([copies] * len(cls.CHARACTERS))
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __iter__(self):
+        for char, count in zip(self.CHARACTERS, self.counts):
+            for _ in range(count):
+                yield char
+    
+    def count(self, card: Character) -> int:
+        """Quantas cópias de um personagem estão no baralho"""
+        return self.counts[self.INDEX[card]]
+    
+    def draw(self, rng=random) -> Character:
+        """Compra uma carta aleatória usando rng (padrão: módulo random)"""
+        if self.size == 0:
+            raise ValueError("Não há cartas suficientes no baralho")
+        r = rng.randrange(self.size)
+        counts = self.counts
+        for i, count in enumerate(counts):
+            r -= count
+            if r < 0:
+                counts[i] -= 1
+                self.size -= 1
+                return self.CHARACTERS[i]
+        raise ValueError("Contagens do baralho inconsistentes")
+    
+    def put(self, card: Character):
+        """Devolve uma carta ao baralho"""
+        self.counts[self.INDEX[card]] += 1
+        self.size += 1
+    
+    def take(self, card: Character):
+        """Retira uma carta específica do baralho"""
+        index = self.INDEX[card]
+        if not self.counts[index]:
+            raise ValueError(f"Não há {card.value} no baralho")
+        self.counts[index] -= 1
+        self.size -= 1
+    
+    def extend(self, cards: List[Character]):
+        """Devolve várias cartas ao baralho"""
+        for card in cards:
+            self.put(card)
+    
+    def snapshot(self) -> Tuple[int, ...]:
+        """Contagens atuais (para desfazer compras)"""
+        return tuple(self.counts)
+    
+    def restore(self, snapshot: Tuple[int, ...]):
+        """Restaura contagens salvas com snapshot()"""
+        self.counts = list(snapshot)
+        self.size = sum(snapshot)
+    
+    def copy(self) -> "Deck":
+        return Deck(self.counts)
+
+class ActionResult:
+    """
+    Resultado de execute_action
+    
+    Funciona como o dict antigo (result["message"], result.get(...)), mas a
+    mensagem só é montada a partir do evento quando alguém a lê.
+    """
+    
+    __slots__ = ("_game", "_seq", "_error", "_action", "_player", "_target")
+    
+    KEYS = ("success", "message", "action", "player", "target")
+    
+    def __init__(self, game: "CoupGame", seq: Optional[int], error: str,
+                 action: Action, player: Player, target: Optional[Player]):
+        self._game = game
+        self._seq = seq
+        self._error = error
+        self._action = action
+        self._player = player
+        self._target = target
+    
+    @property
+    def success(self) -> bool:
+        if self._seq is None:
+            return False
+        return bool(self._game.events.get(self._seq)[FLAGS] & FLAG_SUCCESS)
+    
+    @property
+    def message(self) -> str:
+        if self._seq is None:
+            return self._error
+        return self._game.render_event(self._game.events.get(self._seq))["message"]
+    
+    def to_dict(self) -> Dict:
+        """Versão dict do resultado (mesmo formato do histórico)"""
+        return {
+            "success": self.success,
+            "message": self.message,
+            "action": self._action.value,
+            "player": self._player.name,
+            "target": self._target.name if self._target else None
+        }
+    
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return self.to_dict()[key]
+    
+    def get(self, key: str, default=None):
+        return self.to_dict().get(key, default)
+    
+    def keys(self):
+        return self.KEYS
+
+class Reactions:
+    """
+    Decisões dos jogadores durante um turno, consultadas por CoupGame.play_turn
+    
+    A implementação padrão nunca desafia nem bloqueia e deixa o jogo escolher
+    a carta perdida ao acaso; drivers (IA, console) sobrescrevem o necessário.
+    """
+    
+    def challenge(self, game: "CoupGame", challenger: Player, claimant: Player,
+                  action: Action, block: bool = False) -> bool:
+        """
+        challenger desafia a declaração de claimant?
+        
+        Args:
+            block: True se a declaração desafiada é o bloqueio de action
+        """
+        return False
+    
+    def block(self, game: "CoupGame", blocker: Player, actor: Player, action: Action) -> bool:
+        """blocker bloqueia a ação de actor?"""
+        return False
+    
+    def choose_card(self, game: "CoupGame", player: Player) -> Optional[Character]:
+        """Carta que player entrega ao perder uma influência (None = aleatória)"""
+        return None
+
+@dataclass
+class TurnState:
+    """Estado (e resultado final) de um turno resolvido por play_turn"""
+    action: Action
+    player: Player
+    target: Optional[Player] = None
+    phase: TurnPhase = TurnPhase.ACTION
+    bluff: bool = False  # A ação declarou um personagem que o jogador não tem
+    error: str = ""  # Motivo se a ação foi recusada
+    challenger: Optional[Player] = None
+    challenge_succeeded: bool = False
+    blocker: Optional[Player] = None
+    block_bluff: bool = False
+    block_challenger: Optional[Player] = None
+    block_challenge_succeeded: bool = False
+    executed: bool = False  # O efeito da ação foi aplicado
+    first_event: int = 0  # Sequência do primeiro evento do turno
+    
+    @property
+    def blocked(self) -> bool:
+        """A ação foi bloqueada (e o bloqueio se manteve)"""
+        return self.blocker is not None and not self.block_challenge_succeeded
+
+@dataclass(frozen=True)
+class Move:
+    """
+    Turno reversível para CoupGame.apply/undo: a ação e as reações já decididas
+    
+    O turno é resolvido por play_turn, então segue exatamente as mesmas
+    regras. Quem desafia, bloqueia ou desafia o bloqueio vem da jogada (None
+    = ninguém); lost_cards são as cartas entregues nas perdas de influência,
+    na ordem em que acontecem (faltando, a carta é aleatória).
+    """
+    player: Player
+    action: Action
+    target: Optional[Player] = None
+    challenger: Optional[Player] = None
+    blocker: Optional[Player] = None
+    block_challenger: Optional[Player] = None
+    lost_cards: Tuple[Character, ...] = ()
+    end_turn: bool = True  # Passa a vez depois do turno (se o jogo não acabou)
+
+class UndoToken(NamedTuple):
+    """Estado salvo antes de uma jogada, consumido por CoupGame.undo"""
+    move: Move
+    turn: TurnState  # O que aconteceu no turno
+    players: Tuple  # ((moedas, cartas, eliminado), ...) por assento
+    deck: Tuple[int, ...]
+    current_player_index: int
+    state_hash: int
+    events: EventMark
+
+class _MoveReactions(Reactions):
+    """Reações gravadas em uma Move"""
+    
+    def __init__(self, move: Move):
+        self.move = move
+        self._lost_cards = list(move.lost_cards)
+    
+    def challenge(self, game: "CoupGame", challenger: Player, claimant: Player,
+                  action: Action, block: bool = False) -> bool:
+        return challenger is (self.move.block_challenger if block else self.move.challenger)
+    
+    def block(self, game: "CoupGame", blocker: Player, actor: Player, action: Action) -> bool:
+        return blocker is self.move.blocker
+    
+    def choose_card(self, game: "CoupGame", player: Player) -> Optional[Character]:
+        return self._lost_cards.pop(0) if self._lost_cards else None
+
 class CoupGame:
     """Classe principal do jogo Coup"""
     
     # Deck completo: 3 cópias de cada personagem
     FULL_DECK = [char for char in Character for _ in range(3)]
     
-    def __init__(self, player_names: List[str]):
+    # Eventos guardados no histórico (memória constante em partidas longas)
+    HISTORY_CAPACITY = 1024
+    
+    def __init__(self, player_names: List[str], seed: Optional[int] = None,
+                 rng: Optional[random.Random] = None):
         """
         Inicializa o jogo
         
         Args:
             player_names: Lista com nomes dos jogadores
+            seed: Semente para um gerador próprio (partida reproduzível)
+            rng: Gerador aleatório injetado (tem prioridade sobre seed).
+                Sem nenhum dos dois, usa o módulo random global.
         """
         if len(player_names) < 2:
             raise ValueError("Precisa de pelo menos 2 jogadores")
         
+        if rng is not None:
+            self.rng = rng
+        elif seed is not None:
+            self.rng = random.Random(seed)
+        else:
+            self.rng = random
+        self.seed = seed
+        
         self.players = [Player(name) for name in player_names]
-        self.deck = self.FULL_DECK.copy()
+        self._player_codes = {id(p): i for i, p in enumerate(self.players)}
+        self.deck = Deck.full()
         self.current_player_index = 0
-        self.game_history = []
-        
+        self.events = EventLog(self.HISTORY_CAPACITY)
         # Distribui cartas
         self._deal_cards()
+        
+        # Hash Zobrist do estado, mantido incrementalmente a cada mudança
+        self.state_hash = self.compute_hash()
+        # Versão do estado: incrementada junto com cada alteração do hash
+        # (caches por decisão comparam a versão em vez do estado inteiro)
+        self.version = 0
     
     def _deal_cards(self):
         """Distribui 2 cartas para cada jogador"""
-        random.shuffle(self.deck)
-        
         for player in self.players:
             if len(self.deck) >= 2:
-                player.cards = [self.deck.pop(), self.deck.pop()]
+                player.cards = [self.deck.draw(self.rng), self.deck.draw(self.rng)]
             else:
                 raise ValueError("Não há cartas suficientes no baralho")
     
+    def _player_code(self, player: Optional[Player]) -> int:
+        """Índice do jogador (NONE se não houver)"""
+        if player is None:
+            return NONE
+        return self._player_codes[id(player)]
+    
+    # ------------------------------------------------------------------
+    # Hash Zobrist
+    # ------------------------------------------------------------------
+    
+    def _player_hash(self, index: int) -> int:
+        """Contribuição de um jogador para o hash"""
+        player = self.players[index]
+        return ZOBRIST.player_hash(index, player.coins, hand_counts(player.cards, Deck.INDEX),
+                                   player.eliminated)
+    
+    def _toggle_hash(self, players: List[Optional[Player]], deck: bool = False):
+        """
+        Remove/recoloca (XOR) a contribuição de jogadores e do baralho
+        
+        Chame antes e depois de alterá-los: o hash fica atualizado sem
+        recalcular o resto do estado.
+        """
+        self.version += 1
+        seen = 0
+        for player in players:
+            if player is None:
+                continue
+            index = self._player_codes[id(player)]
+            if seen & (1 << index):
+                continue
+            seen |= 1 << index
+            self.state_hash ^= self._player_hash(index)
+        if deck:
+            self.state_hash ^= ZOBRIST.deck_hash(self.deck.counts)
+    
+    def compute_hash(self) -> int:
+        """Hash Zobrist calculado do zero (moedas, mãos, baralho, vez, eliminados)"""
+        value = ZOBRIST.deck_hash(self.deck.counts) ^ ZOBRIST.current_hash(self.current_player_index)
+        for index in range(len(self.players)):
+            value ^= self._player_hash(index)
+        return value
+    
+    def rehash(self):
+        """Recalcula o hash após alterar jogadores ou baralho diretamente"""
+        self.state_hash = self.compute_hash()
+        self.version += 1
+    
+    def add_coins(self, player: Player, amount: int):
+        """Soma (ou subtrai) moedas de um jogador mantendo o hash"""
+        self._toggle_hash([player])
+        player.coins += amount
+        self._toggle_hash([player])
+    
+    def lose_card(self, player: Player, card: Optional[Character] = None) -> bool:
+        """
+        Jogador perde a carta indicada (ou uma aleatória), com registro no histórico
+        
+        Returns:
+            True se o jogador foi eliminado
+        """
+        if not player.cards:
+            return False
+        if card is None or card not in player.cards:
+            card = self.rng.choice(player.cards)
+        self._toggle_hash([player])
+        eliminated = player.lose_card(card)
+        self._toggle_hash([player])
+        self.events.append(
+            EVENT_LOSE_CARD, self._player_code(player), NONE, NONE, Deck.INDEX[card], 0,
+            FLAG_SUCCESS | (FLAG_ELIMINATED if eliminated else 0)
+        )
+        return eliminated
+    
+    def _chosen_card(self, player: Player, reactions: Optional[Reactions]) -> Character:
+        """Carta que player entrega (escolha de reactions, ou aleatória)"""
+        card = reactions.choose_card(self, player) if reactions is not None else None
+        if card is None or card not in player.cards:
+            card = self.rng.choice(player.cards)
+        return card
+    
+    @property
+    def game_history(self) -> List[Dict]:
+        """Histórico legível (apenas eventos ainda no buffer). Prefira render_history(n)."""
+        return [self.render_event(event) for _, event in self.events.since(0)]
+    
+    def render_history(self, last_n: int = 10) -> List[Dict]:
+        """Últimos eventos como dicts com mensagem legível"""
+        return [self.render_event(event) for _, event in self.events.last(last_n)]
+    
+    def render_event(self, event: Event) -> Dict:
+        """Converte um evento do registro no dict legível do histórico"""
+        kind = event[KIND]
+        player = self.players[event[PLAYER]]
+        target = self.players[event[TARGET]] if event[TARGET] != NONE else None
+        card = Deck.CHARACTERS[event[CARD]] if event[CARD] != NONE else None
+        flags = event[FLAGS]
+        success = bool(flags & FLAG_SUCCESS)
+        eliminated_suffix = ""
+        if flags & FLAG_ELIMINATED:
+            eliminated = target if kind == EVENT_ACTION else player
+            eliminated_suffix = f" - {eliminated.name} foi eliminado!"
+        
+        if kind == EVENT_LOSE_CARD:
+            return {
+                "success": True,
+                "message": f"{player.name} perdeu {card.value}{eliminated_suffix}",
+                "action": "lose_card",
+                "player": player.name,
+                "target": None
+            }
+        
+        action = ACTION_CODES[event[ACTION]]
+        
+        if kind == EVENT_CHALLENGE:
+            claim = "o bloqueio" if flags & FLAG_BLOCK else action.value
+            if success:
+                outcome = f"{target.name} estava blefando!"
+            else:
+                outcome = f"{target.name} tinha {card.value}!"
+            return {
+                "success": success,
+                "message": f"{player.name} desafiou {claim} de {target.name} - {outcome}",
+                "action": "challenge",
+                "player": player.name,
+                "target": target.name
+            }
+        
+        if kind == EVENT_BLOCK:
+            return {
+                "success": True,
+                "message": f"{player.name} bloqueou {action.value} de {target.name}",
+                "action": self._block_action(action).value,
+                "player": player.name,
+                "target": target.name
+            }
+        
+        message = ""
+        if success:
+            if action == Action.INCOME:
+                message = f"{player.name} ganhou 1 moeda"
+            elif action == Action.FOREIGN_AID:
+                message = f"{player.name} ganhou 2 moedas (Foreign Aid)"
+            elif action == Action.COUP:
+                message = f"{player.name} fez Coup em {target.name}, eliminou {card.value}{eliminated_suffix}"
+            elif action == Action.TAX:
+                message = f"{player.name} usou Tax (Duque), ganhou 3 moedas"
+            elif action == Action.ASSASSINATE:
+                message = f"{player.name} assassinou {target.name}, eliminou {card.value}{eliminated_suffix}"
+            elif action == Action.STEAL:
+                message = f"{player.name} roubou {event[AMOUNT]} moedas de {target.name}"
+            elif action == Action.EXCHANGE:
+                message = f"{player.name} trocou cartas com o baralho"
+        else:
+            message = f"{player.name} tentou {action.value}, sem efeito"
+        
+        return {
+            "success": success,
+            "message": message,
+            "action": action.value,
+            "player": player.name,
+            "target": target.name if target else None
+        }
+    
     def get_current_player(self) -> Player:
         """Retorna o jogador atual"""
         return self.players[self.current_player_index]
@@ -124,14 +572,18 @@ class CoupGame:
             state["players"].append(player_info)
         
         state["deck_size"] = len(self.deck)
-        state["history"] = self.game_history[-10:]  # Últimas 10 ações
+        state["history"] = self.render_history(10)  # Últimas 10 ações
         
         return state
     
-    def is_valid_action(self, action: Action, player: Player, target: Optional[Player] = None) -> Tuple[bool, str]:
+    def is_valid_action(self, action: Action, player: Player, target: Optional[Player] = None,
+                        require_card: bool = True) -> Tuple[bool, str]:
         """
         Verifica se uma ação é válida
         
+        Args:
+            require_card: Exige a carta do personagem declarado (False permite blefe)
+        
         Returns:
             (is_valid, error_message)
         """
@@ -154,14 +606,14 @@ class CoupGame:
             return True, ""
         
         if action == Action.TAX:
-            if not player.has_card(Character.DUKE):
+            if require_card and not player.has_card(Character.DUKE):
                 return False, "Precisa ter Duque para fazer Tax"
             return True, ""
         
         if action == Action.ASSASSINATE:
             if player.coins < 3:
                 return False, "Precisa de 3 moedas para Assassinar"
-            if not player.has_card(Character.ASSASSIN):
+            if require_card and not player.has_card(Character.ASSASSIN):
                 return False, "Precisa ter Assassino para Assassinar"
             if not target:
                 return False, "Assassinar precisa de um alvo"
@@ -170,7 +622,7 @@ class CoupGame:
             return True, ""
         
         if action == Action.STEAL:
-            if not player.has_card(Character.CAPTAIN):
+            if require_card and not player.has_card(Character.CAPTAIN):
                 return False, "Precisa ter Capitão para Roubar"
             if not target:
                 return False, "Roubar precisa de um alvo"
@@ -181,14 +633,14 @@ class CoupGame:
             return True, ""
         
         if action == Action.EXCHANGE:
-            if not player.has_card(Character.AMBASSADOR):
+            if require_card and not player.has_card(Character.AMBASSADOR):
                 return False, "Precisa ter Embaixador para Trocar"
             return True, ""
         
         return False, "Ação não reconhecida"
     
     def execute_action(self, action: Action, player: Player, target: Optional[Player] = None, 
-                      bluff: bool = False, challenged: bool = False) -> Dict:
+                      bluff: bool = False, challenged: bool = False) -> ActionResult:
         """
         Executa uma ação no jogo
         
@@ -200,96 +652,264 @@ class CoupGame:
             challenged: Se alguém desafiou a ação
         
         Returns:
-            Dict com resultado da ação
+            ActionResult com resultado da ação (acessível como dict)
         """
-        result = {
-            "success": False,
-            "message": "",
-            "action": action.value,
-            "player": player.name,
-            "target": target.name if target else None
-        }
-        
         # Verifica se é válida
         is_valid, error = self.is_valid_action(action, player, target)
         if not is_valid and not bluff:
-            result["message"] = error
-            return result
+            return ActionResult(self, None, error, action, player, target)
+        
+        return self._resolve_action(action, player, target, bluff)
+    
+    def _resolve_action(self, action: Action, player: Player, target: Optional[Player],
+                        bluff: bool, effect: bool = True,
+                        reactions: Optional[Reactions] = None) -> ActionResult:
+        """
+        Paga o custo da ação e aplica seu efeito, registrando o evento
+        
+        Args:
+            effect: False quando a ação foi anulada (desafio/bloqueio):
+                só o custo é pago
+            reactions: Consultado para a carta que o alvo perde (Coup/Assassinato)
+        """
+        success = False
+        eliminated = False
+        card = None
+        amount = 0
+        touched = [player, target]
+        touches_deck = action == Action.EXCHANGE
+        self._toggle_hash(touched, touches_deck)
         
         # Executa ação
-        if action == Action.INCOME:
+        if not effect:
+            if action == Action.COUP:
+                player.coins -= 7
+            elif action == Action.ASSASSINATE:
+                player.coins -= 3
+        
+        elif action == Action.INCOME:
             player.coins += 1
-            result["success"] = True
-            result["message"] = f"{player.name} ganhou 1 moeda"
+            success = True
         
         elif action == Action.FOREIGN_AID:
             player.coins += 2
-            result["success"] = True
-            result["message"] = f"{player.name} ganhou 2 moedas (Foreign Aid)"
+            success = True
         
         elif action == Action.COUP:
             player.coins -= 7
             if target:
-                # Remove uma carta aleatória do alvo
+                # O alvo escolhe a carta que perde (aleatória sem escolha)
                 if target.cards:
-                    card = random.choice(target.cards)
+                    card = self._chosen_card(target, reactions)
                     eliminated = target.lose_card(card)
-                    result["success"] = True
-                    result["message"] = f"{player.name} fez Coup em {target.name}, eliminou {card.value}"
-                    if eliminated:
-                        result["message"] += f" - {target.name} foi eliminado!"
+                    success = True
         
         elif action == Action.TAX:
             player.coins += 3
-            result["success"] = True
-            result["message"] = f"{player.name} usou Tax (Duque), ganhou 3 moedas"
+            success = True
         
         elif action == Action.ASSASSINATE:
             player.coins -= 3
             if target and target.cards:
-                card = random.choice(target.cards)
+                card = self._chosen_card(target, reactions)
                 eliminated = target.lose_card(card)
-                result["success"] = True
-                result["message"] = f"{player.name} assassinou {target.name}, eliminou {card.value}"
-                if eliminated:
-                    result["message"] += f" - {target.name} foi eliminado!"
+                success = True
         
         elif action == Action.STEAL:
-            stolen = min(2, target.coins)
-            player.coins += stolen
-            target.coins -= stolen
-            result["success"] = True
-            result["message"] = f"{player.name} roubou {stolen} moedas de {target.name}"
+            amount = min(2, target.coins)
+            player.coins += amount
+            target.coins -= amount
+            success = True
         
         elif action == Action.EXCHANGE:
-            # Troca cartas com o baralho
-            if len(self.deck) >= 2:
+            # Troca cartas com o baralho (mesmo número de cartas da mão)
+            hand_size = len(player.cards)
+            if len(self.deck) >= hand_size:
                 # Retorna cartas ao baralho
-                returned = player.cards[:]
-                for card in returned:
-                    if card in player.cards:
-                        player.cards.remove(card)
-                        self.deck.append(card)
+                self.deck.extend(player.cards)
                 
                 # Pega novas cartas
-                random.shuffle(self.deck)
-                new_cards = [self.deck.pop(), self.deck.pop()]
-                player.cards = new_cards
-                result["success"] = True
-                result["message"] = f"{player.name} trocou cartas com o baralho"
+                player.cards = [self.deck.draw(self.rng) for _ in range(hand_size)]
+                success = True
         
-        # Registra no histórico
-        self.game_history.append(result)
+        self._toggle_hash(touched, touches_deck)
         
-        return result
+        # Registra no histórico (apenas inteiros; o texto é gerado sob demanda)
+        flags = ((FLAG_SUCCESS if success else 0) | (FLAG_ELIMINATED if eliminated else 0)
+                 | (FLAG_BLUFF if bluff else 0))
+        seq = self.events.append(
+            EVENT_ACTION, self._player_code(player), self._player_code(target),
+            ACTION_CODE[action], Deck.INDEX[card] if card else NONE, amount, flags
+        )
+        
+        return ActionResult(self, seq, "", action, player, target)
+    
+    # ------------------------------------------------------------------
+    # Turno completo: ação -> desafio -> bloqueio -> desafio do bloqueio
+    # ------------------------------------------------------------------
+    
+    def play_turn(self, action: Action, player: Player, target: Optional[Player] = None,
+                  reactions: Optional[Reactions] = None) -> TurnState:
+        """
+        Resolve um turno inteiro, consultando reactions em cada fase
+        
+        Desafios e bloqueios são perguntados em ordem de assento a partir de
+        quem declarou; o primeiro que reagir resolve a fase. Se o desafiado
+        tinha a carta, ele a devolve ao baralho e compra outra. O efeito só é
+        aplicado se a ação não foi anulada, mas custos (Coup/Assassinato) são
+        sempre pagos. Não avança o turno (chame next_turn).
+        
+        Args:
+            action: Ação declarada
+            player: Jogador da vez
+            target: Alvo (se aplicável)
+            reactions: Decisões dos jogadores (padrão: ninguém reage)
+        
+        Returns:
+            TurnState com o que aconteceu em cada fase
+        """
+        if reactions is None:
+            reactions = Reactions()
+        state = TurnState(action, player, target, first_event=self.events.count)
+        handlers = {
+            TurnPhase.ACTION: self._phase_action,
+            TurnPhase.CHALLENGE: self._phase_challenge,
+            TurnPhase.BLOCK: self._phase_block,
+            TurnPhase.BLOCK_CHALLENGE: self._phase_block_challenge,
+            TurnPhase.RESOLVE: self._phase_resolve,
+        }
+        while state.phase != TurnPhase.DONE:
+            state.phase = handlers[state.phase](state, reactions)
+        return state
+    
+    def render_since(self, seq: int) -> List[Dict]:
+        """Eventos a partir da sequência seq (ex: TurnState.first_event) já legíveis"""
+        return [self.render_event(event) for _, event in self.events.since(seq)]
+    
+    def _phase_action(self, state: TurnState, reactions: Reactions) -> TurnPhase:
+        is_valid, error = self.is_valid_action(state.action, state.player, state.target,
+                                               require_card=False)
+        if not is_valid:
+            state.error = error
+            return TurnPhase.DONE
+        
+        claimed = CLAIMED_CHARACTER.get(state.action)
+        if claimed is None:
+            return self._after_challenge(state)
+        state.bluff = not state.player.has_card(claimed)
+        return TurnPhase.CHALLENGE
+    
+    def _phase_challenge(self, state: TurnState, reactions: Reactions) -> TurnPhase:
+        claimed = CLAIMED_CHARACTER[state.action]
+        for challenger in self._reaction_order(state.player):
+            if reactions.challenge(self, challenger, state.player, state.action, False):
+                state.challenger = challenger
+                state.challenge_succeeded = self._resolve_challenge(
+                    challenger, state.player, state.action, (claimed,), reactions, False
+                )
+                break
+        
+        if state.challenge_succeeded or state.player.eliminated:
+            return TurnPhase.RESOLVE
+        return self._after_challenge(state)
+    
+    def _after_challenge(self, state: TurnState) -> TurnPhase:
+        """Próxima fase depois da declaração ter sido aceita"""
+        return TurnPhase.BLOCK if state.action in BLOCKING_CHARACTERS else TurnPhase.RESOLVE
+    
+    def _phase_block(self, state: TurnState, reactions: Reactions) -> TurnPhase:
+        if state.action == Action.FOREIGN_AID:
+            candidates = self._reaction_order(state.player)
+        elif state.target is not None and not state.target.eliminated:
+            candidates = [state.target]
+        else:
+            candidates = []
+        
+        blocking = BLOCKING_CHARACTERS[state.action]
+        for blocker in candidates:
+            if reactions.block(self, blocker, state.player, state.action):
+                state.blocker = blocker
+                state.block_bluff = not any(blocker.has_card(char) for char in blocking)
+                self.events.append(
+                    EVENT_BLOCK, self._player_code(blocker), self._player_code(state.player),
+                    ACTION_CODE[state.action], NONE, 0,
+                    FLAG_SUCCESS | (FLAG_BLUFF if state.block_bluff else 0)
+                )
+                return TurnPhase.BLOCK_CHALLENGE
+        return TurnPhase.RESOLVE
+    
+    def _phase_block_challenge(self, state: TurnState, reactions: Reactions) -> TurnPhase:
+        blocking = BLOCKING_CHARACTERS[state.action]
+        for challenger in self._reaction_order(state.blocker):
+            if reactions.challenge(self, challenger, state.blocker, state.action, True):
+                state.block_challenger = challenger
+                state.block_challenge_succeeded = self._resolve_challenge(
+                    challenger, state.blocker, state.action, blocking, reactions, True
+                )
+                break
+        return TurnPhase.RESOLVE
+    
+    def _phase_resolve(self, state: TurnState, reactions: Reactions) -> TurnPhase:
+        effect = not (state.challenge_succeeded or state.blocked or state.player.eliminated)
+        if state.target is not None and state.target.eliminated:
+            effect = False
+        self._resolve_action(state.action, state.player, state.target, state.bluff, effect, reactions)
+        state.executed = effect
+        return TurnPhase.DONE
+    
+    def _reaction_order(self, claimant: Player) -> List[Player]:
+        """Jogadores vivos em ordem de assento a partir de quem declarou"""
+        start = self._player_codes[id(claimant)]
+        count = len(self.players)
+        order = []
+        for offset in range(1, count):
+            player = self.players[(start + offset) % count]
+            if not player.eliminated:
+                order.append(player)
+        return order
+    
+    def _resolve_challenge(self, challenger: Player, claimant: Player, action: Action,
+                           characters: Tuple[Character, ...], reactions: Reactions,
+                           block: bool) -> bool:
+        """
+        Resolve um desafio contra a declaração de claimant
+        
+        Returns:
+            True se o desafio acertou (claimant blefava)
+        """
+        revealed = next((char for char in characters if claimant.has_card(char)), None)
+        succeeded = revealed is None
+        flags = (FLAG_SUCCESS if succeeded else 0) | (FLAG_BLOCK if block else 0)
+        self.events.append(
+            EVENT_CHALLENGE, self._player_code(challenger), self._player_code(claimant),
+            ACTION_CODE[action], NONE if succeeded else Deck.INDEX[revealed], 0, flags
+        )
+        
+        if succeeded:
+            self.lose_card(claimant, reactions.choose_card(self, claimant))
+        else:
+            self._replace_revealed(claimant, revealed)
+            self.lose_card(challenger, reactions.choose_card(self, challenger))
+        return succeeded
+    
+    def _replace_revealed(self, player: Player, card: Character):
+        """Carta mostrada em um desafio volta ao baralho e o jogador compra outra"""
+        self._toggle_hash([player], True)
+        player.cards.remove(card)
+        self.deck.put(card)
+        player.cards.append(self.deck.draw(self.rng))
+        self._toggle_hash([player], True)
     
     def next_turn(self):
         """Avança para o próximo turno"""
+        self.version += 1
+        self.state_hash ^= ZOBRIST.current_hash(self.current_player_index)
         self.current_player_index = (self.current_player_index + 1) % len(self.players)
         
         # Pula jogadores eliminados
         while self.players[self.current_player_index].eliminated:
             self.current_player_index = (self.current_player_index + 1) % len(self.players)
+        self.state_hash ^= ZOBRIST.current_hash(self.current_player_index)
     
     def get_winner(self) -> Optional[Player]:
         """Retorna o vencedor do jogo (se houver)"""
@@ -301,3 +921,54 @@ class CoupGame:
     def is_game_over(self) -> bool:
         """Verifica se o jogo terminou"""
         return self.get_winner() is not None
+    
+    # ------------------------------------------------------------------
+    # Jogadas reversíveis (make/unmake) para busca em árvore
+    # ------------------------------------------------------------------
+    
+    def apply(self, move: Move) -> UndoToken:
+        """
+        Joga um turno com play_turn e retorna o token para desfazê-lo com undo()
+        
+        Tokens devem ser desfeitos na ordem inversa (pilha). Compras do
+        baralho (troca, carta revelada num desafio que falhou) são desfeitas
+        restaurando baralho e mãos; o gerador aleatório não volta, então
+        reaplicar a mesma jogada pode comprar outras cartas.
+        """
+        token = UndoToken(
+            move=move,
+            turn=None,
+            players=tuple((p.coins, p.cards[:], p.eliminated) for p in self.players),
+            deck=self.deck.snapshot(),
+            current_player_index=self.current_player_index,
+            state_hash=self.state_hash,
+            events=self.events.mark(),
+        )
+        try:
+            turn = self.play_turn(move.action, move.player, move.target, _MoveReactions(move))
+            if move.end_turn and not self.is_game_over():
+                self.next_turn()
+        finally:
+            self.events.release()
+        return token._replace(turn=turn)
+    
+    def undo(self, token: UndoToken):
+        """
+        Desfaz a jogada que gerou o token (deve ser a última não desfeita)
+        
+        Restaura jogadores, baralho, vez, hash e o registro de eventos
+        (inclusive os que o buffer circular tinha sobrescrito). A versão não
+        volta ao valor antigo, avança: caches por versão (DecisionContext)
+        nunca confundem o estado restaurado com outro ramo da busca.
+        Consumidores incrementais do registro (BeliefTracker, OpponentModel)
+        que leram eventos desfeitos precisam ser recriados.
+        """
+        for player, (coins, cards, eliminated) in zip(self.players, token.players):
+            player.coins = coins
+            player.cards = cards[:]
+            player.eliminated = eliminated
+        self.deck.restore(token.deck)
+        self.current_player_index = token.current_player_index
+        self.events.rewind(token.events)
+        self.state_hash = token.state_hash
+        self.version += 1
@@ -0,0 +1,356 @@
+"""
+Tabela de finais 1v1 (resolvida por análise retrógrada)
+Com dois jogadores, mãos de até 2 cartas e moedas limitadas, o espaço de
+estados cabe numa tabela. Cada posição guarda o resultado com jogo perfeito
+(vitória/derrota em N meias-jogadas, ou empate) e a melhor ação.
+
+Modelo da tabela: informação perfeita (as duas mãos conhecidas), ações
+honestas e sem Troca (depende do baralho). Quem sofre a ação escolhe se
+bloqueia e qual carta perde. Para jogar sem ver a mão do oponente, as
+consultas fazem a média sobre uma distribuição das mãos dele.
+
+Gerar o arquivo (uma vez):  python endgame_tablebase.py
+"""
+import os
+import struct
+from array import array
+from itertools import combinations_with_replacement
+from typing import Dict, List, Optional, Sequence, Tuple
+from coup_game import CoupGame, Player, Action, Character
+from beliefs import HANDS as BELIEF_HANDS, hand_prior
+from hand_probability import unseen_counts
+from compact_state import (
+    ACTIONS, CHAR_INDEX, NUM_CHARACTERS, COPIES_PER_CHARACTER,
+    DUKE, ASSASSIN, CAPTAIN, AMBASSADOR, CONTESSA,
+    INCOME, FOREIGN_AID, COUP, TAX, ASSASSINATE, STEAL, COUP_COST, ASSASSINATE_COST,
+)
+
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "endgame_1v1.bin")
+MAGIC = b"COUPTB1\0"
+
+# Com 14 moedas dá para dar dois Coups (encerra qualquer duelo); acima disso satura
+MAX_COINS = 14
+COIN_VALUES = MAX_COINS + 1
+
+# Mãos de 1 e 2 cartas como tuplas ordenadas de índices de personagem
+HANDS: Tuple[Tuple[int, ...], ...] = tuple(
+    hand for size in (1, 2) for hand in combinations_with_replacement(range(NUM_CHARACTERS), size)
+)
+HAND_INDEX = {hand: i for i, hand in enumerate(HANDS)}
+NUM_HANDS = len(HANDS)
+NUM_STATES = NUM_HANDS * NUM_HANDS * COIN_VALUES * COIN_VALUES
+
+NO_ACTION = 255
+
+# Codificação do resultado (1 byte, do ponto de vista de quem joga)
+DRAW = 0          # Nenhum dos dois força a vitória
+WIN_BASE = 0      # 1..127: vitória em N meias-jogadas
+LOSS_BASE = 128   # 129..255: derrota em N meias-jogadas
+MAX_DISTANCE = 127
+
+WIN = -1  # Sucessor terminal: o oponente foi eliminado
+
+
+def state_index(hand: Sequence[int], opp_hand: Sequence[int], coins: int, opp_coins: int) -> int:
+    """Índice da posição (quem joga primeiro); mãos como tuplas ordenadas"""
+    coins = min(coins, MAX_COINS)
+    opp_coins = min(opp_coins, MAX_COINS)
+    return ((HAND_INDEX[tuple(hand)] * NUM_HANDS + HAND_INDEX[tuple(opp_hand)]) * COIN_VALUES
+            + coins) * COIN_VALUES + opp_coins
+
+
+def _valid(hand: Tuple[int, ...], opp_hand: Tuple[int, ...]) -> bool:
+    """As duas mãos juntas não podem ter mais que 3 cópias de um personagem"""
+    combined = hand + opp_hand
+    return all(combined.count(c) <= COPIES_PER_CHARACTER for c in set(combined))
+
+
+def _losses(hand: Tuple[int, ...]) -> List[Optional[Tuple[int, ...]]]:
+    """Mãos possíveis depois de perder uma carta (None = eliminado)"""
+    results = []
+    for card in sorted(set(hand)):
+        rest = list(hand)
+        rest.remove(card)
+        results.append(tuple(rest) if rest else None)
+    return results
+
+
+def successors(hand: Tuple[int, ...], opp_hand: Tuple[int, ...],
+               coins: int, opp_coins: int) -> List[Tuple[int, List[int]]]:
+    """
+    Jogadas honestas de quem joga e as respostas possíveis do oponente
+
+    Returns:
+        [(ação, [índice da posição seguinte (vista pelo oponente) ou WIN, ...]), ...]
+        O oponente escolhe entre as posições de cada lista (bloquear ou não,
+        qual carta perder).
+    """
+    cap = MAX_COINS
+    moves = []
+
+    def after(new_opp_hand, new_coins, new_opp_coins):
+        if new_opp_hand is None:
+            return WIN
+        return state_index(new_opp_hand, hand, min(new_opp_coins, cap), min(new_coins, cap))
+
+    moves.append((INCOME, [after(opp_hand, coins + 1, opp_coins)]))
+
+    responses = [after(opp_hand, coins + 2, opp_coins)]
+    if DUKE in opp_hand:
+        responses.append(after(opp_hand, coins, opp_coins))
+    moves.append((FOREIGN_AID, responses))
+
+    if coins >= COUP_COST:
+        moves.append((COUP, [after(lost, coins - COUP_COST, opp_coins) for lost in _losses(opp_hand)]))
+
+    if DUKE in hand:
+        moves.append((TAX, [after(opp_hand, coins + 3, opp_coins)]))
+
+    if ASSASSIN in hand and coins >= ASSASSINATE_COST:
+        paid = coins - ASSASSINATE_COST
+        responses = [after(lost, paid, opp_coins) for lost in _losses(opp_hand)]
+        if CONTESSA in opp_hand:
+            responses.append(after(opp_hand, paid, opp_coins))
+        moves.append((ASSASSINATE, responses))
+
+    if CAPTAIN in hand and opp_coins >= 1:
+        stolen = min(opp_coins, 2)
+        responses = [after(opp_hand, coins + stolen, opp_coins - stolen)]
+        if CAPTAIN in opp_hand or AMBASSADOR in opp_hand:
+            responses.append(after(opp_hand, coins, opp_coins))
+        moves.append((STEAL, responses))
+
+    return moves
+
+
+def _outcome(code: int) -> Tuple[int, int]:
+    """Byte de resultado -> (sinal, distância): 1 vitória, -1 derrota, 0 empate"""
+    if code == DRAW:
+        return 0, 0
+    if code < LOSS_BASE:
+        return 1, code - WIN_BASE
+    return -1, code - LOSS_BASE
+
+
+def _response_value(values: Sequence[int], response: int) -> Optional[int]:
+    """Resultado de uma resposta para quem jogou (None = ainda desconhecido)"""
+    if response == WIN:
+        return WIN_BASE + 1
+    code = values[response]
+    if code == DRAW:
+        return None
+    sign, distance = _outcome(code)
+    distance = min(distance + 1, MAX_DISTANCE)
+    return LOSS_BASE + distance if sign > 0 else WIN_BASE + distance
+
+
+def _action_value(values: Sequence[int], responses: List[int]) -> int:
+    """
+    Pior resposta para quem jogou (o oponente escolhe): derrota mais rápida,
+    senão desconhecido, senão a vitória mais lenta
+    """
+    worst = None
+    for response in responses:
+        code = _response_value(values, response)
+        if code is None:
+            code = DRAW
+        if worst is None or _preference(code) < _preference(worst):
+            worst = code
+    return worst
+
+
+def _best(values: Sequence[int], moves) -> Tuple[int, int]:
+    """(resultado, ação) da posição pelas melhores jogadas"""
+    best_code, best_action = None, NO_ACTION
+    for action, responses in moves:
+        code = _action_value(values, responses)
+        if best_code is None or _preference(code) > _preference(best_code):
+            best_code, best_action = code, action
+    return best_code, best_action
+
+
+def _preference(code: int) -> Tuple[int, int]:
+    """Ordem de preferência de quem joga: vitória rápida > empate > derrota lenta"""
+    sign, distance = _outcome(code)
+    return (sign, -distance if sign > 0 else distance)
+
+
+class EndgameTablebase:
+    """Resultados e melhores ações de todas as posições 1v1"""
+
+    def __init__(self, values: array, actions: array):
+        self.values = values
+        self.actions = actions
+
+    # ------------------------------------------------------------------
+    # Construção (análise retrógrada) e arquivo binário
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, verbose: bool = False) -> "EndgameTablebase":
+        """
+        Resolve todas as posições por rodadas: na rodada k, marca as posições
+        decididas em k meias-jogadas a partir dos resultados da rodada anterior.
+        O que nunca se decide é empate (nenhum lado força a vitória).
+        """
+        values = array("B", bytes(NUM_STATES))
+        actions = array("B", [NO_ACTION]) * NUM_STATES
+        pending: Dict[int, list] = {}
+        for hand in HANDS:
+            for opp_hand in HANDS:
+                if not _valid(hand, opp_hand):
+                    continue
+                for coins in range(COIN_VALUES):
+                    for opp_coins in range(COIN_VALUES):
+                        index = state_index(hand, opp_hand, coins, opp_coins)
+                        pending[index] = successors(hand, opp_hand, coins, opp_coins)
+
+        round_number = 0
+        while pending:
+            round_number += 1
+            decided = []
+            for index, moves in pending.items():
+                code, action = _best(values, moves)
+                if code != DRAW:
+                    decided.append((index, code, action))
+            if not decided:
+                break
+            for index, code, action in decided:
+                values[index] = code
+                actions[index] = action
+                del pending[index]
+            if verbose:
+                print(f"Rodada {round_number}: {len(decided)} posições resolvidas, {len(pending)} restantes")
+
+        # Empates: melhor jogada que não perde
+        for index, moves in pending.items():
+            actions[index] = _best(values, moves)[1]
+        return cls(values, actions)
+
+    def save(self, path: str = TABLE_FILE):
+        """Grava: cabeçalho (magic, nº de mãos, moedas máximas) + resultados + ações"""
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<HH", NUM_HANDS, MAX_COINS))
+            self.values.tofile(f)
+            self.actions.tofile(f)
+
+    @classmethod
+    def load(cls, path: str = TABLE_FILE) -> "EndgameTablebase":
+        """Lê o arquivo gerado por save(); ValueError se o formato não bater"""
+        with open(path, "rb") as f:
+            header = f.read(len(MAGIC) + 4)
+            if header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"Arquivo de tabela inválido: {path}")
+            num_hands, max_coins = struct.unpack("<HH", header[len(MAGIC):])
+            if (num_hands, max_coins) != (NUM_HANDS, MAX_COINS):
+                raise ValueError(f"Tabela gerada com outros limites: {path}")
+            values = array("B")
+            values.fromfile(f, NUM_STATES)
+            actions = array("B")
+            actions.fromfile(f, NUM_STATES)
+        return cls(values, actions)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def lookup(self, hand: Sequence[int], opp_hand: Sequence[int],
+               coins: int, opp_coins: int) -> Tuple[int, int]:
+        """(sinal, distância) e melhor ação da posição com as duas mãos conhecidas"""
+        index = state_index(tuple(sorted(hand)), tuple(sorted(opp_hand)), coins, opp_coins)
+        return _outcome(self.values[index]), self.actions[index]
+
+    def action_scores(self, hand: Sequence[int], coins: int, opp_coins: int,
+                      opp_hands: Dict[Tuple[int, ...], float]) -> Dict[int, float]:
+        """
+        Valor esperado de cada ação honesta, sem ver a mão do oponente
+
+        Args:
+            hand: Índices das cartas de quem joga
+            opp_hands: Probabilidade de cada mão (tupla ordenada) do oponente
+
+        Returns:
+            Ação -> pontuação média (1 vitória, 0 derrota, 0.5 empate; vitórias
+            rápidas e derrotas lentas valem um pouco mais)
+        """
+        hand = tuple(sorted(hand))
+        scores: Dict[int, float] = {}
+        total = 0.0
+        for opp_hand, weight in opp_hands.items():
+            if not weight or not opp_hand or not _valid(hand, opp_hand):
+                continue
+            total += weight
+            for action, responses in successors(hand, opp_hand, min(coins, MAX_COINS),
+                                                  min(opp_coins, MAX_COINS)):
+                code = _action_value(self.values, responses)
+                scores[action] = scores.get(action, 0.0) + weight * _score(code)
+        if not total:
+            return {}
+        return {action: value / total for action, value in scores.items()}
+
+
+def _score(code: int) -> float:
+    sign, distance = _outcome(code)
+    if sign > 0:
+        return 1.0 - distance / 1000.0
+    if sign < 0:
+        return 0.0
+    return 0.5
+
+
+_TABLEBASE: Optional[EndgameTablebase] = None
+_LOAD_FAILED = False
+
+
+def get_tablebase(path: str = TABLE_FILE) -> Optional[EndgameTablebase]:
+    """Tabela carregada uma vez por processo (None se o arquivo não existir)"""
+    global _TABLEBASE, _LOAD_FAILED
+    if _TABLEBASE is None and not _LOAD_FAILED:
+        try:
+            _TABLEBASE = EndgameTablebase.load(path)
+        except (OSError, ValueError):
+            _LOAD_FAILED = True
+    return _TABLEBASE
+
+
+
+def duel_scores(game: CoupGame, player: Player,
+                opp_hands: Optional[Dict[Tuple[Character, ...], float]] = None) -> Dict[Action, float]:
+    """
+    Pontuação de cada ação honesta de player num duelo (vazio fora de 1v1
+    ou sem o arquivo da tabela)
+
+    Args:
+        opp_hands: Distribuição das mãos do oponente (ex: BeliefTracker.hand_distribution);
+            padrão: sorteio uniforme das cartas que player não vê
+    """
+    table = get_tablebase()
+    opponents = game.get_other_players(player)
+    if table is None or len(opponents) != 1 or not player.cards:
+        return {}
+    opponent = opponents[0]
+    if opp_hands is None:
+        size = len(opponent.cards)
+        weights = hand_prior(size, unseen_counts(game, player))
+        distribution = dict(zip(BELIEF_HANDS[size], weights))
+    else:
+        distribution = {
+            tuple(sorted(CHAR_INDEX[card] for card in hand)): weight
+            for hand, weight in opp_hands.items()
+        }
+    hand = [CHAR_INDEX[card] for card in player.cards]
+    scores = table.action_scores(hand, player.coins, opponent.coins, distribution)
+    return {ACTIONS[action]: score for action, score in scores.items()}
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    table = EndgameTablebase.build(verbose=True)
+    table.save()
+    wins = sum(1 for v in table.values if WIN_BASE < v < LOSS_BASE)
+    losses = sum(1 for v in table.values if v > LOSS_BASE)
+    print(f"Tabela gravada em {TABLE_FILE}: {wins} vitórias, {losses} derrotas "
+          f"({time.perf_counter() - start:.1f}s)")
@@ -0,0 +1,130 @@
+"""
+Registro estruturado de eventos do jogo
+Eventos são tuplas de inteiros pequenos guardadas em um buffer circular;
+o texto legível só é gerado quando alguém pede (CoupGame.render_history)
+"""
+from array import array
+from typing import Iterator, List, NamedTuple, Tuple
+
+# Tipos de evento
+EVENT_ACTION, EVENT_BLOCK, EVENT_CHALLENGE, EVENT_LOSE_CARD = range(4)
+
+# Campos de cada evento
+KIND, PLAYER, TARGET, ACTION, CARD, AMOUNT, FLAGS = range(7)
+NUM_FIELDS = 7
+
+# Bits de FLAGS
+FLAG_SUCCESS = 1  # Ação teve efeito / desafio acertou
+FLAG_ELIMINATED = 2  # Alguém foi eliminado neste evento
+FLAG_BLUFF = 4  # Declaração era blefe (conhecido pelo motor)
+FLAG_BLOCK = 8  # Desafio feito contra um bloqueio (não contra a ação)
+
+NONE = -1
+
+Event = Tuple[int, int, int, int, int, int, int]
+
+
+class EventMark(NamedTuple):
+    """Ponto do registro para EventLog.rewind (ver EventLog.mark)"""
+    count: int
+    oldest: int
+    overwritten: List[Tuple[int, array]]  # (posição no buffer, campos antigos)
+
+
+class EventLog:
+    """
+    Buffer circular de eventos com memória fixa
+
+    Cada evento recebe um número de sequência crescente. Apenas os últimos
+    `capacity` eventos ficam guardados; consumidores incrementais (ex: crenças
+    sobre cartas) guardam o último número lido e chamam since().
+    """
+
+    __slots__ = ("capacity", "count", "_oldest", "_data", "_overwritten")
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Args:
+            capacity: Número máximo de eventos guardados
+        """
+        if capacity < 1:
+            raise ValueError("Capacidade precisa ser positiva")
+        self.capacity = capacity
+        self.count = 0  # Total de eventos já registrados (próxima sequência)
+        self._oldest = 0  # Menor sequência que ainda não foi sobrescrita
+        self._data = array("h", [NONE]) * (capacity * NUM_FIELDS)
+        self._overwritten = None  # Lista da marca ativa (ver mark)
+
+    def __len__(self) -> int:
+        """Eventos disponíveis no buffer"""
+        return self.count - self._oldest
+
+    def append(self, kind: int, player: int, target: int = NONE, action: int = NONE,
+               card: int = NONE, amount: int = 0, flags: int = 0) -> int:
+        """Registra um evento e retorna seu número de sequência"""
+        seq = self.count
+        base = (seq % self.capacity) * NUM_FIELDS
+        data = self._data
+        if self._overwritten is not None and seq >= self.capacity:
+            self._overwritten.append((base, data[base:base + NUM_FIELDS]))
+        data[base] = kind
+        data[base + 1] = player
+        data[base + 2] = target
+        data[base + 3] = action
+        data[base + 4] = card
+        data[base + 5] = amount
+        data[base + 6] = flags
+        self.count = seq + 1
+        if self.count - self._oldest > self.capacity:
+            self._oldest = self.count - self.capacity
+        return seq
+
+    @property
+    def first(self) -> int:
+        """Sequência do evento mais antigo ainda guardado"""
+        return self._oldest
+
+    def get(self, seq: int) -> Event:
+        """Evento com número de sequência seq"""
+        if seq < self.first or seq >= self.count:
+            raise IndexError(f"Evento {seq} não está mais no buffer")
+        base = (seq % self.capacity) * NUM_FIELDS
+        return tuple(self._data[base:base + NUM_FIELDS])
+
+    def since(self, seq: int) -> Iterator[Tuple[int, Event]]:
+        """(sequência, evento) de todos os eventos a partir de seq ainda guardados"""
+        start = seq if seq > self.first else self.first
+        for current in range(start, self.count):
+            yield current, self.get(current)
+
+    def last(self, n: int) -> Iterator[Tuple[int, Event]]:
+        """Os últimos n eventos"""
+        return self.since(self.count - n if n < self.count else 0)
+
+    def mark(self) -> EventMark:
+        """
+        Marca a posição atual para rewind() (usado por CoupGame.apply/undo)
+
+        Até release(), os eventos que o buffer circular sobrescrever ficam
+        guardados na marca, então rewind() recupera o histórico inteiro mesmo
+        depois de o buffer dar a volta.
+        """
+        mark = EventMark(self.count, self._oldest, [])
+        self._overwritten = mark.overwritten
+        return mark
+
+    def release(self):
+        """Para de guardar eventos sobrescritos na marca ativa"""
+        self._overwritten = None
+
+    def rewind(self, mark: EventMark):
+        """
+        Descarta os eventos registrados depois da marca
+
+        Marcas devem ser desfeitas na ordem inversa em que foram criadas.
+        """
+        data = self._data
+        for base, fields in reversed(mark.overwritten):
+            data[base:base + NUM_FIELDS] = fields
+        self.count = mark.count
+        self._oldest = mark.oldest
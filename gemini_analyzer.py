@@ -172,9 +172,10 @@ ESTADO DO JOGO:
 """
         
         # Adiciona histórico recente
-        if game.game_history:
+        recent_history = game.render_history(5)  # Últimas 5 ações
+        if recent_history:
             context += "\nHISTÓRICO RECENTE:\n"
-            for item in game.game_history[-5:]:  # Últimas 5 ações
+            for item in recent_history:
                 context += f"- {item.get('message', 'Ação realizada')}\n"
         
         return context
@@ -0,0 +1,126 @@
+"""
+Probabilidades exatas sobre cartas ocultas (hipergeométricas)
+Para quem só vê a própria mão e as cartas reveladas, as cartas não vistas
+(baralho + mãos alheias) estão embaralhadas uniformemente; a mão de um
+oponente é uma amostra sem reposição delas. O domínio é pequeno (15 cartas,
+3 cópias por personagem), então tudo é pré-calculado ou memorizado.
+"""
+from functools import lru_cache
+from math import comb
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from coup_game import CoupGame, Player, Character, Deck
+
+TOTAL_CARDS = 15
+COPIES_PER_CHARACTER = 3
+# Até 2 personagens por consulta (ex: Capitão ou Embaixador bloqueiam roubo)
+MAX_COPIES = 2 * COPIES_PER_CHARACTER
+# Mão temporária do Embaixador: 2 cartas + 2 compradas
+MAX_HAND_SIZE = 4
+
+
+@lru_cache(maxsize=None)
+def prob_exactly(copies: int, unseen: int, hand_size: int, count: int) -> float:
+    """
+    Chance de uma mão de hand_size cartas ter exatamente count das `copies`
+    cópias, sorteando de `unseen` cartas não vistas
+    """
+    if hand_size > unseen or count > copies or count > hand_size:
+        return 0.0
+    total = comb(unseen, hand_size)
+    if not total:
+        return 0.0
+    return comb(copies, count) * comb(unseen - copies, hand_size - count) / total
+
+
+def _build_at_least_one() -> Tuple[Tuple[Tuple[float, ...], ...], ...]:
+    """Tabela [não vistas][cópias][tamanho da mão] -> chance de ter pelo menos uma"""
+    table = []
+    for unseen in range(TOTAL_CARDS + 1):
+        by_copies = []
+        for copies in range(MAX_COPIES + 1):
+            row = []
+            for hand_size in range(MAX_HAND_SIZE + 1):
+                if copies > unseen or hand_size > unseen:
+                    row.append(0.0)
+                else:
+                    row.append(1.0 - prob_exactly(copies, unseen, hand_size, 0))
+            by_copies.append(tuple(row))
+        table.append(tuple(by_copies))
+    return tuple(table)
+
+
+AT_LEAST_ONE = _build_at_least_one()
+# Mesma tabela como array, para consultas vetorizadas (ver probability_arrays)
+AT_LEAST_ONE_ARRAY = np.array(AT_LEAST_ONE)
+
+
+def at_least_one(copies: int, unseen: int, hand_size: int) -> float:
+    """Chance de uma mão de hand_size ter pelo menos uma das cópias (consulta à tabela)"""
+    if copies <= 0 or hand_size <= 0:
+        return 0.0
+    if copies > MAX_COPIES or unseen > TOTAL_CARDS or hand_size > MAX_HAND_SIZE:
+        return 1.0 - prob_exactly(copies, unseen, hand_size, 0)
+    return AT_LEAST_ONE[unseen][copies][hand_size]
+
+
+def unseen_counts(game: CoupGame, observer: Player) -> List[int]:
+    """
+    Cópias não vistas de cada personagem para o observador
+
+    Igual a 3 - cópias na mão dele - cópias reveladas; calculado pelo baralho
+    e mãos alheias, que somam exatamente isso (só informação pública).
+    """
+    unseen = game.deck.counts[:]
+    for player in game.players:
+        if player is observer:
+            continue
+        for card in player.cards:
+            unseen[Deck.INDEX[card]] += 1
+    return unseen
+
+
+def holds_probability(game: CoupGame, observer: Player, opponent: Player,
+                      characters: Sequence[Character], unseen: Sequence[int] = None) -> float:
+    """Chance exata (sem outras informações) de opponent ter pelo menos um dos personagens"""
+    if unseen is None:
+        unseen = unseen_counts(game, observer)
+    copies = sum(unseen[Deck.INDEX[char]] for char in characters)
+    return at_least_one(copies, sum(unseen), len(opponent.cards))
+
+
+def card_probabilities(game: CoupGame, observer: Player) -> Dict[str, Dict[Character, float]]:
+    """Chance de cada oponente vivo ter cada personagem, por nome"""
+    unseen = unseen_counts(game, observer)
+    total = sum(unseen)
+    return {
+        opponent.name: {
+            char: at_least_one(unseen[i], total, len(opponent.cards))
+            for i, char in enumerate(Deck.CHARACTERS)
+        }
+        for opponent in game.get_other_players(observer)
+    }
+
+
+def unseen_arrays(deck: np.ndarray, hands: np.ndarray, observer: np.ndarray) -> np.ndarray:
+    """Versão vetorizada de unseen_counts: baralho + mãos alheias, (M, 5)"""
+    rows = np.arange(len(observer))
+    return deck + hands.sum(axis=1) - hands[rows, observer]
+
+
+def probability_arrays(deck: np.ndarray, hands: np.ndarray, observer: np.ndarray) -> np.ndarray:
+    """
+    Versão vetorizada de card_probabilities para um lote de partidas
+
+    Args:
+        deck: Contagens do baralho (M, 5)
+        hands: Contagens das mãos (M, P, 5); as alheias só entram somadas ao baralho
+        observer: Jogador que observa em cada partida (M,)
+
+    Returns:
+        Array (M, P, 5): chance de cada jogador ter cada personagem para o
+        observador (0 para quem não tem cartas; a linha do observador não tem sentido)
+    """
+    unseen = unseen_arrays(deck, hands, observer)
+    sizes = hands.sum(axis=2)
+    return AT_LEAST_ONE_ARRAY[unseen.sum(axis=1)[:, None, None], unseen[:, None, :], sizes[:, :, None]]
@@ -3,8 +3,9 @@ Sistema de IA para jogar e vencer Coup
 Interface principal do jogo
 """
 import os
-from coup_game import CoupGame, Player, Action, Character
-from coup_ai import CoupAI
+from typing import List, Optional
+from coup_game import CoupGame, Player, Action, Character, TurnState
+from coup_ai import CoupAI, AIReactions
 from coup_assistant import CoupAssistant
 
 def print_header():
@@ -88,39 +89,64 @@ def get_target_from_user(game: CoupGame, player: Player) -> Player:
         except ValueError:
             print("❌ Digite um número válido!")
 
-def ask_bluff() -> bool:
-    """Pergunta se o jogador está blefando"""
+def ask_yes_no(question: str) -> bool:
+    """Faz uma pergunta de sim/não"""
     while True:
-        response = input("\nVocê está blefando? (s/n): ").strip().lower()
+        response = input(f"\n{question} (s/n): ").strip().lower()
         if response in ['s', 'sim', 'y', 'yes']:
             return True
         elif response in ['n', 'não', 'nao', 'no']:
             return False
         print("❌ Digite 's' para sim ou 'n' para não.")
 
-def handle_challenge(game: CoupGame, challenger: Player, target: Player, 
-                    action: Action, was_bluff: bool):
-    """Processa um desafio"""
-    print(f"\n⚔️ {challenger.name} desafiou {target.name}!")
+class ConsoleReactions(AIReactions):
+    """Reações do turno: IAs decidem sozinhas, o humano responde no console"""
     
-    if was_bluff:
-        # Blefe foi descoberto!
-        print(f"❌ {target.name} estava blefando!")
-        if target.cards:
-            card = target.cards[0]
-            eliminated = target.lose_card(card)
-            print(f"   {target.name} perdeu {card.value}!")
-            if eliminated:
-                print(f"   {target.name} foi ELIMINADO!")
-    else:
-        # Desafio falhou!
-        print(f"✅ {target.name} tinha a carta!")
-        if challenger.cards:
-            card = challenger.cards[0]
-            eliminated = challenger.lose_card(card)
-            print(f"   {challenger.name} perdeu {card.value} por desafiar incorretamente!")
-            if eliminated:
-                print(f"   {challenger.name} foi ELIMINADO!")
+    def __init__(self, ais: List[CoupAI], human: Player, assistant: CoupAssistant):
+        super().__init__(ais)
+        self.human = human
+        self.assistant = assistant
+    
+    def challenge(self, game: CoupGame, challenger: Player, claimant: Player,
+                  action: Action, block: bool = False) -> bool:
+        if challenger is not self.human:
+            return super().challenge(game, challenger, claimant, action, block)
+        
+        claim = f"o bloqueio de {action.value}" if block else action.value
+        should_challenge, reasoning = self.assistant.should_challenge_action(game, challenger, claimant, action, block)
+        if should_challenge:
+            print(f"\n💡 Assistente recomenda: {reasoning}")
+        return ask_yes_no(f"Desafiar {claim} de {claimant.name}?")
+    
+    def block(self, game: CoupGame, blocker: Player, actor: Player, action: Action) -> bool:
+        if blocker is not self.human:
+            return super().block(game, blocker, actor, action)
+        
+        should_block, reasoning = self.assistant.should_block_action(game, blocker, action, actor)
+        if should_block:
+            print(f"\n💡 Assistente recomenda: {reasoning}")
+        return ask_yes_no(f"Bloquear {action.value} de {actor.name}?")
+    
+    def choose_card(self, game: CoupGame, player: Player) -> Optional[Character]:
+        if player is not self.human or len(player.cards) < 2:
+            return None
+        
+        print("\n💔 Você perdeu uma influência. Qual carta entregar?")
+        for i, card in enumerate(player.cards, 1):
+            print(f"{i}. {card.value}")
+        while True:
+            choice = input("\nEscolha a carta: ").strip()
+            if choice.isdigit() and 1 <= int(choice) <= len(player.cards):
+                return player.cards[int(choice) - 1]
+            print("❌ Opção inválida!")
+
+def print_turn(game: CoupGame, turn: TurnState):
+    """Mostra o que aconteceu no turno (ação, desafios, bloqueios)"""
+    if turn.error:
+        print(f"\n❌ {turn.error}")
+        return
+    for event in game.render_since(turn.first_event):
+        print(f"   {event['message']}")
 
 def play_with_assistant():
     """Modo: Jogador humano com assistente de IA"""
@@ -141,6 +167,7 @@ def play_with_assistant():
     assistant = CoupAssistant()
     
     human_player = game.players[0]
+    reactions = ConsoleReactions(ais, human_player, assistant)
     
     print(f"\n✅ Jogo iniciado! Você tem {len(human_player.cards)} cartas e {human_player.coins} moedas.")
     input("\nPressione Enter para começar...")
@@ -186,40 +213,17 @@ def play_with_assistant():
             if follow == 's':
                 action = recommendation['best_action']
                 target = recommendation['target']
-                is_bluff = recommendation['should_bluff']
             else:
-                # Pede ação manual
+                # Pede ação manual (sem a carta, a declaração é um blefe)
                 action = get_action_from_user()
                 target = None
-                is_bluff = False
                 
                 if action in [Action.COUP, Action.ASSASSINATE, Action.STEAL]:
                     target = get_target_from_user(game, human_player)
-                
-                if action in [Action.TAX, Action.STEAL, Action.ASSASSINATE]:
-                    is_bluff = ask_bluff()
             
-            # Executa ação
-            result = game.execute_action(action, human_player, target, is_bluff)
-            print(f"\n{result['message']}")
-            
-            # Outros jogadores podem desafiar/bloquear
-            for ai_player in game.get_other_players(human_player):
-                if action == Action.FOREIGN_AID:
-                    if ai_player.has_card(Character.DUKE) or (ai_player.name.startswith("IA") and 
-                        CoupAI(name=ai_player.name).should_block(game, ai_player, action, human_player)):
-                        print(f"{ai_player.name} bloqueou Foreign Aid com Duque!")
-                        human_player.coins -= 2
-                
-                elif action == Action.STEAL and target == ai_player:
-                    should_block = ai_player.has_card(Character.CAPTAIN) or ai_player.has_card(Character.AMBASSADOR)
-                    if should_block:
-                        print(f"{ai_player.name} bloqueou o roubo!")
-                        # Não rouba
-                    elif ai_player.name.startswith("IA"):
-                        ai = next(a for a in ais if a.name == ai_player.name)
-                        if ai.should_challenge(game, ai_player, human_player, action):
-                            handle_challenge(game, ai_player, human_player, action, is_bluff)
+            # Executa ação; outros jogadores podem desafiar/bloquear
+            turn = game.play_turn(action, human_player, target, reactions)
+            print_turn(game, turn)
             
             game.next_turn()
             
@@ -229,39 +233,14 @@ def play_with_assistant():
             ai = next((a for a in ais if a.name == current.name), None)
             
             if ai:
-                action, target, is_bluff = ai.choose_action(game, current)
+                action, target, _ = ai.choose_action(game, current)
                 print(f"{current.name} escolheu: {action.value}")
                 if target:
                     print(f"   Alvo: {target.name}")
                 
-                result = game.execute_action(action, current, target, is_bluff)
-                print(f"{result['message']}")
-                
                 # Jogador humano pode desafiar/bloquear
-                if action == Action.FOREIGN_AID:
-                    should_block, reasoning = assistant.should_block_action(game, human_player, action, current)
-                    if should_block:
-                        print(f"\n💡 Assistente recomenda: {reasoning}")
-                        block = input("Bloquear? (s/n): ").strip().lower()
-                        if block == 's' and human_player.has_card(Character.DUKE):
-                            print(f"Você bloqueou Foreign Aid com Duque!")
-                            current.coins -= 2
-                
-                elif action == Action.STEAL and target == human_player:
-                    should_block, reasoning = assistant.should_block_action(game, human_player, action, current)
-                    if should_block and (human_player.has_card(Character.CAPTAIN) or 
-                                         human_player.has_card(Character.AMBASSADOR)):
-                        print(f"\n💡 Assistente recomenda: {reasoning}")
-                        block = input("Bloquear? (s/n): ").strip().lower()
-                        if block == 's':
-                            print(f"Você bloqueou o roubo!")
-                    else:
-                        should_challenge, reasoning = assistant.should_challenge_action(game, human_player, current, action)
-                        if should_challenge:
-                            print(f"\n💡 Assistente recomenda: {reasoning}")
-                            challenge = input("Desafiar? (s/n): ").strip().lower()
-                            if challenge == 's':
-                                handle_challenge(game, human_player, current, action, is_bluff)
+                turn = game.play_turn(action, current, target, reactions)
+                print_turn(game, turn)
             
             game.next_turn()
         
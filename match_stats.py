@@ -0,0 +1,136 @@
+"""
+Estatística de confrontos entre IAs
+Teste sequencial (SPRT de Wald) para encerrar uma comparação assim que o
+resultado estiver decidido (um lado mais forte ou equivalência dentro da
+margem) e a diferença pareada de avaliações com números aleatórios comuns.
+"""
+import math
+from typing import NamedTuple, Optional, Sequence
+
+# Resultado do SPRT
+FIRST_STRONGER = 1
+SECOND_STRONGER = -1
+EQUIVALENT = 0
+
+
+class _OneSidedSPRT:
+    """SPRT de Wald de H0: taxa = 0.5 contra H1: taxa = p1"""
+
+    def __init__(self, p1: float, alpha: float, beta: float):
+        self.win_step = math.log(p1 / 0.5)
+        self.loss_step = math.log((1 - p1) / 0.5)
+        self.upper = math.log((1 - beta) / alpha)
+        self.lower = math.log(beta / (1 - alpha))
+        self.llr = 0.0
+        self.accepted: Optional[bool] = None  # True = H1, False = H0, None = em curso
+
+    def update(self, first_won: bool):
+        if self.accepted is not None:
+            return
+        self.llr += self.win_step if first_won else self.loss_step
+        if self.llr >= self.upper:
+            self.accepted = True
+        elif self.llr <= self.lower:
+            self.accepted = False
+
+
+class SPRT:
+    """
+    Teste sequencial da taxa de vitória do primeiro jogador nas partidas
+    decisivas, com três resultados
+
+    Dois SPRTs unilaterais contra 50%: um testa taxa >= 0.5 + margin
+    (primeiro mais forte), o outro taxa <= 0.5 - margin (segundo mais forte).
+    Se um deles aceita a sua alternativa, o teste termina com esse lado mais
+    forte; se ambos aceitam 50%, termina em EQUIVALENT (sem diferença dentro
+    da margem). Pode ser consultado após cada partida: os erros abaixo valem
+    para o teste inteiro, não para uma amostra de tamanho fixo. Empates e
+    partidas sem vencedor não entram no teste.
+    """
+
+    def __init__(self, margin: float = 0.05, alpha: float = 0.05, beta: float = 0.05):
+        """
+        Args:
+            margin: Zona de indiferença em torno de 50%
+            alpha: Chance máxima de declarar um lado mais forte com forças iguais
+            beta: Chance máxima de declarar equivalência quando um lado tem
+                taxa de ao menos 0.5 + margin
+        """
+        if not 0 < margin < 0.5:
+            raise ValueError("margin deve estar entre 0 e 0.5")
+        self.margin = margin
+        self.alpha = alpha
+        self.beta = beta
+        # alpha dividido entre os dois lados (correção de Bonferroni)
+        self._first = _OneSidedSPRT(0.5 + margin, alpha / 2, beta)
+        self._second = _OneSidedSPRT(0.5 - margin, alpha / 2, beta)
+        self.wins = 0
+        self.losses = 0
+
+    def update(self, first_won: bool) -> Optional[int]:
+        """Registra uma partida decisiva e retorna a decisão (ver decision)"""
+        if first_won:
+            self.wins += 1
+        else:
+            self.losses += 1
+        self._first.update(first_won)
+        self._second.update(first_won)
+        return self.decision
+
+    @property
+    def decision(self) -> Optional[int]:
+        """FIRST_STRONGER, SECOND_STRONGER, EQUIVALENT ou None enquanto não decidido"""
+        if self._first.accepted:
+            return FIRST_STRONGER
+        if self._second.accepted:
+            return SECOND_STRONGER
+        if self._first.accepted is False and self._second.accepted is False:
+            return EQUIVALENT
+        return None
+
+
+class PairedDifference(NamedTuple):
+    """Diferença média de pontuação entre dois candidatos e seus erros padrão"""
+    mean: float
+    standard_error: float           # Pareado (mesmas distribuições para os dois)
+    unpaired_standard_error: float  # O mesmo número de partidas sem pareamento
+    pairs: int
+
+    @property
+    def z(self) -> float:
+        """Diferença em erros padrão"""
+        if self.standard_error > 0:
+            return self.mean / self.standard_error
+        return math.copysign(math.inf, self.mean) if self.mean else 0.0
+
+    @property
+    def variance_reduction(self) -> float:
+        """Quantas vezes menos partidas o pareamento precisa para o mesmo erro"""
+        if self.standard_error <= 0:
+            return math.inf
+        return (self.unpaired_standard_error / self.standard_error) ** 2
+
+
+def _variance(values: Sequence[float]) -> float:
+    mean = sum(values) / len(values)
+    return sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+
+
+def paired_difference(scores_a: Sequence[float], scores_b: Sequence[float]) -> PairedDifference:
+    """
+    Diferença pareada entre as pontuações de A e B (o par i jogou as mesmas cartas)
+
+    O erro padrão pareado vem da variância das diferenças por par; o não
+    pareado trata as duas amostras como independentes (referência de quanto
+    o pareamento reduz a variância).
+    """
+    pairs = len(scores_a)
+    if pairs != len(scores_b) or pairs < 2:
+        raise ValueError("São necessários ao menos 2 pares com pontuações de A e B")
+    differences = [a - b for a, b in zip(scores_a, scores_b)]
+    return PairedDifference(
+        mean=sum(differences) / pairs,
+        standard_error=math.sqrt(_variance(differences) / pairs),
+        unpaired_standard_error=math.sqrt((_variance(scores_a) + _variance(scores_b)) / pairs),
+        pairs=pairs,
+    )
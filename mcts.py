@@ -0,0 +1,483 @@
+"""
+Busca em árvore Monte Carlo por conjuntos de informação (ISMCTS)
+Cada iteração sorteia as mãos ocultas dos oponentes (determinização) de forma
+consistente com o que é público e percorre uma única árvore compartilhada
+"""
+import logging
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from compact_state import (
+    CompactState, NUM_CHARACTERS, COPIES_PER_CHARACTER, REQUIRED_CHARACTER, BLOCKING_CHARACTERS,
+    INCOME, COUP_COST, NO_TARGET,
+)
+from move_generator import legal_actions, decode_move
+from playout_policy import PlayoutPolicy
+from seeding import spawn_seeds
+
+# Bit de blefe em encode_move: a árvore agrupa jogadas pela ação declarada,
+# pois os outros jogadores não sabem se ela é blefe
+BLUFF_BIT = 8
+
+Determinizer = Callable[[CompactState, int, random.Random], CompactState]
+
+logger = logging.getLogger(__name__)
+
+
+def determinize(state: CompactState, observer: int, rng: random.Random) -> CompactState:
+    """
+    Cópia do estado com as cartas ocultas redistribuídas ao acaso
+
+    Mantém a mão do observador e o número de cartas de cada oponente. As
+    cartas ocultas (mãos dos oponentes + baralho) têm, por personagem,
+    3 - cópias do observador - cópias já reveladas; só isso é público, então
+    o sorteio é consistente com o histórico.
+    """
+    sample = state.copy()
+    sample.rng = rng
+    hands = sample.hands
+    pool = sample.deck[:]
+    for player in range(sample.num_players):
+        if player == observer:
+            continue
+        base = player * NUM_CHARACTERS
+        for char_index in range(NUM_CHARACTERS):
+            pool[char_index] += hands[base + char_index]
+            hands[base + char_index] = 0
+
+    remaining = sum(pool)
+    for player in range(sample.num_players):
+        if player == observer:
+            continue
+        base = player * NUM_CHARACTERS
+        for _ in range(sample.card_counts[player]):
+            r = rng.randrange(remaining)
+            for char_index in range(NUM_CHARACTERS):
+                r -= pool[char_index]
+                if r < 0:
+                    pool[char_index] -= 1
+                    hands[base + char_index] += 1
+                    break
+            remaining -= 1
+
+    sample.deck = pool
+    sample.deck_size = remaining
+    return sample
+
+
+def rewards(state: CompactState) -> List[float]:
+    """1 para o vencedor; sem vencedor, divide 1 pela força (cartas e moedas)"""
+    winner = state.get_winner()
+    if winner is not None:
+        values = [0.0] * state.num_players
+        values[winner] = 1.0
+        return values
+    strength = [
+        (count * 4 + min(state.coins[p], COUP_COST)) if count else 0
+        for p, count in enumerate(state.card_counts)
+    ]
+    total = sum(strength) or 1
+    return [value / total for value in strength]
+
+
+class PlayoutReactions:
+    """
+    Modelo de reações usado dentro da busca
+
+    Bloqueia sempre que tem a carta, blefa bloqueios às vezes e desafia com
+    probabilidade maior quando tem cópias do personagem declarado. A taxa base
+    de desafio é próxima da dos níveis medium/hard: um modelo que quase nunca
+    desafia faz a busca blefar demais.
+    """
+
+    def __init__(self, rng: random.Random, challenge_base: float = 0.4,
+                 challenge_per_copy: float = 0.25, bluff_block: float = 0.15):
+        self.rng = rng
+        self.challenge_base = challenge_base
+        self.challenge_per_copy = challenge_per_copy
+        self.bluff_block = bluff_block
+
+    def challenge(self, state: CompactState, challenger: int, claimant: int,
+                  action: int, block: bool = False) -> bool:
+        characters = BLOCKING_CHARACTERS[action] if block else (REQUIRED_CHARACTER[action],)
+        base = challenger * NUM_CHARACTERS
+        held = sum(state.hands[base + char_index] for char_index in characters)
+        if held >= COPIES_PER_CHARACTER * len(characters):
+            return True  # Todas as cópias estão com o desafiante
+        return self.rng.random() < self.challenge_base + held * self.challenge_per_copy
+
+    def block(self, state: CompactState, blocker: int, actor: int, action: int) -> bool:
+        base = blocker * NUM_CHARACTERS
+        for char_index in BLOCKING_CHARACTERS[action]:
+            if state.hands[base + char_index]:
+                return True
+        return self.rng.random() < self.bluff_block
+
+
+class Node:
+    """Nó da árvore: estatísticas da jogada que leva até ele"""
+
+    __slots__ = ("player", "children", "visits", "available", "reward")
+
+    def __init__(self, player: int = -1):
+        self.player = player  # Quem fez a jogada que leva a este nó
+        self.children: Dict[int, "Node"] = {}
+        self.visits = 0
+        self.available = 0  # Vezes em que a jogada era legal na determinização
+        self.reward = 0.0
+
+
+@dataclass
+class SearchStats:
+    """Resumo de uma busca"""
+    iterations: int = 0
+    nodes_expanded: int = 0
+    elapsed_ms: float = 0.0
+    max_depth: int = 0
+    # Jogada (ação, alvo) -> (visitas, recompensa média) na raiz
+    root_moves: Dict[Tuple[int, int], Tuple[int, float]] = field(default_factory=dict)
+
+
+class ISMCTS:
+    """
+    ISMCTS de observador único (SO-ISMCTS) sobre CompactState
+
+    A busca é "anytime": para quando acaba o tempo (ms) ou o número de nós,
+    o que vier primeiro, e sempre devolve a melhor jogada encontrada até ali.
+    """
+
+    # Limite de iterações por nó do orçamento (árvores pequenas param de crescer)
+    ITERATIONS_PER_NODE = 8
+
+    def __init__(self, time_budget_ms: Optional[float] = 200.0, node_budget: Optional[int] = None,
+                 exploration: float = 0.7, tree_depth: int = 12, rollout_turns: int = 30,
+                 rng: Optional[random.Random] = None,
+                 determinizer: Optional[Determinizer] = None,
+                 rollout_policy: Optional[PlayoutPolicy] = None):
+        """
+        Args:
+            time_budget_ms: Tempo máximo de busca (None = sem limite de tempo)
+            node_budget: Número máximo de nós expandidos (None = sem limite)
+            exploration: Constante de exploração do UCB
+            tree_depth: Profundidade máxima (em turnos) da árvore
+            rollout_turns: Turnos simulados após sair da árvore
+            rng: Gerador aleatório (padrão: módulo random global)
+            determinizer: Sorteio das mãos ocultas (padrão: determinize)
+            rollout_policy: Política das simulações (padrão: PlayoutPolicy com o mesmo rng)
+        """
+        if time_budget_ms is None and node_budget is None:
+            raise ValueError("Defina um limite de tempo ou de nós")
+        self.time_budget_ms = time_budget_ms
+        self.node_budget = node_budget
+        self.exploration = exploration
+        self.tree_depth = tree_depth
+        self.rollout_turns = rollout_turns
+        self.rng = rng if rng is not None else random
+        self.determinizer = determinizer or determinize
+        self.reactions = PlayoutReactions(self.rng)
+        self.rollout_policy = rollout_policy or PlayoutPolicy(self.rng)
+
+    def search(self, state: CompactState, player: int,
+               deadline: Optional[float] = None) -> Tuple[Tuple[int, int], SearchStats]:
+        """
+        Procura a melhor ação de player no estado
+
+        Args:
+            deadline: Instante absoluto (time.time()) em que a busca para,
+                além do orçamento próprio; vale entre processos
+
+        Returns:
+            ((ação, alvo), estatísticas)
+        """
+        root = Node()
+        stats = SearchStats()
+        moves = self._move_keys(state, player)
+        if not moves:
+            return (INCOME, NO_TARGET), stats
+        if len(moves) == 1:
+            return decode_move(moves[0])[:2], stats
+
+        start = time.perf_counter()
+        stop_at = None if self.time_budget_ms is None else start + self.time_budget_ms / 1000.0
+        if deadline is not None:
+            # Converte o instante absoluto para o relógio monotônico local
+            external = start + (deadline - time.time())
+            stop_at = external if stop_at is None else min(stop_at, external)
+
+        while True:
+            self._iterate(root, state, player, stats)
+            stats.iterations += 1
+            if self.node_budget is not None and (
+                    stats.nodes_expanded >= self.node_budget
+                    # Árvore esgotada (ex: final de jogo com poucas jogadas)
+                    or stats.iterations >= self.node_budget * self.ITERATIONS_PER_NODE):
+                break
+            if stop_at is not None and time.perf_counter() >= stop_at:
+                break
+
+        stats.elapsed_ms = (time.perf_counter() - start) * 1000.0
+        for key, child in root.children.items():
+            action, target, _ = decode_move(key)
+            stats.root_moves[(action, target)] = (child.visits, child.reward / max(child.visits, 1))
+
+        best = max(root.children.items(), key=lambda item: (item[1].visits, item[1].reward))[0]
+        return decode_move(best)[:2], stats
+
+    # ------------------------------------------------------------------
+    # Iteração
+    # ------------------------------------------------------------------
+
+    def _iterate(self, root: Node, state: CompactState, observer: int, stats: SearchStats):
+        sample = self.determinizer(state, observer, self.rng)
+        sample.current = observer
+        node = root
+        path = [root]
+        depth = 0
+
+        while depth < self.tree_depth and sample.get_winner() is None:
+            actor = sample.current
+            moves = self._move_keys(sample, actor)
+            if not moves:
+                break
+            children = node.children
+            untried = []
+            for key in moves:
+                child = children.get(key)
+                if child is None:
+                    untried.append(key)
+                else:
+                    child.available += 1
+
+            if untried:
+                key = untried[self.rng.randrange(len(untried))]
+                child = Node(actor)
+                child.available = 1
+                children[key] = child
+                stats.nodes_expanded += 1
+                self._play(sample, key)
+                path.append(child)
+                depth += 1
+                break
+
+            key = self._select(node, moves)
+            node = children[key]
+            self._play(sample, key)
+            path.append(node)
+            depth += 1
+
+        if depth > stats.max_depth:
+            stats.max_depth = depth
+
+        outcome = self._rollout(sample)
+        for visited in path[1:]:
+            visited.visits += 1
+            visited.reward += outcome[visited.player]
+
+    def _select(self, node: Node, moves: List[int]) -> int:
+        """UCB1 usando disponibilidade no lugar das visitas do pai"""
+        best_key = moves[0]
+        best_score = -1.0
+        c = self.exploration
+        children = node.children
+        for key in moves:
+            child = children[key]
+            score = child.reward / child.visits + c * math.sqrt(math.log(child.available) / child.visits)
+            if score > best_score:
+                best_score = score
+                best_key = key
+        return best_key
+
+    def _play(self, state: CompactState, key: int):
+        """Joga um turno inteiro (com reações) e passa a vez"""
+        action, target, _ = decode_move(key)
+        state.play_turn(action, state.current, target, self.reactions)
+        if state.get_winner() is None:
+            state.next_turn()
+
+    def _rollout(self, state: CompactState) -> List[float]:
+        """Simula turnos com a política de playout e devolve a recompensa de cada jogador"""
+        for _ in range(self.rollout_turns):
+            if state.get_winner() is not None:
+                break
+            self._play(state, self.rollout_policy.choose(state, state.current))
+        return rewards(state)
+
+    @staticmethod
+    def _move_keys(state: CompactState, player: int) -> List[int]:
+        """Jogadas de player agrupadas por (ação, alvo), sem o bit de blefe"""
+        keys = []
+        seen = set()
+        for move in legal_actions(state, player, include_bluffs=True):
+            key = move & ~BLUFF_BIT
+            if key not in seen:
+                seen.add(key)
+                keys.append(key)
+        return keys
+
+
+def _worker_search(state: CompactState, player: int, seed: int, settings: dict,
+                   deadline: Optional[float] = None) -> SearchStats:
+    """Busca independente num processo do pool (gerador próprio por worker)"""
+    rng = random.Random(seed)
+    state.rng = rng
+    searcher = ISMCTS(rng=rng, **settings)
+    return searcher.search(state, player, deadline)[1]
+
+
+def _warm_up(delay: float) -> int:
+    """Tarefa vazia que ocupa um worker por delay segundos (força todos a subirem)"""
+    time.sleep(delay)
+    return os.getpid()
+
+
+class RootParallelISMCTS:
+    """
+    ISMCTS paralelo na raiz: cada worker do pool faz buscas independentes a
+    partir do mesmo estado, com determinizações próprias, e o processo pai soma
+    as visitas e recompensas das jogadas da raiz antes de escolher
+
+    Os orçamentos valem por worker: com o mesmo tempo de parede, o número de
+    simulações cresce com o número de processos. Com orçamento de tempo, todos
+    os workers param no mesmo instante absoluto, e a busca inteira não passa
+    do orçamento mais a folga. O pool é criado e aquecido antes da primeira
+    busca (fora do orçamento; ou chame warm_up() antes) e reaproveitado;
+    feche com close() (ou use como context manager).
+    """
+
+    def __init__(self, workers: Optional[int] = None, time_budget_ms: Optional[float] = 200.0,
+                 node_budget: Optional[int] = None, exploration: float = 0.7,
+                 tree_depth: int = 12, rollout_turns: int = 30,
+                 rng: Optional[random.Random] = None,
+                 determinizer: Optional[Determinizer] = None,
+                 deadline_slack_ms: float = 100.0):
+        """
+        Args:
+            workers: Número de processos (padrão: número de núcleos)
+            time_budget_ms: Tempo máximo de busca de cada worker (None = sem limite)
+            node_budget: Nós expandidos por worker (None = sem limite)
+            exploration, tree_depth, rollout_turns: Como em ISMCTS
+            rng: Gerador das sementes dos workers (padrão: módulo random global)
+            determinizer: Sorteio das mãos ocultas (precisa ser picklable)
+            deadline_slack_ms: Folga além do tempo de busca para receber os
+                resultados; workers atrasados ficam de fora da soma
+        """
+        if time_budget_ms is None and node_budget is None:
+            raise ValueError("Defina um limite de tempo ou de nós")
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.time_budget_ms = time_budget_ms
+        self.deadline_slack_ms = deadline_slack_ms
+        self.rng = rng if rng is not None else random
+        self.settings = {
+            "time_budget_ms": time_budget_ms,
+            "node_budget": node_budget,
+            "exploration": exploration,
+            "tree_depth": tree_depth,
+            "rollout_turns": rollout_turns,
+            "determinizer": determinizer,
+        }
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def search(self, state: CompactState, player: int) -> Tuple[Tuple[int, int], SearchStats]:
+        """
+        Procura a melhor ação de player somando as raízes de todos os workers
+
+        Returns:
+            ((ação, alvo), estatísticas somadas; elapsed_ms é o tempo de parede)
+        """
+        moves = ISMCTS._move_keys(state, player)
+        if len(moves) <= 1:
+            return ISMCTS(rng=self.rng, **self.settings).search(state, player)
+
+        seeds = spawn_seeds(self.rng.getrandbits(64), self.workers)
+        if self.workers > 1:
+            self.warm_up()
+        start = time.perf_counter()
+        deadline = None
+        if self.time_budget_ms is not None:
+            deadline = time.time() + self.time_budget_ms / 1000.0
+        if self.workers == 1:
+            results = [_worker_search(state.copy(), player, seeds[0], self.settings, deadline)]
+        else:
+            results = self._run_pool(state, player, seeds, deadline)
+
+        stats = self._merge(results)
+        if not stats.root_moves:
+            # Nenhum worker respondeu: busca local só com o que resta da folga
+            local_deadline = None
+            if deadline is not None:
+                local_deadline = deadline + self.deadline_slack_ms / 1000.0
+            move, stats = ISMCTS(rng=self.rng, **self.settings).search(state, player, local_deadline)
+            stats.elapsed_ms = (time.perf_counter() - start) * 1000.0
+            return move, stats
+        stats.elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+        best = max(stats.root_moves.items(), key=lambda item: (item[1][0], item[1][1]))[0]
+        return best, stats
+
+    def warm_up(self):
+        """Cria o pool e espera todos os processos subirem (custo fora da busca)"""
+        if self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        # Tarefas que ocupam cada worker um instante obrigam o pool a iniciar todos
+        wait([self._executor.submit(_warm_up, 0.05) for _ in range(self.workers)])
+
+    def _run_pool(self, state: CompactState, player: int, seeds: List[int],
+                  deadline: Optional[float]) -> List[SearchStats]:
+        shared = state.copy()
+        shared.rng = None  # O gerador é recriado em cada worker
+        futures = [
+            self._executor.submit(_worker_search, shared, player, seed, self.settings, deadline)
+            for seed in seeds
+        ]
+        timeout = None
+        if deadline is not None:
+            timeout = max(deadline - time.time(), 0.0) + self.deadline_slack_ms / 1000.0
+        done, late = wait(futures, timeout=timeout)
+        for future in late:
+            # Workers em execução também param no prazo; só os ainda na fila são cancelados
+            future.cancel()
+        if late:
+            logger.warning("%d de %d workers da busca não responderam no prazo", len(late), len(futures))
+        results = []
+        for future in done:
+            error = future.exception()
+            if error is not None:
+                logger.error("Worker da busca falhou: %r", error, exc_info=error)
+            else:
+                results.append(future.result())
+        return results
+
+    @staticmethod
+    def _merge(results: List[SearchStats]) -> SearchStats:
+        """Soma visitas e recompensas totais por jogada da raiz"""
+        merged = SearchStats()
+        totals: Dict[Tuple[int, int], List[float]] = {}
+        for stats in results:
+            merged.iterations += stats.iterations
+            merged.nodes_expanded += stats.nodes_expanded
+            merged.max_depth = max(merged.max_depth, stats.max_depth)
+            for move, (visits, mean) in stats.root_moves.items():
+                total = totals.setdefault(move, [0, 0.0])
+                total[0] += visits
+                total[1] += visits * mean
+        merged.root_moves = {
+            move: (visits, reward / max(visits, 1)) for move, (visits, reward) in totals.items()
+        }
+        return merged
+
+    def close(self):
+        """Encerra o pool de processos"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "RootParallelISMCTS":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
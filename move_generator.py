@@ -0,0 +1,252 @@
+"""
+Gerador de jogadas legais para o Coup
+Usa tabelas pré-calculadas (moedas x cartas na mão) e máscaras de bits
+"""
+from typing import List, Tuple
+from compact_state import (
+    CompactState, NUM_ACTIONS, NUM_CHARACTERS,
+    INCOME, FOREIGN_AID, COUP, TAX, ASSASSINATE, STEAL, EXCHANGE,
+    DUKE, CAPTAIN, AMBASSADOR, CONTESSA,
+    REQUIRED_CHARACTER, TARGETED_ACTIONS, NO_TARGET, COUP_COST, ASSASSINATE_COST,
+)
+
+# Fases de um turno
+ACTION_PHASE, CHALLENGE_PHASE, BLOCK_PHASE, BLOCK_CHALLENGE_PHASE = range(4)
+
+# Moedas acima de 7 não mudam as ações possíveis
+MAX_COIN_BUCKET = COUP_COST
+NUM_HAND_MASKS = 1 << NUM_CHARACTERS
+
+# Ações que declaram um personagem (podem ser desafiadas)
+CHALLENGEABLE_MASK = (1 << TAX) | (1 << ASSASSINATE) | (1 << STEAL) | (1 << EXCHANGE)
+# Ações que podem ser bloqueadas, e por quais personagens
+BLOCKERS = {
+    FOREIGN_AID: (1 << DUKE),
+    STEAL: (1 << CAPTAIN) | (1 << AMBASSADOR),
+    ASSASSINATE: (1 << CONTESSA),
+}
+
+
+def _build_action_tables() -> Tuple[List[List[int]], List[List[int]]]:
+    """
+    Monta as tabelas [moedas][máscara da mão] -> máscara de ações
+
+    A primeira tabela tem as ações legítimas (com a carta), a segunda as
+    ações possíveis apenas blefando.
+    """
+    honest = []
+    bluff = []
+    for coins in range(MAX_COIN_BUCKET + 1):
+        honest_row = []
+        bluff_row = []
+        for hand_mask in range(NUM_HAND_MASKS):
+            honest_mask = (1 << INCOME) | (1 << FOREIGN_AID)
+            bluff_mask = 0
+            if coins >= COUP_COST:
+                honest_mask |= 1 << COUP
+            for action in (TAX, ASSASSINATE, STEAL, EXCHANGE):
+                if action == ASSASSINATE and coins < ASSASSINATE_COST:
+                    continue
+                if hand_mask & (1 << REQUIRED_CHARACTER[action]):
+                    honest_mask |= 1 << action
+                else:
+                    bluff_mask |= 1 << action
+            honest_row.append(honest_mask)
+            bluff_row.append(bluff_mask)
+        honest.append(honest_row)
+        bluff.append(bluff_row)
+    return honest, bluff
+
+
+def _build_block_table() -> List[List[int]]:
+    """Tabela [ação][máscara da mão] -> 1 se pode bloquear com a carta"""
+    table = []
+    for action in range(NUM_ACTIONS):
+        row = []
+        blockers = BLOCKERS.get(action, 0)
+        for hand_mask in range(NUM_HAND_MASKS):
+            row.append(1 if hand_mask & blockers else 0)
+        table.append(row)
+    return table
+
+
+HONEST_ACTIONS, BLUFF_ACTIONS = _build_action_tables()
+CAN_BLOCK = _build_block_table()
+# Índices dos jogadores em cada máscara de jogadores vivos (até 6 jogadores)
+MAX_PLAYERS = 6
+MASK_BITS = tuple(tuple(i for i in range(MAX_PLAYERS) if mask & (1 << i)) for mask in range(1 << MAX_PLAYERS))
+
+
+# ----------------------------------------------------------------------
+# Codificação de jogadas
+# ----------------------------------------------------------------------
+
+def encode_move(action: int, target: int = NO_TARGET, bluff: bool = False) -> int:
+    """Codifica (ação, alvo, blefe) em um inteiro: ação << 4 | blefe << 3 | alvo + 1"""
+    return (action << 4) | (8 if bluff else 0) | (target + 1)
+
+
+def decode_move(move: int) -> Tuple[int, int, bool]:
+    """Decodifica um inteiro de encode_move em (ação, alvo, blefe)"""
+    return move >> 4, (move & 7) - 1, bool(move & 8)
+
+
+# ----------------------------------------------------------------------
+# Máscaras básicas
+# ----------------------------------------------------------------------
+
+def hand_mask(state: CompactState, player: int) -> int:
+    """Máscara de bits dos personagens que o jogador tem"""
+    base = player * NUM_CHARACTERS
+    hands = state.hands
+    mask = 0
+    for char_index in range(NUM_CHARACTERS):
+        if hands[base + char_index]:
+            mask |= 1 << char_index
+    return mask
+
+
+def opponents_mask(state: CompactState, player: int) -> int:
+    """Máscara dos oponentes vivos"""
+    mask = 0
+    card_counts = state.card_counts
+    for i in range(state.num_players):
+        if i != player and card_counts[i]:
+            mask |= 1 << i
+    return mask
+
+
+def steal_targets_mask(state: CompactState, player: int) -> int:
+    """Máscara dos oponentes vivos com pelo menos 1 moeda"""
+    mask = 0
+    card_counts = state.card_counts
+    coins = state.coins
+    for i in range(state.num_players):
+        if i != player and card_counts[i] and coins[i] >= 1:
+            mask |= 1 << i
+    return mask
+
+
+def _bits(mask: int) -> Tuple[int, ...]:
+    """Índices dos bits ligados"""
+    if mask < len(MASK_BITS):
+        return MASK_BITS[mask]
+    return tuple(i for i in range(mask.bit_length()) if mask & (1 << i))
+
+
+# ----------------------------------------------------------------------
+# Geradores por fase
+# ----------------------------------------------------------------------
+
+def legal_actions(state: CompactState, player: int, include_bluffs: bool = True) -> List[int]:
+    """
+    Todas as ações de turno possíveis (com alvos), codificadas por encode_move
+
+    Args:
+        state: Estado compacto
+        player: Jogador que age
+        include_bluffs: Inclui ações declarando personagens que não tem
+    """
+    if not state.card_counts[player]:
+        return []
+
+    mask = hand_mask(state, player)
+    coins = state.coins[player]
+    bucket = coins if coins < MAX_COIN_BUCKET else MAX_COIN_BUCKET
+    honest = HONEST_ACTIONS[bucket][mask]
+    bluff = BLUFF_ACTIONS[bucket][mask] if include_bluffs else 0
+
+    opponents = _bits(opponents_mask(state, player))
+    steal_targets = None
+
+    moves = []
+    for action in range(NUM_ACTIONS):
+        bit = 1 << action
+        for is_bluff, allowed in ((False, honest), (True, bluff)):
+            if not allowed & bit:
+                continue
+            if not TARGETED_ACTIONS[action]:
+                moves.append(encode_move(action, NO_TARGET, is_bluff))
+                continue
+            if action == STEAL:
+                if steal_targets is None:
+                    steal_targets = _bits(steal_targets_mask(state, player))
+                targets = steal_targets
+            else:
+                targets = opponents
+            for target in targets:
+                moves.append(encode_move(action, target, is_bluff))
+    return moves
+
+
+def challengers_mask(state: CompactState, claimant: int) -> int:
+    """Máscara dos jogadores que podem desafiar uma declaração de claimant"""
+    return opponents_mask(state, claimant)
+
+
+def challenge_options(state: CompactState, action: int, actor: int) -> int:
+    """Máscara de quem pode desafiar a ação (0 se a ação não declara personagem)"""
+    if not CHALLENGEABLE_MASK & (1 << action):
+        return 0
+    return challengers_mask(state, actor)
+
+
+def block_options(state: CompactState, action: int, actor: int,
+                  target: int = NO_TARGET) -> Tuple[int, int]:
+    """
+    Quem pode bloquear a ação
+
+    Returns:
+        (máscara de quem bloqueia com a carta, máscara de quem só pode blefar)
+    """
+    if action not in BLOCKERS:
+        return 0, 0
+
+    if action == FOREIGN_AID:
+        candidates = opponents_mask(state, actor)
+    elif target >= 0 and state.card_counts[target]:
+        candidates = 1 << target
+    else:
+        return 0, 0
+
+    honest = 0
+    bluff = 0
+    table = CAN_BLOCK[action]
+    for blocker in _bits(candidates):
+        if table[hand_mask(state, blocker)]:
+            honest |= 1 << blocker
+        else:
+            bluff |= 1 << blocker
+    return honest, bluff
+
+
+def legal_moves(state: CompactState, phase: int, actor: int, action: int = -1,
+                target: int = NO_TARGET, blocker: int = NO_TARGET,
+                include_bluffs: bool = True) -> List[int]:
+    """
+    Jogadas legais da fase atual em uma única chamada
+
+    - ACTION_PHASE: ações de actor (encode_move)
+    - CHALLENGE_PHASE: índices de quem pode desafiar a ação de actor
+    - BLOCK_PHASE: encode_move(ação de bloqueio, bloqueador, blefe)
+    - BLOCK_CHALLENGE_PHASE: índices de quem pode desafiar o bloqueio de blocker
+    """
+    if phase == ACTION_PHASE:
+        return legal_actions(state, actor, include_bluffs)
+
+    if phase == CHALLENGE_PHASE:
+        return list(_bits(challenge_options(state, action, actor)))
+
+    if phase == BLOCK_PHASE:
+        honest, bluff = block_options(state, action, actor, target)
+        moves = [encode_move(action, blocker_index, False) for blocker_index in _bits(honest)]
+        if include_bluffs:
+            moves.extend(encode_move(action, blocker_index, True) for blocker_index in _bits(bluff))
+        return moves
+
+    if phase == BLOCK_CHALLENGE_PHASE:
+        if blocker < 0:
+            return []
+        return list(_bits(challengers_mask(state, blocker)))
+
+    raise ValueError(f"Fase desconhecida: {phase}")
@@ -0,0 +1,166 @@
+"""
+Modelo compacto do comportamento dos oponentes
+Contadores de tamanho fixo com decaimento exponencial por oponente: frequência
+de declarações, taxa de blefe descoberto e tendência a desafiar. Cada evento
+custa O(1) e a memória não cresce com o número de partidas.
+"""
+import weakref
+from typing import Dict, List, Optional
+from coup_game import CoupGame, Deck, Action, ACTION_CODES, CLAIMED_CHARACTER, BLOCKING_CHARACTERS
+from event_log import (
+    EVENT_ACTION, EVENT_BLOCK, EVENT_CHALLENGE,
+    KIND, PLAYER, TARGET, ACTION, FLAGS,
+    FLAG_SUCCESS,
+)
+
+NUM_CHARACTERS = len(Deck.CHARACTERS)
+
+# Peso das observações antigas a cada nova (meia-vida de ~23 observações)
+DECAY = 0.97
+# Estimativas sem observações e peso delas (em observações equivalentes)
+PRIOR_CLAIM_RATE = 0.5
+PRIOR_BLUFF_RATE = 0.3
+PRIOR_CHALLENGE_RATE = 0.2
+PRIOR_WEIGHT = 4.0
+
+
+class OpponentStats:
+    """Estatísticas decaídas de um oponente (cada contador é uma soma ponderada)"""
+
+    __slots__ = ("turns", "claims", "character_claims", "challenged", "bluffs",
+                 "opportunities", "challenges")
+
+    def __init__(self):
+        self.turns = 0.0              # Turnos jogados
+        self.claims = 0.0             # Turnos com personagem declarado
+        self.character_claims = [0.0] * NUM_CHARACTERS  # Declarações por personagem (ações e bloqueios)
+        self.challenged = 0.0         # Declarações dele que foram desafiadas
+        self.bluffs = 0.0             # ... e eram blefe
+        self.opportunities = 0.0      # Declarações alheias que ele podia desafiar
+        self.challenges = 0.0         # Desafios que ele fez
+
+    def observe_turn(self, character: Optional[int]):
+        """Jogou um turno, declarando character (None se a ação não exige personagem)"""
+        self.turns = self.turns * DECAY + 1
+        self.claims = self.claims * DECAY + (character is not None)
+        if character is not None:
+            self.observe_claim((character,))
+
+    def observe_claim(self, characters):
+        """Declarou um dos personagens (ação ou bloqueio)"""
+        counts = self.character_claims
+        for c in range(NUM_CHARACTERS):
+            counts[c] *= DECAY
+        for c in characters:
+            counts[c] += 1.0 / len(characters)
+
+    def observe_challenged(self, bluff: bool):
+        """Uma declaração dele foi desafiada (bluff: o desafio acertou)"""
+        self.challenged = self.challenged * DECAY + 1
+        self.bluffs = self.bluffs * DECAY + bluff
+
+    def observe_opportunity(self):
+        """Outro jogador declarou um personagem que ele podia desafiar"""
+        self.opportunities = self.opportunities * DECAY + 1
+        self.challenges *= DECAY
+
+    def observe_challenge(self):
+        """Desafiou uma declaração (conta junto com a oportunidade correspondente)"""
+        self.challenges += 1
+
+    # ------------------------------------------------------------------
+    # Consultas (médias suavizadas pelos priors)
+    # ------------------------------------------------------------------
+
+    def claim_rate(self) -> float:
+        """Fração dos turnos em que declara um personagem"""
+        return (self.claims + PRIOR_CLAIM_RATE * PRIOR_WEIGHT) / (self.turns + PRIOR_WEIGHT)
+
+    def bluff_rate(self) -> float:
+        """Fração das declarações desafiadas que eram blefe"""
+        return (self.bluffs + PRIOR_BLUFF_RATE * PRIOR_WEIGHT) / (self.challenged + PRIOR_WEIGHT)
+
+    def challenge_rate(self) -> float:
+        """Fração das declarações alheias que ele desafia"""
+        rate = (self.challenges + PRIOR_CHALLENGE_RATE * PRIOR_WEIGHT) / (self.opportunities + PRIOR_WEIGHT)
+        return min(rate, 1.0)
+
+    def claim_frequency(self) -> List[float]:
+        """Fração das declarações que cita cada personagem (uniforme sem observações)"""
+        total = sum(self.character_claims)
+        if total <= 0:
+            return [1.0 / NUM_CHARACTERS] * NUM_CHARACTERS
+        return [count / total for count in self.character_claims]
+
+
+class OpponentModel:
+    """
+    Estatísticas de todos os jogadores vistos, por nome
+
+    update() lê só os eventos novos do jogo (como BeliefTracker) e continua
+    valendo entre partidas: o mesmo nome acumula o histórico decaído. Guarda
+    a posição de leitura de cada jogo, então alternar entre várias partidas
+    simultâneas não relê eventos. Só usa informação pública; o bit de blefe
+    registrado pelo motor é ignorado.
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, OpponentStats] = {}
+        # Próximo evento a ler de cada jogo (some junto com o jogo)
+        self._cursors = weakref.WeakKeyDictionary()
+
+    def get(self, name: str) -> OpponentStats:
+        """Estatísticas do jogador (criadas vazias se ainda não visto)"""
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = OpponentStats()
+        return stats
+
+    def update(self, game: CoupGame) -> int:
+        """Processa os eventos novos de game. Retorna quantos foram lidos."""
+        cursor = self._cursors.get(game, game.events.first)
+        processed = 0
+        for seq, event in game.events.since(cursor):
+            self._apply(game, event)
+            cursor = seq + 1
+            processed += 1
+        self._cursors[game] = cursor
+        return processed
+
+    def _apply(self, game: CoupGame, event):
+        kind = event[KIND]
+        player = game.players[event[PLAYER]]
+        action = ACTION_CODES[event[ACTION]]
+
+        if kind == EVENT_ACTION:
+            claimed = CLAIMED_CHARACTER.get(action)
+            self.get(player.name).observe_turn(Deck.INDEX[claimed] if claimed else None)
+            if claimed is not None:
+                self._opportunities(game, player)
+
+        elif kind == EVENT_BLOCK:
+            self.get(player.name).observe_claim(tuple(Deck.INDEX[c] for c in BLOCKING_CHARACTERS[action]))
+            self._opportunities(game, player)
+
+        elif kind == EVENT_CHALLENGE:
+            self.get(player.name).observe_challenge()
+            claimant = game.players[event[TARGET]]
+            self.get(claimant.name).observe_challenged(bool(event[FLAGS] & FLAG_SUCCESS))
+
+    def _opportunities(self, game: CoupGame, claimant):
+        for other in game.players:
+            if other is not claimant and not other.eliminated:
+                self.get(other.name).observe_opportunity()
+
+    def record(self, name: str, action: Action, was_bluff: Optional[bool] = None):
+        """
+        Registra manualmente um turno (ex: partida física)
+
+        Args:
+            was_bluff: Resultado de um desafio à declaração (None se não foi desafiada)
+        """
+        claimed = CLAIMED_CHARACTER.get(action)
+        stats = self.get(name)
+        stats.observe_turn(Deck.INDEX[claimed] if claimed else None)
+        if was_bluff is not None:
+            stats.observe_challenged(was_bluff)
@@ -4,12 +4,18 @@ Você informa o estado do jogo e recebe recomendações
 """
 from typing import List, Dict, Optional
 from coup_assistant import CoupAssistant
+from coup_ai import CoupAI
 from coup_game import CoupGame, Player, Action, Character
 
 class PhysicalGameAssistant:
     """Assistente para jogo físico - você informa o estado e recebe ajuda"""
     
-    def __init__(self):
+    def __init__(self, search_workers: int = 1):
+        """
+        Args:
+            search_workers: Processos da busca ISMCTS da segunda opinião
+                (1 = busca no próprio processo, sem pool)
+        """
         self.assistant = CoupAssistant()
         self.game_state = {
             "your_name": "",
@@ -22,6 +28,15 @@ class PhysicalGameAssistant:
         self.current_turn_index = 0  # Índice do jogador atual
         self.rounds = []  # Histórico de rodadas
         self.first_player = ""  # Quem começou
+        self.search_time_ms = 500  # Tempo da busca ISMCTS por recomendação
+        self.search_workers = search_workers  # Processos da busca (paralela na raiz)
+        self._expert: Optional[CoupAI] = None  # Reaproveita o pool entre recomendações
+    
+    def close(self):
+        """Libera o pool de processos da busca do especialista (se houver)"""
+        if self._expert is not None:
+            self._expert.close()
+            self._expert = None
         
     def setup_game(self):
         """Configura o jogo inicial"""
@@ -152,6 +167,7 @@ class PhysicalGameAssistant:
         
         # Atualiza moedas do jogador
         player.coins = self.game_state["your_coins"]
+        game.rehash()
         
         print("\n" + "🤖" * 30)
         print("ASSISTENTE ANALISANDO...")
@@ -159,10 +175,28 @@ class PhysicalGameAssistant:
         
         recommendation = self.assistant.get_recommendation(game, player)
         
+        # Busca ISMCTS com tempo limitado (segunda opinião)
+        if self._expert is None:
+            self._expert = CoupAI(name="Especialista", difficulty="expert",
+                                  search_time_ms=self.search_time_ms, search_workers=self.search_workers)
+        expert = self._expert
+        search_action, search_target, _ = expert.choose_action(game, player)
+        stats = expert.last_search_stats
+        
         print("\n" + "=" * 60)
         print("💡 RECOMENDAÇÃO DO ASSISTENTE")
         print("=" * 60)
         
+        search_line = f"\n🔎 {'Busca ISMCTS' if stats is not None else 'Tabela de finais'}: {search_action.value.upper()}"
+        if search_target:
+            search_line += f" em {search_target.name}"
+        print(search_line)
+        if stats is None:
+            # Duelo respondido pela tabela de finais, sem busca
+            print("   Resposta exata da tabela de finais (duelo)")
+        else:
+            print(f"   {stats.nodes_expanded} nós expandidos, {stats.iterations} simulações em {stats.elapsed_ms:.0f} ms")
+        
         # Mostra análise do Gemini se disponível
         if recommendation.get('gemini_analysis'):
             print("\n" + "✨" * 30)
@@ -204,17 +238,26 @@ class PhysicalGameAssistant:
         names = [self.game_state["your_name"]] + [opp["name"] for opp in self.game_state["opponents"]]
         game = CoupGame(names)
         
-        # Define suas cartas
-        game.players[0].cards = self.game_state["your_cards"].copy()
-        game.players[0].coins = self.game_state["your_coins"]
+        # Devolve todas as cartas sorteadas: as suas saem primeiro do baralho
+        for player in game.players:
+            game.deck.extend(player.cards)
+            player.cards = []
+        
+        you = game.players[0]
+        for card in self.game_state["your_cards"]:
+            game.deck.take(card)
+            you.cards.append(card)
+        you.coins = self.game_state["your_coins"]
         
         # Define estado dos oponentes (aproximado)
         for i, opp_info in enumerate(self.game_state["opponents"]):
             player = game.players[i + 1]
             player.coins = opp_info["coins"]
-            # Não sabemos as cartas exatas, mas sabemos quantas tem
-            # Mantém as cartas que já foram distribuídas
+            # Não sabemos as cartas exatas, só quantas tem: sorteia do que sobrou
+            player.cards = [game.deck.draw(game.rng) for _ in range(opp_info["cards_count"])]
+            player.eliminated = not player.cards
         
+        game.rehash()
         return game
     
     def analyze_action(self, action_name: str, actor_name: str, target_name: Optional[str] = None):
@@ -656,7 +699,10 @@ def main_physical():
     print("Use 'rodada' para registrar cada jogada conforme acontece.")
     print("O sistema seguirá a ordem de jogada automaticamente.")
     
-    assistant.interactive_mode()
+    try:
+        assistant.interactive_mode()
+    finally:
+        assistant.close()
 
 if __name__ == "__main__":
     main_physical()
@@ -0,0 +1,231 @@
+"""
+Política leve de simulação (playout) sobre CompactState
+Uma jogada por um único laço pelos jogadores e jogadas pré-codificadas: sem
+listas, lambdas nem probabilidades, ordens de grandeza mais barata que as
+estratégias de CoupAI. É a política padrão dos rollouts do ISMCTS.
+
+Medir:  python playout_policy.py --games 2000
+"""
+import argparse
+import random
+import time
+from typing import Callable, List, Optional
+from coup_game import CoupGame, Player, Action, CLAIMED_CHARACTER
+from compact_state import (
+    CompactState, ACTIONS, ACTION_INDEX, NUM_ACTIONS, NUM_CHARACTERS,
+    INCOME, FOREIGN_AID, COUP, TAX, ASSASSINATE, STEAL, EXCHANGE,
+    DUKE, ASSASSIN, CAPTAIN, COUP_COST, ASSASSINATE_COST,
+)
+from move_generator import encode_move, decode_move, MAX_PLAYERS
+from seeding import derive_seed
+
+# MOVES[ação][alvo + 1] -> jogada codificada (sem o bit de blefe: o estado compacto deduz o blefe da mão)
+MOVES = tuple(tuple(encode_move(action, target) for target in range(-1, MAX_PLAYERS))
+              for action in range(NUM_ACTIONS))
+INCOME_MOVE = MOVES[INCOME][0]
+FOREIGN_AID_MOVE = MOVES[FOREIGN_AID][0]
+TAX_MOVE = MOVES[TAX][0]
+EXCHANGE_MOVE = MOVES[EXCHANGE][0]
+COUP_MOVES = MOVES[COUP][1:]
+ASSASSINATE_MOVES = MOVES[ASSASSINATE][1:]
+STEAL_MOVES = MOVES[STEAL][1:]
+
+
+class PlayoutPolicy:
+    """
+    Política de playout: Coup no mais forte com 7+ moedas, senão usa o
+    personagem que tem (Assassino no mais forte, Duque, Capitão no mais rico),
+    às vezes blefa Duque ou faz uma jogada ao acaso, e no resto pega ajuda
+    externa ou renda
+
+    "Mais forte" é quem tem mais cartas (depois mais moedas); alvos são
+    escolhidos num único laço, sem sorteio.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None, random_rate: float = 0.05,
+                 bluff_rate: float = 0.05, foreign_aid_rate: float = 0.6):
+        """
+        Args:
+            rng: Gerador aleatório (padrão: módulo random global)
+            random_rate: Chance de uma jogada qualquer (com blefes), para variar as simulações
+            bluff_rate: Chance de blefar Duque sem outra boa jogada
+            foreign_aid_rate: Chance de ajuda externa (senão renda) como última opção
+        """
+        self.rng = rng if rng is not None else random
+        self.random_rate = random_rate
+        self.bluff_rate = random_rate + bluff_rate  # Limiares acumulados sobre um só sorteio
+        self.foreign_aid_rate = foreign_aid_rate
+
+    def choose(self, state: CompactState, actor: int) -> int:
+        """Jogada (move_generator.encode_move) do ator no estado"""
+        coins = state.coins
+        card_counts = state.card_counts
+        richest = strongest = -1
+        richest_coins = strongest_key = -1
+        for player in range(state.num_players):
+            count = card_counts[player]
+            if not count or player == actor:
+                continue
+            player_coins = coins[player]
+            if player_coins > richest_coins:
+                richest, richest_coins = player, player_coins
+            key = (count << 8) | player_coins
+            if key > strongest_key:
+                strongest, strongest_key = player, key
+        if strongest < 0:
+            return INCOME_MOVE
+
+        my_coins = coins[actor]
+        if my_coins >= COUP_COST:
+            return COUP_MOVES[strongest]
+
+        r = self.rng.random()
+        if r < self.random_rate:
+            # Jogada qualquer: r / random_rate é um novo sorteio uniforme em [0, 1)
+            pick = int(r / self.random_rate * (6 if my_coins >= ASSASSINATE_COST else 5))
+            if pick == 0:
+                return FOREIGN_AID_MOVE
+            if pick == 1:
+                return TAX_MOVE
+            if pick == 2 and richest_coins > 0:
+                return STEAL_MOVES[richest]
+            if pick == 3:
+                return EXCHANGE_MOVE
+            if pick == 5:
+                return ASSASSINATE_MOVES[strongest]
+            return INCOME_MOVE
+
+        base = actor * NUM_CHARACTERS
+        hands = state.hands
+        if hands[base + ASSASSIN] and my_coins >= ASSASSINATE_COST:
+            return ASSASSINATE_MOVES[strongest]
+        if hands[base + DUKE]:
+            return TAX_MOVE
+        if hands[base + CAPTAIN] and richest_coins > 0:
+            return STEAL_MOVES[richest]
+        if r < self.bluff_rate:
+            return TAX_MOVE
+        return FOREIGN_AID_MOVE if self.rng.random() < self.foreign_aid_rate else INCOME_MOVE
+
+
+class PlayoutAgent:
+    """
+    PlayoutPolicy com a interface de CoupAI (para jogar CoupGame e comparar força)
+
+    Reage como o modelo de reações da busca (mcts.PlayoutReactions).
+    """
+
+    def __init__(self, name: str = "Playout", seed: Optional[int] = None,
+                 rng: Optional[random.Random] = None):
+        from mcts import PlayoutReactions  # mcts usa este módulo
+
+        self.name = name
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.policy = PlayoutPolicy(self.rng)
+        self.reactions = PlayoutReactions(self.rng)
+
+    def choose_action(self, game: CoupGame, player: Player):
+        """Mesma interface de CoupAI.choose_action"""
+        index = game.players.index(player)
+        action_code, target_index, _ = decode_move(self.policy.choose(CompactState.from_game(game), index))
+        action = ACTIONS[action_code]
+        target = game.players[target_index] if target_index >= 0 else None
+        claimed = CLAIMED_CHARACTER.get(action)
+        return (action, target, claimed is not None and not player.has_card(claimed))
+
+    def should_challenge(self, game: CoupGame, challenger: Player, target: Player, action: Action) -> bool:
+        return self._challenge(game, challenger, target, action, False)
+
+    def should_challenge_block(self, game: CoupGame, challenger: Player, blocker: Player,
+                               action: Action) -> bool:
+        return self._challenge(game, challenger, blocker, action, True)
+
+    def _challenge(self, game: CoupGame, challenger: Player, claimant: Player,
+                   action: Action, block: bool) -> bool:
+        return self.reactions.challenge(CompactState.from_game(game), game.players.index(challenger),
+                                        game.players.index(claimant), ACTION_INDEX[action], block)
+
+    def should_block(self, game: CoupGame, blocker: Player, action: Action, actor: Player) -> bool:
+        if blocker.eliminated:
+            return False
+        return self.reactions.block(CompactState.from_game(game), game.players.index(blocker),
+                                    game.players.index(actor), ACTION_INDEX[action])
+
+
+def sample_states(games: int = 200, num_players: int = 4, seed: int = 0,
+                  max_states: int = 10000) -> List[CompactState]:
+    """Estados de partidas jogadas pela própria política (amostra para medir velocidade)"""
+    rng = random.Random(seed)
+    playout = PlayoutPolicy(rng)
+    states = []
+    for _ in range(games):
+        state = CompactState.new_game(num_players, rng)
+        while state.get_winner() is None and len(states) < max_states:
+            states.append(state.copy())
+            action, target, _ = decode_move(playout.choose(state, state.current))
+            state.play_turn(action, state.current, target)
+            if state.get_winner() is None:
+                state.next_turn()
+    return states
+
+
+def moves_per_second(choose: Callable, positions: List) -> float:
+    """Jogadas por segundo de choose(*posição) sobre as posições (só a escolha é cronometrada)"""
+    start = time.perf_counter()
+    for position in positions:
+        choose(*position)
+    return len(positions) / (time.perf_counter() - start)
+
+
+def win_rate_vs(opponent: str, games: int = 1000, num_players: int = 2, seed: int = 0) -> float:
+    """Fração de vitórias de PlayoutAgent contra CoupAI(opponent), alternando os assentos"""
+    from coup_ai import CoupAI, AIReactions
+
+    wins = 0
+    for i in range(games):
+        agents = [PlayoutAgent("Playout", seed=derive_seed(seed, i, 0))] + [
+            CoupAI(f"{opponent}{j}", opponent, seed=derive_seed(seed, i, j + 1))
+            for j in range(num_players - 1)
+        ]
+        shift = i % num_players
+        agents = agents[shift:] + agents[:shift]
+        reactions = AIReactions(agents)
+        game = CoupGame([agent.name for agent in agents], seed=derive_seed(seed, i))
+        for _ in range(200):
+            if game.is_game_over():
+                break
+            player = game.get_current_player()
+            action, target, _ = reactions.ais[player.name].choose_action(game, player)
+            game.play_turn(action, player, target, reactions)
+            game.next_turn()
+        winner = game.get_winner()
+        wins += winner is not None and winner.name == "Playout"
+    return wins / games
+
+
+if __name__ == "__main__":
+    from coup_ai import CoupAI
+
+    parser = argparse.ArgumentParser(description="Mede a política de playout")
+    parser.add_argument("--games", type=int, default=1000, help="Partidas contra cada nível")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    states = sample_states(seed=args.seed)
+    playout = PlayoutPolicy(random.Random(args.seed))
+    speed = moves_per_second(playout.choose, [(state, state.current) for state in states])
+    print(f"PlayoutPolicy: {speed:,.0f} jogadas/s")
+
+    # Referência: estratégias de CoupAI nos mesmos estados, já convertidos em CoupGame
+    games = [state.to_game([f"J{i}" for i in range(state.num_players)]) for state in states]
+    positions = [(game, game.get_current_player()) for game in games]
+    for difficulty in ("medium", "hard"):
+        ai = CoupAI("Ref", difficulty, seed=args.seed)
+        reference = moves_per_second(ai.choose_action, positions)
+        print(f"CoupAI {difficulty}: {reference:,.0f} jogadas/s ({speed / reference:.0f}x mais lenta)")
+
+    for difficulty in ("medium", "hard"):
+        rate = win_rate_vs(difficulty, args.games, args.players, args.seed)
+        print(f"Vitórias contra {difficulty} ({args.players} jogadores): {rate:.1%} "
+              f"(esperado sem vantagem: {1 / args.players:.1%})")
@@ -0,0 +1,216 @@
+"""
+Tabela de política pré-compilada
+Compila a estratégia de qualquer CoupAI numa tabela densa indexada por um
+estado abstrato (mão, moedas, oponentes). Escolher a jogada vira um acesso a
+array; a tabela é gravada em .npy e carregada com memory map.
+
+Compilar:  python policy_table.py hard politica_hard.npy
+"""
+import argparse
+import random
+from collections import Counter
+from itertools import combinations_with_replacement
+from typing import Optional, Tuple
+import numpy as np
+from coup_game import CoupGame, Player, Action, CLAIMED_CHARACTER
+from compact_state import ACTIONS, ACTION_INDEX, CHAR_INDEX, CHARACTERS, NUM_CHARACTERS
+from seeding import derive_seed
+
+# Mãos de 1 e 2 cartas (tuplas ordenadas de índices de personagem)
+HANDS = tuple(
+    hand for size in (1, 2) for hand in combinations_with_replacement(range(NUM_CHARACTERS), size)
+)
+HAND_INDEX = {hand: i for i, hand in enumerate(HANDS)}
+
+# Dimensões da chave abstrata
+MAX_OWN_COINS = 10                # Moedas próprias exatas até 10 (acima satura)
+MAX_OPPONENTS = 5
+OPP_COIN_BUCKETS = 4              # Oponente mais rico: 0, 1-2, 3-6, 7+
+OPP_COIN_EXAMPLE = (0, 2, 4, 7)   # Valor representativo de cada faixa
+MAX_OPP_CARDS = 2                 # Mais cartas entre os oponentes: 1 ou 2
+KEY_SHAPE = (len(HANDS), MAX_OWN_COINS + 1, MAX_OPPONENTS, OPP_COIN_BUCKETS, MAX_OPP_CARDS)
+NUM_KEYS = int(np.prod(KEY_SHAPE))
+
+# Entrada da tabela: código da ação + regra do alvo << 3
+UNCOVERED = 255
+NO_TARGET, RICHEST, STRONGEST = range(3)
+TARGET_SHIFT = 3
+ACTION_MASK = (1 << TARGET_SHIFT) - 1
+
+
+def _opp_coin_bucket(coins: int) -> int:
+    if coins == 0:
+        return 0
+    if coins < 3:
+        return 1
+    return 2 if coins < 7 else 3
+
+
+def _richest(opponents) -> Player:
+    return max(opponents, key=lambda p: p.coins)
+
+
+def _strongest(opponents) -> Player:
+    return max(opponents, key=lambda p: (len(p.cards), p.coins))
+
+
+def state_key(game: CoupGame, player: Player) -> Optional[int]:
+    """Índice da chave abstrata do estado (None fora dos limites da tabela)"""
+    opponents = game.get_other_players(player)
+    if not opponents or len(opponents) > MAX_OPPONENTS:
+        return None
+    hand = HAND_INDEX.get(tuple(sorted(CHAR_INDEX[card] for card in player.cards)))
+    if hand is None:
+        return None
+    richest = max(p.coins for p in opponents)
+    most_cards = max(len(p.cards) for p in opponents)
+    return (((hand * (MAX_OWN_COINS + 1) + min(player.coins, MAX_OWN_COINS)) * MAX_OPPONENTS
+             + len(opponents) - 1) * OPP_COIN_BUCKETS + _opp_coin_bucket(richest)) * MAX_OPP_CARDS \
+        + min(most_cards, MAX_OPP_CARDS) - 1
+
+
+def _representative_game(key: int, seed: int) -> Tuple[CoupGame, Player]:
+    """Jogo com o estado abstrato `key` (cartas dos oponentes sorteadas)"""
+    hand, coins, opponents, opp_bucket, opp_cards = np.unravel_index(key, KEY_SHAPE)
+    rng = random.Random(seed)
+    game = CoupGame([f"J{i}" for i in range(opponents + 2)], rng=rng)
+    for p in game.players:
+        game.deck.extend(p.cards)
+        p.cards = []
+
+    you = game.players[0]
+    for char_index in HANDS[hand]:
+        card = CHARACTERS[char_index]
+        game.deck.take(card)
+        you.cards.append(card)
+    you.coins = int(coins)
+
+    # Primeiro oponente: o mais rico; segundo (se houver): o de mais cartas
+    richest = OPP_COIN_EXAMPLE[opp_bucket]
+    for i, p in enumerate(game.players[1:]):
+        count = int(opp_cards) + 1 if (i == 1 or opponents == 0) else 1
+        p.cards = [game.deck.draw(rng) for _ in range(count)]
+        p.coins = richest if i == 0 else min(richest, max(richest - 1, 0))
+    game.rehash()
+    return game, you
+
+
+def _encode(game: CoupGame, player: Player, move: Tuple[Action, Optional[Player], bool]) -> int:
+    """Jogada -> entrada da tabela (UNCOVERED se o alvo não segue nenhuma regra)"""
+    action, target, _ = move
+    if target is None:
+        return ACTION_INDEX[action]
+    opponents = game.get_other_players(player)
+    if target is _richest(opponents):
+        return ACTION_INDEX[action] | RICHEST << TARGET_SHIFT
+    if target is _strongest(opponents):
+        return ACTION_INDEX[action] | STRONGEST << TARGET_SHIFT
+    return UNCOVERED
+
+
+class CompiledPolicy:
+    """
+    Política compilada: choose_action com uma consulta à tabela
+
+    Chaves fora da tabela ou não cobertas na compilação usam a estratégia
+    original (fallback), se houver.
+    """
+
+    def __init__(self, table: np.ndarray, fallback=None):
+        """
+        Args:
+            table: Array uint8 com NUM_KEYS entradas
+            fallback: CoupAI usada nas chaves não cobertas (opcional)
+        """
+        if table.shape != (NUM_KEYS,) or table.dtype != np.uint8:
+            raise ValueError("Tabela com formato diferente da chave abstrata atual")
+        self.table = table
+        self.fallback = fallback
+
+    @classmethod
+    def compile(cls, ai, samples: int = 8, min_agreement: float = 0.5,
+                seed: int = 0) -> "CompiledPolicy":
+        """
+        Compila a estratégia de `ai` consultando choose_action em estados
+        representativos de cada chave
+
+        Args:
+            ai: CoupAI de origem (também vira o fallback)
+            samples: Consultas por chave (estratégias aleatórias variam)
+            min_agreement: Fração mínima da jogada mais comum para cobrir a chave
+            seed: Semente dos estados representativos
+        """
+        table = np.full(NUM_KEYS, UNCOVERED, dtype=np.uint8)
+        compiled, ai.compiled_policy = ai.compiled_policy, None  # Compila a estratégia ao vivo
+        for key in range(NUM_KEYS):
+            votes = Counter()
+            for sample in range(samples):
+                game, player = _representative_game(key, derive_seed(seed, key, sample))
+                ai.beliefs = None  # Crenças são por jogo
+                votes[_encode(game, player, ai.choose_action(game, player))] += 1
+            entry, count = votes.most_common(1)[0]
+            if count >= min_agreement * samples:
+                table[key] = entry
+        ai.beliefs = None
+        ai.compiled_policy = compiled
+        return cls(table, ai)
+
+    def save(self, path: str):
+        """Grava a tabela em .npy (carregável com memory map)"""
+        np.save(path, self.table)
+
+    @classmethod
+    def load(cls, path: str, fallback=None) -> "CompiledPolicy":
+        """Abre a tabela com memory map (só as páginas consultadas são lidas)"""
+        return cls(np.load(path, mmap_mode="r"), fallback)
+
+    @property
+    def coverage(self) -> float:
+        """Fração das chaves com jogada compilada"""
+        return float(np.count_nonzero(self.table != UNCOVERED)) / NUM_KEYS
+
+    def lookup(self, game: CoupGame, player: Player) -> Optional[Tuple[Action, Optional[Player], bool]]:
+        """Jogada compilada para o estado, ou None se a chave não estiver coberta"""
+        key = state_key(game, player)
+        if key is None:
+            return None
+        entry = int(self.table[key])
+        if entry == UNCOVERED:
+            return None
+
+        action = ACTIONS[entry & ACTION_MASK]
+        rule = entry >> TARGET_SHIFT
+        target = None
+        if rule != NO_TARGET:
+            opponents = game.get_other_players(player)
+            target = _richest(opponents) if rule == RICHEST else _strongest(opponents)
+        if not game.is_valid_action(action, player, target, require_card=False)[0]:
+            return None
+        claimed = CLAIMED_CHARACTER.get(action)
+        return (action, target, claimed is not None and not player.has_card(claimed))
+
+    def choose_action(self, game: CoupGame, player: Player) -> Tuple[Action, Optional[Player], bool]:
+        """Mesma interface de CoupAI.choose_action"""
+        move = self.lookup(game, player)
+        if move is not None:
+            return move
+        if self.fallback is None:
+            return (Action.INCOME, None, False)
+        return self.fallback.choose_action(game, player)
+
+
+if __name__ == "__main__":
+    from coup_ai import CoupAI
+
+    parser = argparse.ArgumentParser(description="Compila a estratégia de uma dificuldade em tabela")
+    parser.add_argument("difficulty", choices=("easy", "medium", "hard", "expert", "cfr"))
+    parser.add_argument("output", help="Arquivo .npy de saída")
+    parser.add_argument("--samples", type=int, default=8)
+    parser.add_argument("--min-agreement", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ai = CoupAI(name="Compilada", difficulty=args.difficulty, seed=args.seed)
+    policy = CompiledPolicy.compile(ai, args.samples, args.min_agreement, args.seed)
+    policy.save(args.output)
+    print(f"Tabela gravada em {args.output}: {policy.coverage:.0%} das {NUM_KEYS} chaves cobertas")
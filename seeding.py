@@ -0,0 +1,45 @@
+"""
+Sementes reproduzíveis para simulações paralelas
+Deriva fluxos aleatórios independentes a partir de uma semente base
+"""
+import random
+from typing import List, Optional
+
+_MASK64 = (1 << 64) - 1
+
+
+def _splitmix64(value: int) -> int:
+    """Função de mistura SplitMix64 (bijetiva em 64 bits)"""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def derive_seed(base_seed: int, *keys: int) -> int:
+    """
+    Deriva uma semente independente de (base_seed, chave1, chave2, ...)
+
+    A mesma combinação sempre gera a mesma semente, então a partida i de um
+    lote pode ser reproduzida só com derive_seed(base, i), sem rodar as
+    anteriores.
+    """
+    seed = _splitmix64(base_seed & _MASK64)
+    for key in keys:
+        seed = _splitmix64(seed ^ (key & _MASK64))
+    return seed
+
+
+def spawn_seeds(base_seed: int, count: int) -> List[int]:
+    """Sementes independentes para count workers ou partidas"""
+    return [derive_seed(base_seed, i) for i in range(count)]
+
+
+def make_rng(seed: Optional[int] = None) -> random.Random:
+    """Gerador próprio (não compartilha estado com o módulo random)"""
+    return random.Random(seed)
+
+
+def new_base_seed() -> int:
+    """Semente base aleatória para um novo lote (guarde-a para reproduzir)"""
+    return random.SystemRandom().getrandbits(63)
@@ -0,0 +1,5 @@
+"""Configuração dos testes: módulos do projeto importáveis a partir da raiz"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,51 @@
+"""Jogadas aleatórias (válidas) usadas pelos testes de regras"""
+import random
+from typing import Optional
+from coup_game import CoupGame, Action, Move, Reactions, Player, Character
+
+TURN_ACTIONS = [
+    Action.INCOME, Action.FOREIGN_AID, Action.COUP, Action.TAX,
+    Action.ASSASSINATE, Action.STEAL, Action.EXCHANGE,
+]
+
+
+def random_action(game: CoupGame, rng: random.Random):
+    """(ação, alvo) válidos para o jogador da vez, blefes incluídos"""
+    player = game.get_current_player()
+    others = game.get_other_players(player)
+    options = []
+    for action in TURN_ACTIONS:
+        for target in (others if action in (Action.COUP, Action.ASSASSINATE, Action.STEAL) else [None]):
+            if game.is_valid_action(action, player, target, require_card=False)[0]:
+                options.append((action, target))
+    return rng.choice(options)
+
+
+def maybe_player(game: CoupGame, rng: random.Random, probability: float = 0.3) -> Optional[Player]:
+    """Um jogador vivo qualquer (ou ninguém)"""
+    alive = [p for p in game.players if not p.eliminated]
+    return rng.choice(alive) if rng.random() < probability else None
+
+
+def random_move(game: CoupGame, rng: random.Random) -> Move:
+    """Turno com ação e reações sorteadas"""
+    action, target = random_action(game, rng)
+    return Move(
+        player=game.get_current_player(), action=action, target=target,
+        challenger=maybe_player(game, rng), blocker=maybe_player(game, rng, 0.5),
+        block_challenger=maybe_player(game, rng),
+        lost_cards=tuple(rng.choice(list(Character)) for _ in range(3)),
+    )
+
+
+class RandomReactions(Reactions):
+    """Reações sorteadas por um gerador próprio"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def challenge(self, game, challenger, claimant, action, block=False) -> bool:
+        return self.rng.random() < 0.15
+
+    def block(self, game, blocker, actor, action) -> bool:
+        return self.rng.random() < 0.3
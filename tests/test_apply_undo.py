@@ -0,0 +1,67 @@
+"""CoupGame.apply/undo: desfazer um turno devolve exatamente o estado anterior"""
+import random
+import pytest
+from coup_game import CoupGame, Move, Action, Character
+from random_play import random_move
+
+
+class SmallLogGame(CoupGame):
+    """Registro pequeno: o buffer circular dá a volta durante a partida"""
+    HISTORY_CAPACITY = 8
+
+
+def snapshot(game: CoupGame):
+    return (
+        [(p.coins, sorted(c.value for c in p.cards), p.eliminated) for p in game.players],
+        game.deck.snapshot(), game.current_player_index, game.state_hash,
+        game.events.count, game.events.first, list(game.events.since(0)),
+    )
+
+
+@pytest.mark.parametrize("game_class", [CoupGame, SmallLogGame])
+@pytest.mark.parametrize("seed", range(20))
+def test_apply_undo_restores_state(game_class, seed):
+    rng = random.Random(seed)
+    game = game_class([f"J{i}" for i in range(2 + seed % 5)], seed=seed)
+    for _ in range(150):
+        if game.is_game_over():
+            break
+        before = snapshot(game)
+        version = game.version
+        
+        # Ramos descartados: aplica e desfaz uma pilha de jogadas
+        tokens = []
+        for _ in range(rng.randint(1, 3)):
+            if game.is_game_over():
+                break
+            tokens.append(game.apply(random_move(game, rng)))
+            assert game.state_hash == game.compute_hash()
+        for token in reversed(tokens):
+            game.undo(token)
+        
+        assert snapshot(game) == before
+        assert game.compute_hash() == game.state_hash
+        assert game.version > version
+        
+        # Ramo escolhido
+        game.apply(random_move(game, rng))
+
+
+def test_failed_challenge_redraws_and_undo_returns_the_card():
+    game = CoupGame(["A", "B"], seed=1)
+    actor, challenger = game.players
+    game.deck.extend(actor.cards)
+    actor.cards = []
+    for card in (Character.DUKE, Character.CONTESSA):
+        game.deck.take(card)
+        actor.cards.append(card)
+    game.rehash()
+    before = snapshot(game)
+    
+    token = game.apply(Move(actor, Action.TAX, challenger=challenger))
+    assert token.turn.challenger is challenger and not token.turn.challenge_succeeded
+    assert len(actor.cards) == 2 and len(challenger.cards) == 1
+    assert actor.coins == 5
+    
+    game.undo(token)
+    assert snapshot(game) == before
@@ -0,0 +1,31 @@
+"""BatchSimulator: invariantes das partidas e taxas de vitória"""
+import numpy as np
+import pytest
+from batch_simulator import BatchSimulator
+
+
+@pytest.mark.parametrize("difficulties", [["hard", "medium", "easy"], ["hard"] * 6, ["easy", "hard"]])
+def test_games_keep_cards_and_coins_consistent(difficulties):
+    simulator = BatchSimulator(500, difficulties, seed=3)
+    while simulator.step():
+        assert (simulator.coins >= 0).all()
+        assert (simulator.deck >= 0).all()
+        assert (simulator.hands >= 0).all()
+        sizes = simulator.hands.sum(axis=2)
+        assert (sizes <= 2).all()
+        assert ((sizes > 0) == simulator.alive).all()
+    # Cartas perdidas não voltam: baralho + mãos nunca passam das 15 cartas
+    assert (simulator.deck.sum(axis=1) + simulator.hands.sum(axis=(1, 2)) <= 15).all()
+    assert simulator.unfinished == 0
+    assert simulator.win_rates().sum() == pytest.approx(1.0)
+
+
+def test_win_rates_ignore_unfinished_games():
+    simulator = BatchSimulator(400, ["hard", "medium", "easy"], seed=5, max_turns=8)
+    winners = simulator.run()["winner"]
+    finished = winners >= 0
+    assert 0 < simulator.unfinished == (~finished).sum() < len(winners)
+
+    expected = np.bincount(winners[finished], minlength=3) / finished.sum()
+    assert np.allclose(simulator.win_rates(), expected)
+    assert simulator.win_rates().sum() == pytest.approx(1.0)
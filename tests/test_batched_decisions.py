@@ -0,0 +1,67 @@
+"""Decisões em lote de CoupAI contra as decisões partida a partida"""
+import random
+import pytest
+from coup_game import CoupGame, BLOCKING_CHARACTERS
+from compact_state import ACTION_INDEX, ACTIONS, NO_TARGET
+from coup_ai import CoupAI
+from random_play import random_move
+
+PARAMS = [
+    None,
+    {"bluff_probability": 0.9, "challenge_aggressiveness": 0.8, "block_probability": 0.3,
+     "tax_preference": 0.0, "steal_preference": 1.0, "assassinate_preference": 0.9},
+    {"bluff_probability": 0.1, "challenge_aggressiveness": 0.2, "block_probability": 0.9,
+     "tax_preference": 0.5, "steal_preference": 0.5, "assassinate_preference": 0.5},
+]
+
+
+def random_games(seed, count=60):
+    """Partidas de 3 a 6 jogadores em estados alcançados por turnos aleatórios"""
+    rng = random.Random(seed)
+    game = CoupGame([f"J{i}" for i in range(3 + seed % 4)], seed=seed)
+    for _ in range(count):
+        if game.is_game_over():
+            return
+        yield game
+        game.apply(random_move(game, rng))
+
+
+def twin_ais(difficulty, params, seed):
+    """Duas IAs iguais, com geradores na mesma semente"""
+    return [CoupAI(difficulty=difficulty, learning_params=dict(params) if params else None, seed=seed)
+            for _ in range(2)]
+
+
+@pytest.mark.parametrize("difficulty", ["easy", "medium", "hard"])
+@pytest.mark.parametrize("params", PARAMS)
+@pytest.mark.parametrize("seed", range(6))
+def test_choose_actions_matches_choose_action(difficulty, params, seed):
+    for step, game in enumerate(random_games(seed)):
+        scalar, batched = twin_ais(difficulty, params, seed * 1000 + step)
+        player = game.get_current_player()
+        action, target, bluff = scalar.choose_action(game, player)
+        actions, targets, bluffs = batched.choose_actions([game])
+
+        assert ACTIONS[actions[0]] == action
+        assert targets[0] == (game.players.index(target) if target is not None else NO_TARGET)
+        assert bluffs[0] == bluff
+        assert batched.rng.random() == scalar.rng.random()  # Mesmo consumo do gerador
+
+
+@pytest.mark.parametrize("difficulty", ["easy", "medium", "hard"])
+@pytest.mark.parametrize("params", PARAMS)
+@pytest.mark.parametrize("seed", range(6))
+def test_should_challenge_batch_matches_should_challenge(difficulty, params, seed):
+    for step, game in enumerate(random_games(seed)):
+        scalar, batched = twin_ais(difficulty, params, seed * 1000 + step)
+        alive = [p for p in game.players if not p.eliminated]
+        challenger, claimant = alive[0], alive[-1]
+        c, t = game.players.index(challenger), game.players.index(claimant)
+
+        for action in ACTIONS:
+            code = ACTION_INDEX[action]
+            if action in BLOCKING_CHARACTERS:
+                expected = scalar.should_challenge_block(game, challenger, claimant, action)
+                assert batched.should_challenge_batch([game], [c], [t], [code], block=True)[0] == expected
+            expected = scalar.should_challenge(game, challenger, claimant, action)
+            assert batched.should_challenge_batch([game], [c], [t], [code])[0] == expected
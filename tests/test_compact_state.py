@@ -0,0 +1,86 @@
+"""CompactState.play_turn contra CoupGame.play_turn com as mesmas decisões"""
+import random
+import pytest
+from coup_game import CoupGame, Reactions
+from compact_state import CompactState, ACTIONS, ACTION_INDEX, CHAR_INDEX, NUM_CHARACTERS
+from move_generator import legal_actions, decode_move
+
+
+class Decisions:
+    """Desafios e bloqueios sorteados por um gerador próprio, com registro das perguntas"""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.asked = []
+
+    def decide(self, *question) -> bool:
+        self.asked.append(question)
+        return self.rng.random() < (0.3 if question[0] == "block" else 0.15)
+
+
+class GameReactions(Reactions):
+    """Decisions para CoupGame; perde sempre o personagem de menor código"""
+
+    def __init__(self, decisions: Decisions):
+        self.decisions = decisions
+
+    def challenge(self, game, challenger, claimant, action, block=False):
+        return self.decisions.decide("challenge", game.players.index(challenger),
+                                     game.players.index(claimant), ACTION_INDEX[action], block)
+
+    def block(self, game, blocker, actor, action):
+        return self.decisions.decide("block", game.players.index(blocker),
+                                     game.players.index(actor), ACTION_INDEX[action])
+
+    def choose_card(self, game, player):
+        return min(player.cards, key=CHAR_INDEX.get)
+
+
+class StateReactions:
+    """Decisions para CompactState, com a mesma escolha de carta"""
+
+    def __init__(self, decisions: Decisions):
+        self.decisions = decisions
+
+    def challenge(self, state, challenger, claimant, action, block=False):
+        return self.decisions.decide("challenge", challenger, claimant, action, block)
+
+    def block(self, state, blocker, actor, action):
+        return self.decisions.decide("block", blocker, actor, action)
+
+    def choose_card(self, state, player):
+        base = player * NUM_CHARACTERS
+        return next(c for c in range(NUM_CHARACTERS) if state.hands[base + c])
+
+
+def state_tuple(state: CompactState):
+    return (state.coins, state.hands, state.card_counts, state.deck, state.deck_size, state.current)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_play_turn_matches_coup_game(seed):
+    game = CoupGame([f"J{i}" for i in range(2 + seed % 5)], seed=seed)
+    state = CompactState.from_game(game)
+    state.rng = random.Random()
+    state.rng.setstate(game.rng.getstate())  # Mesmo fluxo de compras, geradores separados
+    game_decisions, state_decisions = Decisions(seed), Decisions(seed)
+    moves = random.Random(seed + 1000)
+
+    for _ in range(200):
+        if game.is_game_over():
+            break
+        action, target, _ = decode_move(moves.choice(legal_actions(state, state.current)))
+        player = game.players[state.current]
+        turn = game.play_turn(ACTIONS[action], player, game.players[target] if target >= 0 else None,
+                              GameReactions(game_decisions))
+        executed = state.play_turn(action, state.current, target, StateReactions(state_decisions))
+
+        assert not turn.error
+        assert executed == turn.executed
+        assert state_decisions.asked == game_decisions.asked
+        assert state_tuple(CompactState.from_game(game)) == state_tuple(state)
+        assert state.is_game_over() == game.is_game_over()
+        if not game.is_game_over():
+            game.next_turn()
+            state.next_turn()
+    assert game.is_game_over()
@@ -0,0 +1,17 @@
+"""Tabela de finais 1v1: a versionada é exatamente a que build() gera"""
+from endgame_tablebase import EndgameTablebase, TABLE_FILE
+
+
+def test_rebuild_matches_committed_table(tmp_path):
+    path = tmp_path / "endgame_1v1.bin"
+    EndgameTablebase.build().save(str(path))
+
+    with open(TABLE_FILE, "rb") as committed:
+        assert path.read_bytes() == committed.read()
+
+
+def test_load_round_trip():
+    table = EndgameTablebase.load()
+    with open(TABLE_FILE, "rb") as committed:
+        data = committed.read()
+    assert data.endswith(table.values.tobytes() + table.actions.tobytes())
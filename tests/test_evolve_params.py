@@ -0,0 +1,17 @@
+"""AITrainer.evolve_params: o melhor conjunto só é trocado por quem o vence"""
+from ai_trainer import AITrainer
+
+
+def test_evolve_params_keeps_running_best(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # ai_learning.json vai para o diretório atual
+    trainer = AITrainer()
+    start = trainer.learning.get_strategy_params()
+    saved = []
+    monkeypatch.setattr(trainer.learning, "set_strategy_params",
+                        lambda params, rate: saved.append((dict(params), rate)))
+
+    best = trainer.evolve_params(population_size=4, generations=3, games_per_candidate=25,
+                                 seed=11, workers=1, elite=2)
+
+    assert best == (saved[-1][0] if saved else start)
+    assert len(saved) <= 3
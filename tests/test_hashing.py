@@ -0,0 +1,59 @@
+"""Hash Zobrist incremental de CoupGame contra o recalculado do zero"""
+import random
+import pytest
+from coup_game import CoupGame
+from compact_state import CompactState
+from random_play import random_action, RandomReactions
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_incremental_hash_matches_compute_hash(seed):
+    rng = random.Random(seed)
+    game = CoupGame([f"J{i}" for i in range(2 + seed % 5)], seed=seed)
+    reactions = RandomReactions(rng)
+    assert game.state_hash == game.compute_hash()
+
+    for _ in range(200):
+        if game.is_game_over():
+            break
+        player = game.get_current_player()
+        action, target = random_action(game, rng)
+        if rng.random() < 0.5:
+            game.play_turn(action, player, target, reactions)
+        else:
+            game.execute_action(action, player, target)
+        assert game.state_hash == game.compute_hash()
+        if game.is_game_over():
+            break
+
+        # Mutações diretas que mantêm o hash
+        if rng.random() < 0.1:
+            game.add_coins(rng.choice(game.players), rng.choice((1, 2)))
+        if rng.random() < 0.05:
+            alive = [p for p in game.players if not p.eliminated]
+            game.lose_card(rng.choice(alive))
+        assert game.state_hash == game.compute_hash()
+
+        if not game.is_game_over():
+            game.next_turn()
+            assert game.state_hash == game.compute_hash()
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_equal_positions_hash_equal(seed):
+    rng = random.Random(seed)
+    game = CoupGame([f"J{i}" for i in range(3)], seed=seed)
+    for _ in range(rng.randint(0, 30)):
+        if game.is_game_over():
+            break
+        action, target = random_action(game, rng)
+        game.play_turn(action, game.get_current_player(), target, RandomReactions(rng))
+        if not game.is_game_over():
+            game.next_turn()
+
+    # Mesma posição montada em outro jogo, sem o histórico
+    copy = CompactState.from_game(game).to_game([p.name for p in game.players])
+    assert copy.state_hash == game.state_hash
+
+    copy.add_coins(copy.players[0], 1)
+    assert copy.state_hash != game.state_hash
@@ -0,0 +1,80 @@
+"""move_generator contra as regras de CompactState.play_turn"""
+import random
+import pytest
+from compact_state import (
+    CompactState, NUM_ACTIONS, NUM_CHARACTERS, NO_TARGET, BLOCKING_CHARACTERS, TARGETED_ACTIONS,
+)
+from move_generator import (
+    legal_actions, legal_moves, decode_move,
+    ACTION_PHASE, CHALLENGE_PHASE, BLOCK_PHASE, BLOCK_CHALLENGE_PHASE,
+)
+
+
+class RecordingReactions:
+    """Ninguém desafia; bloqueia só `blocker` (se houver). Guarda quem foi consultado."""
+
+    def __init__(self, blocker=None):
+        self.blocker = blocker
+        self.challengers = []
+        self.blockers = []
+        self.block_challengers = []
+
+    def challenge(self, state, challenger, claimant, action, block=False):
+        (self.block_challengers if block else self.challengers).append(challenger)
+        return False
+
+    def block(self, state, blocker, actor, action):
+        self.blockers.append(blocker)
+        return blocker == self.blocker
+
+
+def random_states(seed, count=40):
+    """Estados alcançados por jogadas aleatórias"""
+    rng = random.Random(seed)
+    state = CompactState.new_game(2 + seed % 5, rng)
+    for _ in range(count):
+        if state.get_winner() is not None:
+            return
+        yield state
+        player = state.current
+        action, target, _ = decode_move(rng.choice(legal_actions(state, player)))
+        state.play_turn(action, player, target)
+        if state.get_winner() is None:
+            state.next_turn()
+
+
+@pytest.mark.parametrize("seed", range(15))
+def test_phases_match_play_turn(seed):
+    for state in random_states(seed):
+        actor = state.current
+        honest = set()
+        for move in legal_moves(state, ACTION_PHASE, actor):
+            action, target, bluff = decode_move(move)
+            if not bluff:
+                honest.add((action, target))
+            
+            reactions = RecordingReactions()
+            state.copy().play_turn(action, actor, target, reactions)
+            assert sorted(reactions.challengers) == legal_moves(state, CHALLENGE_PHASE, actor, action)
+            
+            blocks = [decode_move(m) for m in legal_moves(state, BLOCK_PHASE, actor, action, target)]
+            assert sorted(reactions.blockers) == sorted(blocker for _, blocker, _ in blocks)
+            for _, blocker, block_bluff in blocks:
+                holds = any(state.hands[blocker * NUM_CHARACTERS + char]
+                            for char in BLOCKING_CHARACTERS[action])
+                assert block_bluff == (not holds)
+                
+                reactions = RecordingReactions(blocker)
+                state.copy().play_turn(action, actor, target, reactions)
+                assert sorted(reactions.block_challengers) == legal_moves(
+                    state, BLOCK_CHALLENGE_PHASE, actor, action, target, blocker)
+        
+        # Jogadas honestas = ações válidas com a carta na mão
+        valid = {
+            (action, target)
+            for action in range(NUM_ACTIONS)
+            for target in [NO_TARGET] + list(range(state.num_players))
+            if target != actor and state.is_valid_action(action, actor, target)
+            and (target != NO_TARGET) == bool(TARGETED_ACTIONS[action])
+        }
+        assert honest == valid
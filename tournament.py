@@ -0,0 +1,313 @@
+"""
+Torneio em escada (ladder) com rating Elo persistente
+Qualquer conjunto de agentes (dificuldades, snapshots de parâmetros, agentes
+de busca) joga todas as mesas de um round-robin num pool de processos. Os
+ratings e as partidas já jogadas ficam num arquivo JSON, então um agente
+novo joga só as mesas em que entra.
+
+Uso:
+    python tournament.py add hard --difficulty hard
+    python tournament.py add treinada --difficulty hard --learned
+    python tournament.py run --table 2 --games 20 --workers 4
+    python tournament.py show
+"""
+import argparse
+import json
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import combinations
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from coup_game import CoupGame
+from seeding import derive_seed, new_base_seed
+
+RATINGS_FILE = "tournament_ratings.json"
+INITIAL_RATING = 1500.0
+# Partidas por worker em cada lote entre gravações do arquivo
+GAMES_PER_WORKER = 25
+# Nós por jogada dos agentes de busca sem orçamento próprio (~200 ms). Orçamento
+# por nós, e não por tempo, para a mesma semente dar a mesma partida
+DEFAULT_SEARCH_NODES = 2000
+
+
+def _make_coup_ai(name: str, spec: Dict, seed: int):
+    from coup_ai import CoupAI
+    return CoupAI(name=name, difficulty=spec.get("difficulty", "hard"),
+                  learning_params=spec.get("params"), seed=seed,
+                  search_time_ms=spec.get("search_time_ms"),
+                  search_nodes=spec.get("search_nodes", DEFAULT_SEARCH_NODES))
+
+
+def _make_playout(name: str, spec: Dict, seed: int):
+    from playout_policy import PlayoutAgent
+    return PlayoutAgent(name, seed=seed)
+
+
+# Tipo do agente -> fábrica(nome, spec, semente) com a interface de CoupAI.
+# Registre novos tipos na importação de um módulo (register_agent_kind) para
+# que os workers do pool também os conheçam.
+AGENT_KINDS: Dict[str, Callable] = {
+    "coup_ai": _make_coup_ai,
+    "playout": _make_playout,
+}
+
+
+def register_agent_kind(kind: str, factory: Callable):
+    """Registra um tipo de agente: factory(nome, spec, semente) -> agente"""
+    AGENT_KINDS[kind] = factory
+
+
+def create_agent(name: str, spec: Dict, seed: int):
+    """Instancia o agente descrito por spec (dict serializável com "kind")"""
+    kind = spec.get("kind", "coup_ai")
+    if kind not in AGENT_KINDS:
+        raise ValueError(f"Tipo de agente desconhecido: {kind}")
+    return AGENT_KINDS[kind](name, spec, seed)
+
+
+def table_key(names) -> str:
+    """Chave de uma mesa (independente da ordem dos assentos)"""
+    return "|".join(sorted(names))
+
+
+def _play_table_game(specs: List[Tuple[str, Dict]], game_seed: int) -> Optional[str]:
+    """
+    Partida de uma mesa num worker; retorna o nome do vencedor (ou None)
+
+    specs já vem na ordem dos assentos. O jogo e cada assento usam fluxos
+    derivados de game_seed, como nas partidas semeadas do treino.
+    """
+    from ai_trainer import AITrainer
+
+    agents = [create_agent(name, spec, derive_seed(game_seed, seat + 1))
+              for seat, (name, spec) in enumerate(specs)]
+    game = CoupGame([agent.name for agent in agents], seed=derive_seed(game_seed, 0))
+    winner = AITrainer.play_game(game, agents[0], agents[1:])
+    return winner.name if winner else None
+
+
+class Tournament:
+    """
+    Ladder persistente: agentes, ratings Elo e partidas jogadas por mesa
+
+    Ratings são atualizados partida a partida na ordem do calendário; numa
+    mesa com n jogadores o vencedor "vence" cada um dos outros, com fator K
+    dividido por n - 1. Partidas sem vencedor só contam como jogadas.
+    """
+
+    def __init__(self, path: str = RATINGS_FILE, seed: Optional[int] = None,
+                 k_factor: float = 16.0):
+        """
+        Args:
+            path: Arquivo JSON dos ratings (criado se não existir)
+            seed: Semente base de um torneio novo (arquivos existentes mantêm a sua)
+            k_factor: Fator K do Elo
+        """
+        self.path = path
+        self.k_factor = k_factor
+        self.data = self._load(seed)
+
+    def _load(self, seed: Optional[int]) -> Dict:
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {
+            "seed": seed if seed is not None else new_base_seed(),
+            "agents": {},   # nome -> spec
+            "ratings": {},  # nome -> {"rating", "games", "wins"}
+            "tables": {},   # chave da mesa -> partidas jogadas
+            "last_updated": None
+        }
+
+    def save(self):
+        """Grava o arquivo de ratings"""
+        self.data["last_updated"] = datetime.now().isoformat()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+
+    def add_agent(self, name: str, spec: Dict, replace: bool = False):
+        """
+        Inscreve um agente (spec: dict com "kind" e as opções da fábrica)
+
+        Com replace=True um agente existente é redefinido e perde o rating e
+        as mesas jogadas, que passam a ser jogadas de novo.
+        """
+        if "|" in name:
+            raise ValueError("Nome de agente não pode conter '|'")
+        if spec.get("kind", "coup_ai") not in AGENT_KINDS:
+            raise ValueError(f"Tipo de agente desconhecido: {spec.get('kind')}")
+        if name in self.data["agents"]:
+            if not replace:
+                raise ValueError(f"Agente já inscrito: {name}")
+            self.remove_agent(name)
+        self.data["agents"][name] = spec
+        self.data["ratings"][name] = {"rating": INITIAL_RATING, "games": 0, "wins": 0}
+
+    def remove_agent(self, name: str):
+        """Remove o agente e as mesas em que jogou (os ratings dos outros ficam)"""
+        self.data["agents"].pop(name, None)
+        self.data["ratings"].pop(name, None)
+        self.data["tables"] = {key: games for key, games in self.data["tables"].items()
+                               if name not in key.split("|")}
+
+    def schedule(self, table_size: int = 2, games_per_table: int = 20) -> List[Tuple[Tuple[str, ...], int]]:
+        """
+        Partidas que faltam: (nomes na ordem dos assentos, semente) de cada
+        mesa de table_size agentes ainda sem games_per_table partidas
+
+        O assento gira a cada partida da mesa, então cada agente joga de cada
+        posição o mesmo número de vezes.
+        """
+        names = sorted(self.data["agents"])
+        games = []
+        for table in combinations(names, table_size):
+            key = table_key(table)
+            table_id = zlib.crc32(key.encode("utf-8"))
+            for index in range(self.data["tables"].get(key, 0), games_per_table):
+                shift = index % table_size
+                seats = table[shift:] + table[:shift]
+                games.append((seats, derive_seed(self.data["seed"], table_id, index)))
+        return games
+
+    def run(self, table_size: int = 2, games_per_table: int = 20,
+            workers: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Joga as partidas que faltam e atualiza os ratings
+
+        Args:
+            table_size: Jogadores por mesa (2 = round-robin de duelos)
+            games_per_table: Partidas de cada mesa
+            workers: Processos que jogam as partidas (None = todos os núcleos)
+
+        Returns:
+            Classificação (ver leaderboard)
+        """
+        if len(self.data["agents"]) < table_size:
+            raise ValueError(f"São necessários ao menos {table_size} agentes")
+        workers = max(workers if workers is not None else (os.cpu_count() or 1), 1)
+        games = self.schedule(table_size, games_per_table)
+        print(f"🏆 {len(games)} partidas a jogar ({table_size} por mesa, {games_per_table} por mesa)")
+
+        played = 0
+        for batch, winners in self._play(games, workers):
+            for (seats, _), winner in zip(batch, winners):
+                self.record_result(seats, winner)
+            played += len(batch)
+            self.save()
+            print(f"   {played}/{len(games)} partidas")
+        return self.leaderboard()
+
+    def _play(self, games: List, workers: int) -> Iterator[Tuple[List, List[Optional[str]]]]:
+        """Lotes de partidas e seus vencedores, na ordem do calendário"""
+        batch_size = workers * GAMES_PER_WORKER
+        pool = ProcessPoolExecutor(workers) if workers > 1 else None
+        try:
+            for start in range(0, len(games), batch_size):
+                batch = games[start:start + batch_size]
+                specs = [[(name, self.data["agents"][name]) for name in seats] for seats, _ in batch]
+                seeds = [game_seed for _, game_seed in batch]
+                if pool is None:
+                    winners = list(map(_play_table_game, specs, seeds))
+                else:
+                    winners = list(pool.map(_play_table_game, specs, seeds,
+                                            chunksize=max(1, len(batch) // (workers * 4))))
+                yield batch, winners
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def record_result(self, seats, winner: Optional[str]):
+        """Aplica uma partida da mesa aos ratings e ao contador da mesa"""
+        ratings = self.data["ratings"]
+        key = table_key(seats)
+        self.data["tables"][key] = self.data["tables"].get(key, 0) + 1
+        for name in seats:
+            ratings[name]["games"] += 1
+        if winner is None:
+            return
+
+        ratings[winner]["wins"] += 1
+        k = self.k_factor / (len(seats) - 1)
+        winner_rating = ratings[winner]["rating"]
+        gain = 0.0
+        for name in seats:
+            if name == winner:
+                continue
+            expected = 1.0 / (1.0 + 10 ** ((ratings[name]["rating"] - winner_rating) / 400.0))
+            delta = k * (1.0 - expected)
+            ratings[name]["rating"] -= delta
+            gain += delta
+        ratings[winner]["rating"] += gain
+
+    def leaderboard(self) -> List[Tuple[str, float]]:
+        """(nome, rating) do maior para o menor rating"""
+        return sorted(((name, entry["rating"]) for name, entry in self.data["ratings"].items()),
+                      key=lambda item: -item[1])
+
+    def print_leaderboard(self):
+        """Imprime a classificação"""
+        print(f"\n{'='*60}")
+        print(f"🏆 CLASSIFICAÇÃO ({self.path})")
+        print(f"{'='*60}")
+        for position, (name, rating) in enumerate(self.leaderboard(), 1):
+            entry = self.data["ratings"][name]
+            win_rate = entry["wins"] / entry["games"] * 100 if entry["games"] else 0.0
+            print(f"{position:2d}. {name:<20} {rating:7.1f}  "
+                  f"({entry['wins']}/{entry['games']} vitórias, {win_rate:.1f}%)")
+        print(f"{'='*60}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Torneio em escada com rating Elo")
+    parser.add_argument("--file", default=RATINGS_FILE, help="Arquivo de ratings")
+    parser.add_argument("--seed", type=int, default=None, help="Semente de um torneio novo")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Inscreve um agente")
+    add.add_argument("name")
+    add.add_argument("--kind", default="coup_ai", choices=sorted(AGENT_KINDS))
+    add.add_argument("--difficulty", default="hard",
+                     choices=("easy", "medium", "hard", "expert", "cfr"))
+    add.add_argument("--params", help="JSON com learning_params (snapshot)")
+    add.add_argument("--learned", action="store_true",
+                     help="Usa os parâmetros aprendidos atuais (ai_learning.json)")
+    add.add_argument("--search-nodes", type=int, default=None,
+                     help=f"Nós por jogada do expert (padrão: {DEFAULT_SEARCH_NODES})")
+    add.add_argument("--replace", action="store_true", help="Redefine um agente existente")
+
+    remove = commands.add_parser("remove", help="Remove um agente")
+    remove.add_argument("name")
+
+    run = commands.add_parser("run", help="Joga as partidas que faltam")
+    run.add_argument("--table", type=int, default=2, help="Jogadores por mesa")
+    run.add_argument("--games", type=int, default=20, help="Partidas por mesa")
+    run.add_argument("--workers", type=int, default=None)
+
+    commands.add_parser("show", help="Mostra a classificação")
+    args = parser.parse_args()
+
+    tournament = Tournament(args.file, args.seed)
+    if args.command == "add":
+        spec = {"kind": args.kind}
+        if args.kind == "coup_ai":
+            spec["difficulty"] = args.difficulty
+            if args.params:
+                with open(args.params, 'r', encoding='utf-8') as f:
+                    spec["params"] = json.load(f)
+            elif args.learned:
+                from ai_learning import AILearning
+                spec["params"] = AILearning().get_strategy_params()
+            if args.search_nodes is not None:
+                spec["search_nodes"] = args.search_nodes
+        tournament.add_agent(args.name, spec, args.replace)
+        tournament.save()
+        print(f"✅ {args.name} inscrito: {spec}")
+    elif args.command == "remove":
+        tournament.remove_agent(args.name)
+        tournament.save()
+    elif args.command == "run":
+        tournament.run(args.table, args.games, args.workers)
+        tournament.print_leaderboard()
+    else:
+        tournament.print_leaderboard()
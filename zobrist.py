@@ -0,0 +1,71 @@
+"""
+Hash Zobrist de estados do Coup
+Chaves aleatórias de 64 bits por (jogador, moedas), (jogador, personagem, cópias),
+(personagem, cópias no baralho), jogador atual e eliminação
+"""
+import random
+from typing import List, Sequence
+
+# Limites das tabelas (moedas acima do limite compartilham a última chave)
+MAX_PLAYERS = 8
+MAX_COINS = 63
+MAX_COPIES = 3
+NUM_CHARACTERS = 5
+
+_SEED = 0x5EED_C0DE
+
+
+class ZobristTable:
+    """Tabelas de chaves aleatórias (fixas, geradas com semente constante)"""
+
+    def __init__(self, seed: int = _SEED):
+        rng = random.Random(seed)
+
+        def key() -> int:
+            return rng.getrandbits(64)
+
+        self.coins = [[key() for _ in range(MAX_COINS + 1)] for _ in range(MAX_PLAYERS)]
+        self.hands = [[[key() for _ in range(MAX_COPIES + 1)] for _ in range(NUM_CHARACTERS)]
+                      for _ in range(MAX_PLAYERS)]
+        self.deck = [[key() for _ in range(MAX_COPIES + 1)] for _ in range(NUM_CHARACTERS)]
+        self.current = [key() for _ in range(MAX_PLAYERS)]
+        self.eliminated = [key() for _ in range(MAX_PLAYERS)]
+
+    @staticmethod
+    def _coin_index(coins: int) -> int:
+        if coins < 0:
+            return 0
+        return coins if coins < MAX_COINS else MAX_COINS
+
+    def player_hash(self, index: int, coins: int, hand_counts: Sequence[int],
+                    eliminated: bool) -> int:
+        """Contribuição de um jogador (moedas, contagem por personagem, eliminação)"""
+        value = self.coins[index][self._coin_index(coins)]
+        hand_keys = self.hands[index]
+        for char_index in range(NUM_CHARACTERS):
+            value ^= hand_keys[char_index][hand_counts[char_index]]
+        if eliminated:
+            value ^= self.eliminated[index]
+        return value
+
+    def deck_hash(self, deck_counts: Sequence[int]) -> int:
+        """Contribuição do baralho (contagem por personagem)"""
+        value = 0
+        for char_index in range(NUM_CHARACTERS):
+            value ^= self.deck[char_index][deck_counts[char_index]]
+        return value
+
+    def current_hash(self, index: int) -> int:
+        """Contribuição do jogador da vez"""
+        return self.current[index]
+
+
+ZOBRIST = ZobristTable()
+
+
+def hand_counts(cards: List, index_of: dict) -> List[int]:
+    """Contagem por personagem de uma lista de cartas"""
+    counts = [0] * NUM_CHARACTERS
+    for card in cards:
+        counts[index_of[card]] += 1
+    return counts